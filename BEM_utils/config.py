@@ -5,6 +5,7 @@ Provides lookup for multiple EnergyPlus versions and dynamic path resolution.
 """
 import os
 import platform
+import re
 
 SYSTEM_PLATFORM = platform.system()
 
@@ -29,6 +30,61 @@ else:                                  # Linux
     }
     DEFAULT_VERSION = "24.2"
 
+# Simulation result cache (see sim_cache.py): reused across batch runs and
+# bounded in size by least-recently-used eviction
+SIM_CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "0_BEM_Setup", "SimCache"
+)
+SIM_CACHE_MAX_BYTES = 5 * 1024 ** 3
+
+# Simulations run in a scratch directory (tmpfs when available); only the
+# retained outputs are moved to SimResults afterwards. Set BEM_SCRATCH_DIR
+# to choose another location, or to an empty string to run in place.
+SIM_SCRATCH_DIR = os.environ.get(
+    'BEM_SCRATCH_DIR', '/dev/shm' if os.access('/dev/shm', os.W_OK) else None
+)
+SIM_RETAINED_OUTPUTS = [
+    'eplusout.sql',
+    'eplusout.err',
+    'eplusout.end',
+    'eplustbl.htm',
+    'eplustbl.csv',
+    'eplusout.csv',
+    'eplusmtr.csv',
+]
+# Keep every file EnergyPlus writes instead of SIM_RETAINED_OUTPUTS only
+SIM_KEEP_ALL_OUTPUTS = False
+
+# A running simulation that writes no output for this many seconds is
+# considered hung and killed (0 disables)
+SIM_STALL_TIMEOUT = float(os.environ.get('BEM_SIM_STALL_TIMEOUT', '1800'))
+
+# Admission control for batch runs: the predicted peak memory of concurrent
+# jobs stays within this share of the memory available at batch start
+SIM_MEMORY_FRACTION = 0.8
+# EnergyPlus threads (-j) per job once fewer jobs remain than free workers
+# (1 disables)
+SIM_TAIL_THREADS = 4
+
+# Actual simulation runtimes of earlier batches, used by scheduler.py to
+# predict job lengths and dispatch the longest first
+SIM_TIMINGS_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "0_BEM_Setup", "sim_timings.json"
+)
+
+
+# Offline stand-in for EnergyPlus (see fake_energyplus.py). With
+# BEM_FAKE_ENERGYPLUS=1, every version resolves to the fake executable so
+# batches and result processing run without an EnergyPlus install.
+USE_FAKE_ENERGYPLUS = os.environ.get('BEM_FAKE_ENERGYPLUS', '') not in ('', '0')
+FAKE_ENERGYPLUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fake_energyplus.py')
+FAKE_SECONDS_PER_MB = float(os.environ.get('BEM_FAKE_SECONDS_PER_MB', '0.5'))
+FAKE_FAIL_PATTERN = os.environ.get('BEM_FAKE_FAIL_PATTERN', '')
+FAKE_HANG_PATTERN = os.environ.get('BEM_FAKE_HANG_PATTERN', '')
+if USE_FAKE_ENERGYPLUS:
+    # Keep fake runtimes out of the history used to schedule real runs
+    SIM_TIMINGS_FILE = SIM_TIMINGS_FILE.replace('.json', '_fake.json')
+
 
 def get_ep_paths(version: str = None) -> dict:
     """
@@ -46,6 +102,10 @@ def get_ep_paths(version: str = None) -> dict:
         if len(parts) >= 2:
             version = f"{parts[0]}.{parts[1]}"
 
+    if USE_FAKE_ENERGYPLUS:
+        ep_dir = os.path.dirname(FAKE_ENERGYPLUS)
+        return {'exe': FAKE_ENERGYPLUS, 'idd': os.path.join(ep_dir, 'Energy+.idd'), 'dir': ep_dir}
+
     ep_dir = ENERGYPLUS_INSTALLS.get(version, ENERGYPLUS_INSTALLS.get(DEFAULT_VERSION))
     
     _exe_ext = '.exe' if SYSTEM_PLATFORM == 'Windows' else ''
@@ -56,6 +116,30 @@ def get_ep_paths(version: str = None) -> dict:
     }
 
 
+def get_idf_version(idf_path: str) -> str:
+    """
+    Peeks at the IDF file to find the Version object.
+    Returns e.g. '22.1' or '24.2'. Defaults to DEFAULT_VERSION.
+    """
+    try:
+        with open(idf_path, 'r', encoding='latin-1', errors='ignore') as f:
+            lines = f.readlines()
+            for i, line in enumerate(lines):
+                if 'VERSION' in line.upper():
+                    # Look for the value in the next line or same line
+                    # Usually: Version, 22.1;
+                    content = "".join(lines[i:i+3])
+                    match = re.search(r'Version\s*,\s*([\d\.]+)', content, re.IGNORECASE)
+                    if match:
+                        v = match.group(1)
+                        # Normalize 22.1.0 -> 22.1
+                        parts = v.split('.')
+                        return f"{parts[0]}.{parts[1]}"
+    except Exception:
+        pass
+    return DEFAULT_VERSION
+
+
 # For backward compatibility (global defaults)
 _default_paths = get_ep_paths(DEFAULT_VERSION)
 ENERGYPLUS_DIR = _default_paths['dir']
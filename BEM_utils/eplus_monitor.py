@@ -0,0 +1,206 @@
+"""
+eplus_monitor.py — Live monitoring of a running EnergyPlus process.
+
+Provides:
+- EnergyPlusProgress  Parses console lines into a phase and completion percentage
+- run_monitored()     Runs EnergyPlus, streams its output and eplusout.err,
+                      and kills it on a fatal error or when it stops
+                      producing output
+
+Progress bands: initialization 0–5 %, sizing 5–15 %, environments and
+warm-up 15–20 %, run period 20–98 % (from the "Continuing Simulation at
+MM/DD" markers), reporting 98–100 %.
+"""
+import datetime
+import os
+import queue
+import re
+import subprocess
+import sys
+import threading
+import time
+
+_SIM_DATE_RE = re.compile(r'(Starting|Continuing) Simulation at (\d{1,2})/(\d{1,2})')
+_FATAL_RE = re.compile(r'\*\*\s*FATAL|\*\*\s+Fatal\s+\*\*|Terminated--Fatal', re.IGNORECASE)
+
+# Console marker → (phase, minimum percent)
+_PHASE_MARKERS = [
+    ('Processing Data Dictionary', 'initializing', 1),
+    ('Initializing Simulation', 'initializing', 3),
+    ('Performing Zone Sizing', 'sizing', 5),
+    ('Calculating System sizing', 'sizing', 10),
+    ('Adjusting', 'sizing', 13),
+    ('Warming up', 'warm-up', 15),
+    ('Writing tabular output', 'reporting', 98),
+    ('Writing final SQL', 'reporting', 99),
+    ('Completed Successfully', 'done', 100),
+]
+
+# Seconds a process may keep running after a fatal error before it is killed
+FATAL_GRACE = 5.0
+POLL_INTERVAL = 1.0
+
+
+class EnergyPlusProgress:
+    """
+    Tracks one simulation from its console output.
+
+    Args:
+        run_days: Days in the weather-file run period (scales the 20–98 % band).
+    """
+
+    def __init__(self, run_days: int = 365):
+        self.run_days = max(1, run_days or 365)
+        self.percent = 0
+        self.phase = 'starting'
+        self.fatal = None
+        self._env_start = None
+
+    def feed(self, line: str) -> bool:
+        """Updates the state from one line; returns True if percent or phase changed."""
+        before = (self.percent, self.phase)
+        if self.fatal is None and _FATAL_RE.search(line):
+            self.fatal = line.strip()
+
+        match = _SIM_DATE_RE.search(line)
+        if match:
+            month, day = int(match.group(2)), int(match.group(3))
+            try:
+                date = datetime.date(2001, month, day)
+            except ValueError:
+                date = None
+            if match.group(1) == 'Starting':
+                self._env_start = date
+                self._advance('simulating', 15)
+            elif date and self._env_start:
+                days = (date - self._env_start).days
+                if days < 0:
+                    days += 365
+                self._advance('run period', 20 + int(78 * min(1.0, days / self.run_days)))
+        else:
+            for marker, phase, percent in _PHASE_MARKERS:
+                if marker in line:
+                    self._advance(phase, percent)
+                    break
+        return (self.percent, self.phase) != before
+
+    def _advance(self, phase: str, percent: int) -> None:
+        # Sizing repeats warm-up and environment markers: never move backwards
+        if percent >= self.percent:
+            self.percent = percent
+            self.phase = phase
+
+
+def _pump(stream, lines: queue.Queue) -> None:
+    for line in iter(stream.readline, ''):
+        lines.put(line)
+    stream.close()
+    lines.put(None)
+
+
+def _read_new(path: str, offset: int):
+    """Returns (text appended since offset, new offset)."""
+    try:
+        with open(path, 'r', encoding='latin-1') as f:
+            f.seek(offset)
+            text = f.read()
+            return text, f.tell()
+    except OSError:
+        return '', offset
+
+
+def run_monitored(cmd: list, err_path: str, run_days: int = 365, on_progress=None,
+                  echo: bool = False, stall_timeout: float = 0) -> dict:
+    """
+    Runs an EnergyPlus command while following its progress.
+
+    Console output is read line by line and eplusout.err is tailed once per
+    second. A fatal error (in either stream) gives the process FATAL_GRACE
+    seconds to finish writing its reports before it is killed. A process
+    that writes nothing for stall_timeout seconds is killed as hung.
+
+    Args:
+        cmd:           EnergyPlus command line.
+        err_path:      Path of the eplusout.err the run will write.
+        run_days:      Run period length, for the percentage.
+        on_progress:   Callable(percent, phase) called on every change.
+        echo:          Print console output as it arrives.
+        stall_timeout: Seconds without output before the run is killed (0 disables).
+
+    Returns:
+        dict: {'returncode': int, 'aborted': str or None, 'fatal': str or None,
+               'percent': int, 'peak_bytes': int or None (peak RSS, POSIX only)}
+    """
+    progress = EnergyPlusProgress(run_days)
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                            text=True, errors='replace', bufsize=1)
+    lines = queue.Queue()
+    reader = threading.Thread(target=_pump, args=(proc.stdout, lines), daemon=True)
+    reader.start()
+
+    err_offset = 0
+    last_output = time.time()
+    fatal_at = None
+    aborted = None
+    eof = False
+
+    while not eof:
+        try:
+            line = lines.get(timeout=POLL_INTERVAL)
+        except queue.Empty:
+            line = ''
+        batch = [] if line == '' else [line]
+        while True:
+            try:
+                batch.append(lines.get_nowait())
+            except queue.Empty:
+                break
+        text, err_offset = _read_new(err_path, err_offset)
+        if text:
+            last_output = time.time()
+            for err_line in text.splitlines():
+                if progress.fatal is None and _FATAL_RE.search(err_line):
+                    progress.fatal = err_line.strip()
+
+        changed = False
+        for line in batch:
+            if line is None:
+                eof = True
+                continue
+            last_output = time.time()
+            if echo:
+                print(line, end='', flush=True)
+            changed |= progress.feed(line)
+        if changed and on_progress is not None:
+            on_progress(progress.percent, progress.phase)
+
+        now = time.time()
+        if progress.fatal and fatal_at is None:
+            fatal_at = now
+        if eof:
+            break
+        if fatal_at is not None and now - fatal_at >= FATAL_GRACE:
+            aborted = f"fatal error: {progress.fatal}"
+        elif stall_timeout and now - last_output >= stall_timeout:
+            aborted = f"no output for {int(stall_timeout)}s ({progress.phase}, {progress.percent}%)"
+        if aborted:
+            proc.kill()
+            break
+
+    returncode, peak_bytes = _wait(proc)
+    return {'returncode': returncode, 'aborted': aborted, 'fatal': progress.fatal,
+            'percent': progress.percent, 'peak_bytes': peak_bytes}
+
+
+def _wait(proc):
+    """Waits for the process; returns (returncode, peak RSS in bytes or None)."""
+    if not hasattr(os, 'wait4'):
+        return proc.wait(), None
+    try:
+        _, status, usage = os.wait4(proc.pid, 0)
+    except ChildProcessError:
+        return proc.wait(), None
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return proc.returncode, usage.ru_maxrss * scale
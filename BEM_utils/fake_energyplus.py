@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+fake_energyplus.py — Offline stand-in for the EnergyPlus executable.
+
+Accepts the command line used by simulation.run_simulation()
+(`-w EPW -d OUTDIR [-x] [-j N] IDF`), sleeps for a time proportional to the
+IDF size and writes a synthetic eplusout.sql with the tables read by
+plotting.py (TabularDataWithStrings, ReportData, ReportDataDictionary,
+Time, EnvironmentPeriods), plus eplusout.err and eplusout.end.
+
+Results are deterministic per IDF content, so batches, the result cache,
+the scheduler and result processing can be exercised without an
+EnergyPlus install. Enable it with BEM_FAKE_ENERGYPLUS=1 (see config.py).
+
+Environment:
+    BEM_FAKE_SECONDS_PER_MB  Simulated runtime per MB of IDF (default 0.5).
+    BEM_FAKE_FAIL_PATTERN    Regex; matching IDF names end with a fatal error.
+    BEM_FAKE_HANG_PATTERN    Regex; matching IDF names hang during warm-up.
+"""
+import argparse
+import calendar
+import datetime
+import hashlib
+import math
+import os
+import random
+import re
+import sqlite3
+import sys
+import time
+
+if __package__ in (None, ''):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from BEM_utils import config
+
+FAKE_VERSION = '24.2.0-fake'
+YEAR = 2017
+
+# End use → (electricity share, natural gas share) of the synthetic total
+_END_USES = [
+    ('Heating', 0.04, 0.55),
+    ('Cooling', 0.18, 0.0),
+    ('Interior Lighting', 0.22, 0.0),
+    ('Exterior Lighting', 0.03, 0.0),
+    ('Interior Equipment', 0.33, 0.10),
+    ('Fans', 0.12, 0.0),
+    ('Pumps', 0.05, 0.0),
+    ('Heat Rejection', 0.01, 0.0),
+    ('Water Systems', 0.02, 0.35),
+]
+
+_SCHEMA = """
+CREATE TABLE Simulations (
+    SimulationIndex INTEGER PRIMARY KEY, EnergyPlusVersion TEXT, TimeStamp TEXT,
+    NumTimestepsPerHour INTEGER, Completed BOOL, CompletedSuccessfully BOOL);
+CREATE TABLE EnvironmentPeriods (
+    EnvironmentPeriodIndex INTEGER PRIMARY KEY, SimulationIndex INTEGER,
+    EnvironmentName TEXT, EnvironmentType INTEGER);
+CREATE TABLE Time (
+    TimeIndex INTEGER PRIMARY KEY, Year INTEGER, Month INTEGER, Day INTEGER,
+    Hour INTEGER, Minute INTEGER, Dst INTEGER, Interval INTEGER,
+    IntervalType INTEGER, SimulationDays INTEGER, DayType TEXT,
+    EnvironmentPeriodIndex INTEGER, WarmupFlag INTEGER);
+CREATE TABLE ReportDataDictionary (
+    ReportDataDictionaryIndex INTEGER PRIMARY KEY, IsMeter INTEGER, Type TEXT,
+    IndexGroup TEXT, TimestepType TEXT, KeyValue TEXT, Name TEXT,
+    ReportingFrequency TEXT, ScheduleName TEXT, Units TEXT);
+CREATE TABLE ReportData (
+    ReportDataIndex INTEGER PRIMARY KEY, TimeIndex INTEGER,
+    ReportDataDictionaryIndex INTEGER, Value REAL);
+CREATE TABLE TabularDataWithStrings (
+    TabularDataIndex INTEGER PRIMARY KEY, Value TEXT, ReportName TEXT,
+    ReportForString TEXT, TableName TEXT, RowName TEXT, ColumnName TEXT, Units TEXT);
+CREATE INDEX rdIndex ON ReportData (ReportDataDictionaryIndex, TimeIndex);
+"""
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(prog='energyplus', description='Fake EnergyPlus')
+    parser.add_argument('-w', '--weather', default=None)
+    parser.add_argument('-d', '--output-directory', default='.')
+    parser.add_argument('-x', '--expandobjects', action='store_true')
+    parser.add_argument('-j', '--jobs', type=int, default=1)
+    parser.add_argument('-r', '--readvars', action='store_true')
+    parser.add_argument('-v', '--version', action='store_true')
+    parser.add_argument('input_file', nargs='?', default='in.idf')
+    return parser.parse_args(argv)
+
+
+def _hourly_profiles(rng):
+    """Normalized hourly shapes (sum 1) for electricity and gas over one year."""
+    elec, gas = [], []
+    phase = rng.uniform(-0.3, 0.3)
+    for hour in range(8760):
+        day, hod = divmod(hour, 24)
+        season = math.cos(2 * math.pi * (day - 15) / 365 + phase)     # 1 in January
+        occupied = 1.0 if 7 <= hod < 19 else 0.35
+        elec.append(occupied * (1.0 - 0.25 * season) + rng.uniform(0, 0.05))
+        gas.append(max(0.05, 0.6 + 0.5 * season) * (1.2 if hod < 9 else 1.0))
+    s_e, s_g = sum(elec), sum(gas)
+    return [v / s_e for v in elec], [v / s_g for v in gas]
+
+
+def write_sql(sql_path: str, idf_bytes: bytes) -> dict:
+    """
+    Writes a synthetic eplusout.sql for an IDF.
+
+    Args:
+        sql_path:  Output database path (replaced if it exists).
+        idf_bytes: IDF content; seeds every generated value.
+
+    Returns:
+        dict: {'area_m2': float, 'electricity_gj': float, 'gas_gj': float}
+    """
+    rng = random.Random(hashlib.sha256(idf_bytes).digest())
+    zones = max(1, len(re.findall(rb'(?im)^\s*Zone\s*,', idf_bytes)))
+    area = round(zones * rng.uniform(80.0, 400.0), 2)
+    eui_gj = rng.uniform(0.4, 1.4)                     # GJ/m² (≈ 110–390 kWh/m²)
+    elec_gj = area * eui_gj * 0.7
+    gas_gj = area * eui_gj * 0.3
+
+    if os.path.exists(sql_path):
+        os.remove(sql_path)
+    conn = sqlite3.connect(sql_path)
+    conn.executescript(_SCHEMA)
+    conn.execute("INSERT INTO Simulations VALUES (1, ?, ?, 4, 1, 1)",
+                 (f"EnergyPlus, Version {FAKE_VERSION}", time.strftime('%Y.%m.%d %H:%M')))
+    conn.executemany("INSERT INTO EnvironmentPeriods VALUES (?, 1, ?, ?)", [
+        (1, 'DENVER CENTENNIAL ANN HTG 99.6% CONDNS DB', 1),
+        (2, 'RUN PERIOD 1', 3),
+    ])
+
+    # Tabular reports
+    rows = [
+        (f"{value:.2f}", 'AnnualBuildingUtilityPerformanceSummary', 'Entire Facility',
+         'Building Area', row, 'Area', 'm2')
+        for row, value in (('Total Building Area', area),
+                           ('Net Conditioned Building Area', area * 0.95),
+                           ('Unconditioned Building Area', area * 0.05))
+    ]
+    elec_shares = sum(e for _, e, _ in _END_USES)
+    gas_shares = sum(g for _, _, g in _END_USES)
+    for end_use, e_share, g_share in _END_USES:
+        e_val = elec_gj * e_share / elec_shares
+        g_val = gas_gj * g_share / gas_shares
+        for table, row in (('End Uses', end_use), ('End Uses By Subcategory', f"{end_use}:General")):
+            rows.append((f"{e_val:.2f}", 'AnnualBuildingUtilityPerformanceSummary',
+                         'Entire Facility', table, row, 'Electricity', 'GJ'))
+            rows.append((f"{g_val:.2f}", 'AnnualBuildingUtilityPerformanceSummary',
+                         'Entire Facility', table, row, 'Natural Gas', 'GJ'))
+            rows.append(('0.00', 'AnnualBuildingUtilityPerformanceSummary',
+                         'Entire Facility', table, row, 'Water', 'm3'))
+    conn.executemany(
+        "INSERT INTO TabularDataWithStrings (Value, ReportName, ReportForString, TableName, "
+        "RowName, ColumnName, Units) VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+
+    # Time steps: one design day (hourly) and the annual run period (hourly + monthly)
+    time_rows = []
+    for hour in range(24):
+        time_rows.append((len(time_rows) + 1, YEAR, 1, 21, hour + 1, 0, 0, 60, 1, 1,
+                          'WinterDesignDay', 1, 0))
+    hourly_idx = []
+    start = datetime.date(YEAR, 1, 1)
+    for hour in range(8760):
+        day, hod = divmod(hour, 24)
+        date = start + datetime.timedelta(days=day)
+        hourly_idx.append(len(time_rows) + 1)
+        time_rows.append((len(time_rows) + 1, YEAR, date.month, date.day, hod + 1, 0, 0, 60, 1,
+                          day + 1, calendar.day_name[date.weekday()], 2, 0))
+    monthly_idx = []
+    for month in range(1, 13):
+        last = calendar.monthrange(YEAR, month)[1]
+        monthly_idx.append(len(time_rows) + 1)
+        time_rows.append((len(time_rows) + 1, YEAR, month, last, 24, 0, 0, last * 1440, 3,
+                          start.replace(month=month, day=last).timetuple().tm_yday, None, 2, 0))
+    conn.executemany("INSERT INTO Time VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", time_rows)
+
+    # Meters: hourly and monthly facility totals (J), consistent with the tabular totals
+    meters = [
+        (1, 'Facility:Electricity', 'Electricity:Facility', 'Hourly'),
+        (2, 'Facility:NaturalGas', 'NaturalGas:Facility', 'Hourly'),
+        (3, 'Facility:Electricity', 'Electricity:Facility', 'Monthly'),
+        (4, 'Facility:NaturalGas', 'NaturalGas:Facility', 'Monthly'),
+    ]
+    conn.executemany(
+        "INSERT INTO ReportDataDictionary VALUES (?, 1, 'Sum', ?, 'Zone', '', ?, ?, '', 'J')",
+        meters)
+
+    elec_shape, gas_shape = _hourly_profiles(rng)
+    elec_j = [elec_gj * 1e9 * s for s in elec_shape]
+    gas_j = [gas_gj * 1e9 * s for s in gas_shape]
+    data = []
+    for t, e, g in zip(hourly_idx, elec_j, gas_j):
+        data.append((t, 1, e))
+        data.append((t, 2, g))
+    hour = 0
+    for month, t in enumerate(monthly_idx, start=1):
+        hours = calendar.monthrange(YEAR, month)[1] * 24
+        data.append((t, 3, sum(elec_j[hour:hour + hours])))
+        data.append((t, 4, sum(gas_j[hour:hour + hours])))
+        hour += hours
+    conn.executemany(
+        "INSERT INTO ReportData (TimeIndex, ReportDataDictionaryIndex, Value) VALUES (?, ?, ?)", data)
+
+    conn.commit()
+    conn.close()
+    return {'area_m2': area, 'electricity_gj': round(elec_gj, 3), 'gas_gj': round(gas_gj, 3)}
+
+
+def _finish(output_dir: str, severe: int, fatal: bool, elapsed: float) -> None:
+    """Writes eplusout.err and eplusout.end the way EnergyPlus reports completion."""
+    hours, rem = divmod(int(elapsed), 3600)
+    mins, secs = divmod(rem, 60)
+    secs += elapsed - int(elapsed)
+    status = 'Terminated--Fatal Error Detected' if fatal else 'Completed Successfully'
+    summary = f"EnergyPlus {status}-- 0 Warning; {severe} Severe Errors;"
+    with open(os.path.join(output_dir, 'eplusout.err'), 'w') as f:
+        f.write(f"Program Version,EnergyPlus, Version {FAKE_VERSION}\n")
+        if fatal:
+            f.write("   ** Severe  ** Fake EnergyPlus: simulated failure (BEM_FAKE_FAIL_PATTERN)\n")
+            f.write("   **  Fatal  ** Program terminates: simulated failure\n")
+        f.write(f"   ************* {summary}"
+                f" Elapsed Time={hours:02d}hr {mins:02d}min {secs:5.2f}sec\n")
+    with open(os.path.join(output_dir, 'eplusout.end'), 'w') as f:
+        f.write(f"{summary} Elapsed Time={hours:02d}hr {mins:02d}min {secs:5.2f}sec\n")
+
+
+def main(argv=None) -> int:
+    args = _parse_args(sys.argv[1:] if argv is None else argv)
+    if args.version:
+        print(f"EnergyPlus, Version {FAKE_VERSION}")
+        return 0
+
+    start = time.time()
+    output_dir = os.path.abspath(args.output_directory)
+    os.makedirs(output_dir, exist_ok=True)
+    try:
+        with open(args.input_file, 'rb') as f:
+            idf_bytes = f.read()
+    except OSError as e:
+        print(f"   **  Fatal  ** Could not open input file: {e}", file=sys.stderr)
+        return 1
+    if args.weather and not os.path.exists(args.weather):
+        print(f"   **  Fatal  ** Weather file not found: {args.weather}", file=sys.stderr)
+        return 1
+
+    # in.idf carries no model name: match the run directory and the link target
+    labels = (os.path.basename(output_dir), os.path.realpath(args.input_file))
+
+    def matches(pattern):
+        return bool(pattern) and any(re.search(pattern, label) for label in labels)
+
+    _say(f"EnergyPlus, Version {FAKE_VERSION}")
+    for line in ('Processing Data Dictionary', 'Processing Input File', 'Initializing Simulation'):
+        _say(line)
+
+    if matches(config.FAKE_FAIL_PATTERN):
+        _finish(output_dir, severe=1, fatal=True, elapsed=time.time() - start)
+        _say("**FATAL:Simulated failure (BEM_FAKE_FAIL_PATTERN)")
+        _say("EnergyPlus Terminated--Fatal Error Detected. 0 Warning; 1 Severe Errors.")
+        return 1
+    if matches(config.FAKE_HANG_PATTERN):
+        _say("Warming up {1}")
+        while True:
+            time.sleep(60)
+
+    # Console markers as EnergyPlus prints them, spread over the simulated runtime
+    runtime = config.FAKE_SECONDS_PER_MB * len(idf_bytes) / 1e6
+    for line in ('Performing Zone Sizing Simulation', 'Calculating System sizing',
+                 'Warming up {1}', f"Starting Simulation at 01/01/{YEAR} for RUN PERIOD 1"):
+        _say(line)
+        time.sleep(runtime * 0.05)
+    for month in range(2, 13):
+        time.sleep(runtime * 0.8 / 11)
+        _say(f"Continuing Simulation at {month:02d}/01/{YEAR} for RUN PERIOD 1")
+    _say("Writing tabular output file results using HTML format.")
+    _say("Writing final SQL reports")
+
+    write_sql(os.path.join(output_dir, 'eplusout.sql'), idf_bytes)
+    _finish(output_dir, severe=0, fatal=False, elapsed=time.time() - start)
+    _say("EnergyPlus Completed Successfully.")
+    return 0
+
+
+def _say(line: str) -> None:
+    print(line, flush=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
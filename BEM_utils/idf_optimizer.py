@@ -8,10 +8,18 @@ Prepares IDF files for EnergyPlus simulation by:
 4. Applying speed optimizations (timestep, solar distribution, shadow calc)
 
 No existing IDF objects (PEOPLE, schedules, constructions, etc.) are modified.
+
+Two implementations:
+- native (default): tokenizes the file with idf_parser.scan_idf_objects()
+  and splices the few changed field values and the appended Output:*
+  objects into the original bytes. No IDD is loaded and every untouched
+  byte (comments, layout) is preserved.
+- eppy (native=False): loads the model through eppy with the full
+  Energy+.idd and re-serializes the whole file.
 """
 import os
-from eppy.modeleditor import IDF
 from BEM_utils import config
+from idf_parser import ObjectSpan, scan_idf_objects
 
 # Monthly meters needed for EUI extraction in plotting.py
 REQUIRED_METERS = [
@@ -34,7 +42,7 @@ REQUIRED_OUTPUT_VARIABLES = [
     ('Zone Ideal Loads Supply Air Total Cooling Energy', 'Hourly'),
 ]
 
-def optimize_idf(idf_path: str, idd_file: str = None, ep_version: str = None) -> str:
+def optimize_idf(idf_path: str, idd_file: str = None, ep_version: str = None, native: bool = True) -> str:
     """
     Modifies the IDF in-place to prepare it for simulation.
 
@@ -48,12 +56,19 @@ def optimize_idf(idf_path: str, idd_file: str = None, ep_version: str = None) ->
 
     Args:
         idf_path:   Absolute path to the .idf file.
-        idd_file:   Path to Energy+.idd. Defaults to config.IDD_FILE.
+        idd_file:   Path to Energy+.idd (eppy mode only). Defaults to config.IDD_FILE.
         ep_version: Accepted but unused (kept for call-site compatibility).
+        native:     Splice the changes into the file without eppy or the IDD.
+                    False loads and re-saves the model through eppy.
 
     Returns:
         idf_path (unchanged) after saving the modified IDF.
     """
+    if native:
+        return optimize_idf_native(idf_path)
+
+    from eppy.modeleditor import IDF
+
     if idd_file is None:
         idd_file = config.IDD_FILE
 
@@ -70,6 +85,30 @@ def optimize_idf(idf_path: str, idd_file: str = None, ep_version: str = None) ->
     return idf_path
 
 
+def prepare_idf(idf_path: str) -> dict:
+    """
+    Preparation stage of a pipelined batch run (executed in a worker process).
+
+    Detects the IDF version, resolves the matching EnergyPlus install and
+    optimizes the file. An optimization failure is reported rather than
+    raised, so the simulation still runs on the unmodified IDF.
+
+    Args:
+        idf_path: Absolute path to the .idf file.
+
+    Returns:
+        dict: {'idf': str, 'version': str, 'ep_path': str, 'warning': str or None}
+    """
+    version = config.get_idf_version(idf_path)
+    paths = config.get_ep_paths(version)
+    warning = None
+    try:
+        optimize_idf(idf_path, paths['idd'], ep_version=version)
+    except Exception as e:
+        warning = f"{os.path.basename(idf_path)} — {e}"
+    return {'idf': idf_path, 'version': version, 'ep_path': paths['exe'], 'warning': warning}
+
+
 def _inject_sqlite_output(idf) -> None:
     """
     Ensures Output:SQLite is present in the IDF.
@@ -162,3 +201,143 @@ def _apply_simulation_fixes(idf) -> None:
             sc.Calculation_Frequency = 20  # recalculate every 20 days
         except Exception:
             pass
+
+
+# ---------------------------------------------------------------------------
+# Native optimizer: splice edits into the original file
+# ---------------------------------------------------------------------------
+
+class IDFSplicer:
+    """
+    Collects field edits and new objects for one IDF and writes them in one pass.
+
+    The file is decoded as latin-1 so character offsets are byte offsets and
+    every byte round-trips unchanged; only the spliced ranges differ.
+    """
+
+    def __init__(self, idf_path: str):
+        self.idf_path = idf_path
+        with open(idf_path, 'rb') as f:
+            self.content = f.read().decode('latin-1')
+        self.objects: dict[str, list[ObjectSpan]] = {}
+        for obj in scan_idf_objects(self.content):
+            self.objects.setdefault(obj.obj_type, []).append(obj)
+        self._edits: list[tuple[int, int, str]] = []   # (start, end, replacement)
+        self._appended: list[str] = []
+
+    def get(self, obj_type: str) -> list[ObjectSpan]:
+        """Existing objects of a type (uppercase)."""
+        return self.objects.get(obj_type, [])
+
+    def set_field(self, obj: ObjectSpan, index: int, value: str) -> None:
+        """Sets field `index` (0 = name) of an existing object, extending it if needed."""
+        if index < len(obj.fields):
+            start, end = obj.field_spans[index]
+            self._edits.append((start, end, value))
+        else:
+            padding = [''] * (index - len(obj.fields))
+            self._edits.append((obj.end, obj.end, ''.join(f',{p}' for p in padding + [value])))
+
+    def append_object(self, obj_type: str, fields: list[tuple[str, str]]) -> None:
+        """Appends a new object given as (value, field name comment) pairs."""
+        lines = [f'{obj_type},']
+        for i, (value, comment) in enumerate(fields):
+            sep = ';' if i == len(fields) - 1 else ','
+            lines.append(f'    {value + sep:<26}!- {comment}')
+        self._appended.append('\n'.join(lines))
+
+    @property
+    def changed(self) -> bool:
+        return bool(self._edits or self._appended)
+
+    def render(self) -> str:
+        """The edited file contents."""
+        parts = []
+        pos = 0
+        for start, end, replacement in sorted(self._edits, key=lambda e: (e[0], e[1])):
+            parts.append(self.content[pos:start])
+            parts.append(replacement)
+            pos = end
+        parts.append(self.content[pos:])
+        if self._appended:
+            tail = parts[-1]
+            if not tail.endswith('\n'):
+                parts.append('\n')
+            parts.append('\n' + '\n\n'.join(self._appended) + '\n')
+        return ''.join(parts)
+
+    def save(self) -> None:
+        """Atomically writes the edited file (no-op when nothing changed)."""
+        if not self.changed:
+            return
+        tmp_path = f'{self.idf_path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(self.render().encode('latin-1'))
+        os.replace(tmp_path, self.idf_path)
+
+
+def optimize_idf_native(idf_path: str) -> str:
+    """
+    optimize_idf() without eppy: same objects injected, same fixes applied.
+
+    Args:
+        idf_path: Absolute path to the .idf file.
+
+    Returns:
+        idf_path (unchanged) after saving the modified IDF.
+    """
+    idf = IDFSplicer(idf_path)
+
+    if not idf.get('OUTPUT:SQLITE'):
+        idf.append_object('Output:SQLite', [('SimpleAndTabular', 'Option Type')])
+        print("  [optimizer] Injected Output:SQLite")
+
+    existing_meters = {o.fields[0] for o in idf.get('OUTPUT:METER') if o.fields}
+    added = [m for m in REQUIRED_METERS if m not in existing_meters]
+    for meter in added:
+        idf.append_object('Output:Meter', [(meter, 'Key Name'), ('Monthly', 'Reporting Frequency')])
+    if added:
+        print(f"  [optimizer] Injected Output:Meter: {added}")
+
+    existing_vars = {tuple(o.fields[1:3]) for o in idf.get('OUTPUT:VARIABLE') if len(o.fields) >= 3}
+    added = [(v, freq) for v, freq in REQUIRED_OUTPUT_VARIABLES if (v, freq) not in existing_vars]
+    for var_name, freq in added:
+        idf.append_object('Output:Variable', [
+            ('*', 'Key Value'), (var_name, 'Variable Name'), (freq, 'Reporting Frequency'),
+        ])
+    if added:
+        print(f"  [optimizer] Injected Output:Variable ({len(added)} variables)")
+
+    _apply_simulation_fixes_native(idf)
+
+    idf.save()
+    print(f"  [optimizer] Saved: {os.path.basename(idf_path)}")
+    return idf_path
+
+
+def _apply_simulation_fixes_native(idf: IDFSplicer) -> None:
+    """_apply_simulation_fixes() on field positions instead of IDD field names."""
+    # 1. Timestep — 4 per hour
+    for ts in idf.get('TIMESTEP'):
+        if not ts.fields or ts.fields[0] != '4':
+            idf.set_field(ts, 0, '4')
+
+    # 2. Solar Distribution (Building field 6) — FullExterior
+    for bld in idf.get('BUILDING'):
+        if len(bld.fields) > 5 and bld.fields[5] == 'FullInteriorAndExterior':
+            idf.set_field(bld, 5, 'FullExterior')
+
+    # 3. Shadow Calculation — the "Calculation Frequency" field only exists
+    #    before EnergyPlus 9.3 (later versions renamed it, so eppy's
+    #    Calculation_Frequency assignment is a no-op there as well)
+    version = idf.get('VERSION')
+    if version and version[0].fields:
+        parts = version[0].fields[0].split('.')
+        try:
+            major_minor = (int(parts[0]), int(parts[1]) if len(parts) > 1 else 0)
+        except ValueError:
+            major_minor = (99, 0)
+        if major_minor < (9, 3):
+            for sc in idf.get('SHADOWCALCULATION'):
+                if len(sc.fields) < 2 or sc.fields[1] != '20':
+                    idf.set_field(sc, 1, '20')
@@ -13,6 +13,7 @@ import os
 import sqlite3
 import json
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 from collections import OrderedDict
 from typing import Optional, List, Dict
@@ -79,6 +80,31 @@ def get_tabular_data(conn, table_name: str) -> pd.DataFrame:
 # EUI calculation (Phase 4)
 # ---------------------------------------------------------------------------
 
+# Tabular energy units → kWh as (multiplier, divisor); J keeps an exact division by 3.6e6
+_UNIT_TO_KWH = pd.DataFrame.from_dict({
+    'GJ':   (277.778, 1.0),        # Primary E+ tabular unit
+    'kWh':  (1.0, 1.0),
+    'J':    (1.0, 3_600_000.0),
+    'kBtu': (0.293071, 1.0),
+    'Btu':  (0.000293071, 1.0),
+    'MJ':   (0.277778, 1.0),
+}, orient='index', columns=['multiplier', 'divisor'])
+
+# Rows of 'End Uses By Subcategory', or 'End Uses' when that table is absent,
+# without water-volume columns (m³)
+_END_USE_QUERY = """
+SELECT RowName, Units, Value
+FROM TabularDataWithStrings
+WHERE TableName = (
+    SELECT TableName FROM TabularDataWithStrings
+    WHERE TableName IN ('End Uses By Subcategory', 'End Uses')
+    ORDER BY TableName = 'End Uses'
+    LIMIT 1)
+  AND instr(COALESCE(ColumnName, ''), 'Water') = 0
+  AND instr(COALESCE(Units, ''), 'm3') = 0
+"""
+
+
 def calculate_eui(conn) -> dict:
     """
     Calculates EUI, floor area, and disaggregated end-uses from an open SQL connection.
@@ -88,6 +114,9 @@ def calculate_eui(conn) -> dict:
       TabularDataWithStrings['End Uses By Subcategory']   → energy per end-use (GJ → kWh)
       Fallback: TabularDataWithStrings['End Uses']         if subcategory table is empty
 
+    Rows are filtered in SQL and converted column-wise; sums are accumulated
+    in row order, so totals match a row-by-row loop exactly.
+
     Returns:
         {
           'eui': float,                    # kWh/m²  (total / conditioned area)
@@ -109,84 +138,35 @@ def calculate_eui(conn) -> dict:
 
     # --- 1. Floor areas ---
     area_df = get_tabular_data(conn, 'Building Area')
-    if not area_df.empty:
-        for _, row in area_df.iterrows():
-            try:
-                val = float(row['Value'])
-            except ValueError:
-                continue
-            units = row.get('Units', '')
-            # Convert ft² → m² for US-origin IDFs
-            if units in ('ft2', 'ft²'):
-                val = val * 0.092903
-            if row['RowName'] == 'Total Building Area':
-                results['total_floor_area'] = val
-            elif row['RowName'] == 'Net Conditioned Building Area':
-                results['conditioned_floor_area'] = val
-
-    # --- 2. End-use energy ---
-    query = """
-    SELECT TableName, RowName, ColumnName, Units, Value
-    FROM TabularDataWithStrings
-    WHERE TableName = ? OR TableName = ?
-    """
-    df = pd.read_sql_query(query, conn,
-                           params=('End Uses By Subcategory', 'End Uses'))
-
-    # Prefer subcategory table; fall back to aggregate table for older IDFs
-    target = 'End Uses By Subcategory'
-    subset = df[df['TableName'] == target]
-    if subset.empty:
-        target = 'End Uses'
-        subset = df[df['TableName'] == target]
-
-    total_energy = 0.0
-    end_uses = OrderedDict()
-
-    for _, row in subset.iterrows():
-        row_name = row['RowName']
-        col_name = row['ColumnName']
-        units = row['Units']
-        val_str = row['Value']
-
-        # Skip water-volume columns (m³)
-        if 'Water' in col_name or 'm3' in str(units):
-            continue
-
-        try:
-            val = float(val_str)
-        except ValueError:
-            continue
-
-        # Unit conversion → kWh
-        if units == 'GJ':
-            val_kwh = val * 277.778      # Primary E+ tabular unit
-        elif units == 'kWh':
-            val_kwh = val
-        elif units == 'J':
-            val_kwh = val / 3_600_000
-        elif units == 'kBtu':
-            val_kwh = val * 0.293071
-        elif units == 'Btu':
-            val_kwh = val * 0.000293071
-        elif units == 'MJ':
-            val_kwh = val * 0.277778
-        else:
-            val_kwh = val  # unknown unit — pass through
-
-        if val_kwh == 0:
-            continue
-
-        total_energy += val_kwh
-
-        # Parse category name
-        if ':' in row_name:
-            cat, sub = row_name.split(':', 1)
-            eu_cat = cat.strip() if sub.strip() in ('General', 'Other', '') else sub.strip()
-        else:
-            eu_cat = row_name
-
-        end_uses[eu_cat] = end_uses.get(eu_cat, 0.0) + val_kwh
+    areas = _to_float(area_df['Value'])
+    # Convert ft² → m² for US-origin IDFs
+    areas = np.where(area_df['Units'].isin(('ft2', 'ft²')), areas * 0.092903, areas)
+    area_rows = area_df['RowName'].to_numpy()
+    for row_name, key in (('Total Building Area', 'total_floor_area'),
+                          ('Net Conditioned Building Area', 'conditioned_floor_area')):
+        found = np.flatnonzero((area_rows == row_name) & ~np.isnan(areas))
+        if len(found):
+            results[key] = float(areas[found[-1]])
+
+    # --- 2. End-use energy (table choice and water-volume filter in SQL) ---
+    df = pd.read_sql_query(_END_USE_QUERY, conn)
+
+    # Unit conversion → kWh (unknown units pass through)
+    factors = _UNIT_TO_KWH.reindex(df['Units']).fillna(1.0).to_numpy()
+    values = _to_float(df['Value']) * factors[:, 0] / factors[:, 1]
+    keep = ~np.isnan(values) & (values != 0)
+    values = values[keep]
+
+    # Category per distinct row name (each name repeats once per fuel column)
+    name_codes, row_names = pd.factorize(df['RowName'].to_numpy()[keep])
+    row_categories = np.array([_end_use_category(n) for n in row_names], dtype=object)
+
+    # Group sums in first-appearance order; np.add.at adds row by row
+    codes, categories = pd.factorize(row_categories[name_codes])
+    sums = np.zeros(len(categories))
+    np.add.at(sums, codes, values)
+    total_energy = float(np.cumsum(values)[-1]) if len(values) else 0.0
+    end_uses = OrderedDict(zip(categories.tolist(), sums.tolist()))
 
     results['total_energy'] = round(total_energy, 3)
     results['end_uses'] = {k: round(v, 3) for k, v in end_uses.items()}
@@ -202,6 +182,19 @@ def calculate_eui(conn) -> dict:
     return results
 
 
+def _to_float(values: pd.Series) -> np.ndarray:
+    """Parses tabular value strings; non-numeric entries become NaN."""
+    return pd.to_numeric(values, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+
+
+def _end_use_category(row_name: str) -> str:
+    """'Heating:General' → 'Heating', 'Interior Equipment:Elevators' → 'Elevators'."""
+    if ':' in row_name:
+        cat, sub = row_name.split(':', 1)
+        return cat.strip() if sub.strip() in ('General', 'Other', '') else sub.strip()
+    return row_name
+
+
 # ---------------------------------------------------------------------------
 # Process single result directory (Phase 4 orchestrator)
 # ---------------------------------------------------------------------------
@@ -346,6 +339,77 @@ def plot_eui_breakdown(eui_results: dict, output_path: str) -> None:
     plt.close()
 
 
+# ---------------------------------------------------------------------------
+# Run-period ReportData extraction
+# ---------------------------------------------------------------------------
+
+# Dictionary filters (SQL) of the monthly meters and the hourly outputs kept
+_MONTHLY_DICTIONARY = "ReportingFrequency = 5 OR ReportingFrequency = 'Monthly'"
+# Hourly: only the relevant meters, to reduce memory usage
+_HOURLY_DICTIONARY = """
+(ReportingFrequency = 3 OR ReportingFrequency = 'Hourly')
+AND (instr(Name, 'EnergyTransfer') > 0 OR instr(Name, 'Electricity') > 0
+     OR instr(Name, 'WaterSystems') > 0)
+"""
+
+# Meter units converted to kWh; other units are returned as reported
+_METER_UNIT_TO_KWH = _UNIT_TO_KWH.loc[['J', 'GJ', 'kBtu']]
+
+
+def _dictionary_entries(conn, where: str) -> pd.DataFrame:
+    """ReportDataDictionary rows (index, name, units) matching a SQL filter."""
+    query = f"""
+    SELECT ReportDataDictionaryIndex, Name, Units
+    FROM ReportDataDictionary
+    WHERE {where}
+    """
+    return pd.read_sql_query(query, conn)
+
+
+def _run_period_matrix(conn, meta_df: pd.DataFrame, where: str):
+    """
+    Reads the run-period ReportData of the dictionary entries matching `where`
+    as a (timesteps × entries) matrix, columns in meta_df order.
+
+    Only rows of the wanted entries leave SQLite; they are pivoted by
+    TimeIndex in one pass instead of being filtered once per entry.
+
+    Returns:
+        (matrix, filled): float matrix (NaN where an entry has no value at a
+        timestep) and the boolean mask of the cells that were reported.
+    """
+    query = f"""
+    SELECT rd.ReportDataDictionaryIndex, rd.TimeIndex, rd.Value
+    FROM ReportData rd
+    JOIN Time t ON rd.TimeIndex = t.TimeIndex
+    JOIN EnvironmentPeriods ep ON t.EnvironmentPeriodIndex = ep.EnvironmentPeriodIndex
+    WHERE ep.EnvironmentType = 3
+      AND rd.ReportDataDictionaryIndex IN (
+          SELECT ReportDataDictionaryIndex FROM ReportDataDictionary WHERE {where})
+    """
+    data_df = pd.read_sql_query(query, conn)
+
+    # Rows: timesteps in TimeIndex order; columns: dictionary entries
+    _, rows = np.unique(data_df['TimeIndex'].to_numpy(), return_inverse=True)
+    cols = pd.Index(meta_df['ReportDataDictionaryIndex']).get_indexer(
+        data_df['ReportDataDictionaryIndex'])
+    shape = (rows.max() + 1 if len(rows) else 0, len(meta_df))
+    matrix = np.full(shape, np.nan)
+    filled = np.zeros(shape, dtype=bool)
+    matrix[rows, cols] = data_df['Value'].to_numpy(dtype=float, na_value=np.nan)
+    filled[rows, cols] = True
+    return matrix, filled
+
+
+def _matrix_to_dict(meta_df: pd.DataFrame, matrix: np.ndarray,
+                    filled: np.ndarray) -> Dict[str, List[float]]:
+    """Maps each entry name to the list of its reported values."""
+    results = {}
+    for col, name in enumerate(meta_df['Name']):
+        results[name] = matrix[filled[:, col], col].tolist()
+    return results
+
+
 # ---------------------------------------------------------------------------
 # Monthly meter data extraction
 # ---------------------------------------------------------------------------
@@ -357,48 +421,20 @@ def get_meter_data(conn) -> Dict[str, List[float]]:
     Returns:
         Dict mapping meter name → list of monthly kWh values (12 items for annual run).
     """
-    query_meta = """
-    SELECT ReportDataDictionaryIndex, KeyValue, Name, Units
-    FROM ReportDataDictionary
-    WHERE ReportingFrequency = 5 OR ReportingFrequency = 'Monthly'
-    """
     try:
-        meta_df = pd.read_sql_query(query_meta, conn)
+        meta_df = _dictionary_entries(conn, _MONTHLY_DICTIONARY)
     except Exception as e:
         print(f"  [plotting] Error querying meter dictionary: {e}")
         return {}
-
-    index_map = {
-        row['ReportDataDictionaryIndex']: (row['Name'], row['Units'])
-        for _, row in meta_df.iterrows()
-    }
-    if not index_map:
+    if meta_df.empty:
         return {}
 
-    query_data = """
-    SELECT rd.ReportDataDictionaryIndex, rd.Value
-    FROM ReportData rd
-    JOIN Time t ON rd.TimeIndex = t.TimeIndex
-    JOIN EnvironmentPeriods ep ON t.EnvironmentPeriodIndex = ep.EnvironmentPeriodIndex
-    WHERE ep.EnvironmentType = 3
-    ORDER BY t.TimeIndex ASC
-    """
-    data_df = pd.read_sql_query(query_data, conn)
-
-    results = {}
-    for idx, (name, units) in index_map.items():
-        subset = data_df[data_df['ReportDataDictionaryIndex'] == idx]
-        values = subset['Value'].tolist()
-        # Convert to kWh
-        if units == 'J':
-            values = [v / 3_600_000.0 for v in values]
-        elif units == 'GJ':
-            values = [v * 277.778 for v in values]
-        elif units == 'kBtu':
-            values = [v * 0.293071 for v in values]
-        results[name] = values
+    matrix, filled = _run_period_matrix(conn, meta_df, _MONTHLY_DICTIONARY)
 
-    return results
+    # Convert to kWh, column by column
+    factors = _METER_UNIT_TO_KWH.reindex(meta_df['Units']).fillna(1.0).to_numpy()
+    matrix = matrix * factors[:, 0] / factors[:, 1]
+    return _matrix_to_dict(meta_df, matrix, filled)
 
 
 # ---------------------------------------------------------------------------
@@ -412,39 +448,12 @@ def get_hourly_meter_data(conn) -> Dict[str, List[float]]:
     Returns:
         Dict mapping variable name → list of hourly values in Joules (up to 8760 items).
     """
-    query_meta = """
-    SELECT ReportDataDictionaryIndex, KeyValue, Name, Units
-    FROM ReportDataDictionary
-    WHERE ReportingFrequency = 3 OR ReportingFrequency = 'Hourly'
-    """
     try:
-        meta_df = pd.read_sql_query(query_meta, conn)
+        meta_df = _dictionary_entries(conn, _HOURLY_DICTIONARY)
     except Exception:
         return {}
-
-    index_map = {}
-    for _, row in meta_df.iterrows():
-        name = row['Name']
-        # Filter to relevant meters to reduce memory usage
-        if any(x in name for x in ['EnergyTransfer', 'Electricity', 'WaterSystems']):
-            index_map[row['ReportDataDictionaryIndex']] = (name, row['Units'])
-
-    if not index_map:
+    if meta_df.empty:
         return {}
 
-    query_data = """
-    SELECT rd.ReportDataDictionaryIndex, rd.Value
-    FROM ReportData rd
-    JOIN Time t ON rd.TimeIndex = t.TimeIndex
-    JOIN EnvironmentPeriods ep ON t.EnvironmentPeriodIndex = ep.EnvironmentPeriodIndex
-    WHERE ep.EnvironmentType = 3
-    ORDER BY t.TimeIndex ASC
-    """
-    data_df = pd.read_sql_query(query_data, conn)
-
-    results = {}
-    for idx, (name, units) in index_map.items():
-        subset = data_df[data_df['ReportDataDictionaryIndex'] == idx]
-        results[name] = subset['Value'].tolist()  # raw Joules (typical E+ hourly unit)
-
-    return results
+    matrix, filled = _run_period_matrix(conn, meta_df, _HOURLY_DICTIONARY)
+    return _matrix_to_dict(meta_df, matrix, filled)  # raw Joules (typical E+ hourly unit)
@@ -0,0 +1,296 @@
+"""
+scheduler.py — Runtime-aware ordering of EnergyPlus batches.
+
+Every job gets a predicted runtime from features of its IDF: zone and
+surface counts, timestep, simulated days and HVAC object count. The
+prediction starts from a simple work model and is refined by the actual
+timings of earlier runs, kept in a JSON history file:
+
+- a model that ran before with the same features is predicted from its
+  own past timings;
+- any other model uses the work model scaled by the median seconds per
+  work unit observed on this machine.
+
+Jobs are dispatched longest-predicted-first (LPT), so a large model never
+starts last and finishes alone while the other workers sit idle.
+
+Peak memory is predicted the same way, from a size-based prior calibrated
+by the peak RSS recorded for earlier runs. The batch runners use it to
+keep the concurrent jobs within a share of the memory available when the
+batch starts.
+"""
+import datetime
+import heapq
+import json
+import os
+import statistics
+
+from BEM_utils import config
+from idf_parser import parse_idf
+
+HISTORY_FORMAT = 1
+
+# Work model: timestep × simulated days × (zones + weighted surfaces + weighted HVAC objects)
+SURFACE_WEIGHT = 0.1
+HVAC_WEIGHT = 0.05
+# A design day is simulated with warm-up days until convergence
+DESIGN_DAY_WEIGHT = 3.0
+# Prior seconds per work unit, replaced by the history median after the first runs
+DEFAULT_SECONDS_PER_UNIT = 1.2e-3
+# Weight of the newest timing when a model's own history is updated
+HISTORY_SMOOTHING = 0.5
+
+# Memory prior (bytes): engine baseline + per zone / surface / HVAC object
+MEMORY_BASE = 150 * 1024 ** 2
+MEMORY_PER_ZONE = 2 * 1024 ** 2
+MEMORY_PER_SURFACE = 200 * 1024
+MEMORY_PER_HVAC_OBJECT = 100 * 1024
+# Headroom on a model's own recorded peak
+MEMORY_MARGIN = 1.15
+
+_SURFACE_TYPES = {
+    'WINDOW', 'DOOR', 'GLAZEDDOOR', 'ROOF',
+    'WINDOW:INTERZONE', 'DOOR:INTERZONE', 'GLAZEDDOOR:INTERZONE',
+}
+_SURFACE_PREFIXES = (
+    'BUILDINGSURFACE:', 'FENESTRATIONSURFACE:', 'WALL:', 'ROOFCEILING:',
+    'FLOOR:', 'CEILING:', 'SHADING:',
+)
+_HVAC_PREFIXES = (
+    'AIRLOOPHVAC', 'AIRTERMINAL:', 'ZONEHVAC:', 'COIL:', 'FAN:', 'PUMP:',
+    'CHILLER:', 'BOILER:', 'PLANTLOOP', 'CONDENSERLOOP', 'COOLINGTOWER:',
+    'HEATEXCHANGER:', 'HUMIDIFIER:', 'CONTROLLER:', 'SETPOINTMANAGER:',
+    'HVACTEMPLATE:', 'WATERHEATER:', 'BRANCH', 'CONNECTOR:', 'PIPE:', 'DUCT',
+)
+
+
+def _int(value, default: int) -> int:
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return default
+
+
+def _run_period_days(fields: list, new_layout: bool) -> int:
+    """Days covered by one RunPeriod (E+ 9.0 added the begin/end year fields)."""
+    if new_layout:
+        bm, bd, em, ed = (fields[i] if len(fields) > i else '' for i in (1, 2, 4, 5))
+    else:
+        bm, bd, em, ed = (fields[i] if len(fields) > i else '' for i in (1, 2, 3, 4))
+    try:
+        begin = datetime.date(2023, _int(bm, 1), _int(bd, 1))
+        end = datetime.date(2023, _int(em, 12), _int(ed, 31))
+    except ValueError:
+        return 365
+    days = (end - begin).days + 1
+    return days if days > 0 else days + 365
+
+
+def idf_features(idf_path: str) -> dict:
+    """
+    Extracts the runtime-relevant features of an IDF.
+
+    Args:
+        idf_path: Path to the .idf file.
+
+    Returns:
+        dict: {'zones': int, 'surfaces': int, 'timestep': int, 'run_days': int,
+               'design_days': int, 'hvac_objects': int}
+    """
+    data = parse_idf(idf_path)
+
+    version = (data.get('VERSION') or [['']])[0]
+    major = _int(version[0].split('.')[0] if version else '', 24)
+
+    surfaces = 0
+    hvac_objects = 0
+    for obj_type, objects in data.items():
+        if obj_type in _SURFACE_TYPES or obj_type.startswith(_SURFACE_PREFIXES):
+            surfaces += len(objects)
+        elif obj_type.startswith(_HVAC_PREFIXES):
+            hvac_objects += len(objects)
+
+    timestep = 6
+    for ts in data.get('TIMESTEP', []):
+        timestep = _int(ts[0] if ts else '', 6) or 6
+
+    # SimulationControl field 4: Run Simulation for Weather File Run Periods
+    run_weather = True
+    for sc in data.get('SIMULATIONCONTROL', []):
+        if len(sc) > 4 and sc[4].strip().upper() == 'NO':
+            run_weather = False
+    run_days = 0
+    if run_weather:
+        run_days = sum(_run_period_days(rp, major >= 9) for rp in data.get('RUNPERIOD', []))
+
+    return {
+        'zones': len(data.get('ZONE', [])),
+        'surfaces': surfaces,
+        'timestep': timestep,
+        'run_days': run_days,
+        'design_days': len(data.get('SIZINGPERIOD:DESIGNDAY', [])),
+        'hvac_objects': hvac_objects,
+    }
+
+
+def work_units(features: dict) -> float:
+    """Relative simulation cost of a model, before calibration."""
+    days = features['run_days'] + DESIGN_DAY_WEIGHT * features['design_days']
+    size = (features['zones'] + SURFACE_WEIGHT * features['surfaces']
+            + HVAC_WEIGHT * features['hvac_objects'])
+    return max(features['timestep'], 1) * max(days, 1) * max(size, 1)
+
+
+def memory_prior(features: dict) -> float:
+    """Uncalibrated peak memory estimate of a model, in bytes."""
+    return (MEMORY_BASE + MEMORY_PER_ZONE * features['zones']
+            + MEMORY_PER_SURFACE * features['surfaces']
+            + MEMORY_PER_HVAC_OBJECT * features['hvac_objects'])
+
+
+def available_memory():
+    """Memory available to new processes in bytes, or None when unknown."""
+    try:
+        with open('/proc/meminfo', 'r') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def expected_makespan(durations: list, workers: int) -> float:
+    """
+    Wall time of running jobs in the given order on `workers` slots, each
+    job starting on the first slot that becomes free.
+    """
+    if not durations:
+        return 0.0
+    slots = [0.0] * max(1, min(workers, len(durations)))
+    for d in durations:
+        heapq.heapreplace(slots, slots[0] + d)
+    return max(slots)
+
+
+class RuntimeModel:
+    """
+    Runtime and peak memory predictions refined by previous runs.
+
+    Args:
+        history_path: JSON history file (default config.SIM_TIMINGS_FILE).
+    """
+
+    def __init__(self, history_path: str = None):
+        self.history_path = history_path or config.SIM_TIMINGS_FILE
+        self.runs = {}
+        try:
+            with open(self.history_path, 'r', encoding='utf-8') as f:
+                history = json.load(f)
+            if history.get('format') == HISTORY_FORMAT:
+                self.runs = history.get('runs', {})
+        except (OSError, ValueError):
+            pass
+        self._dirty = False
+
+    def seconds_per_unit(self) -> float:
+        """Median observed seconds per work unit (the prior without history)."""
+        rates = [run['seconds'] / work_units(run['features'])
+                 for run in self.runs.values() if run.get('seconds', 0) > 0]
+        return statistics.median(rates) if rates else DEFAULT_SECONDS_PER_UNIT
+
+    def predict(self, name: str, features: dict) -> float:
+        """Predicted runtime in seconds of the model `name` with these features."""
+        run = self.runs.get(name)
+        if run and run.get('features') == features:
+            return run['seconds']
+        return self.seconds_per_unit() * work_units(features)
+
+    def memory_ratio(self) -> float:
+        """Median recorded peak over the memory prior (1.0 without history)."""
+        ratios = [run['peak_bytes'] / memory_prior(run['features'])
+                  for run in self.runs.values() if run.get('peak_bytes')]
+        return statistics.median(ratios) if ratios else 1.0
+
+    def predict_memory(self, name: str, features: dict) -> float:
+        """Predicted peak memory in bytes of the model `name` with these features."""
+        run = self.runs.get(name)
+        if run and run.get('features') == features and run.get('peak_bytes'):
+            return run['peak_bytes'] * MEMORY_MARGIN
+        return self.memory_ratio() * memory_prior(features)
+
+    def record(self, name: str, features: dict, seconds: float, peak_bytes: int = None) -> None:
+        """Adds the actual runtime (and peak RSS) of a finished (non-cached) simulation."""
+        run = self.runs.get(name)
+        if run and run.get('features') == features:
+            seconds = HISTORY_SMOOTHING * seconds + (1 - HISTORY_SMOOTHING) * run['seconds']
+            peak_bytes = max(peak_bytes or 0, run.get('peak_bytes') or 0)
+        entry = {'features': features, 'seconds': round(seconds, 3)}
+        if peak_bytes:
+            entry['peak_bytes'] = int(peak_bytes)
+        self.runs[name] = entry
+        self._dirty = True
+
+    def save(self) -> None:
+        """Writes the history atomically (no-op when nothing was recorded)."""
+        if not self._dirty:
+            return
+        os.makedirs(os.path.dirname(self.history_path) or '.', exist_ok=True)
+        tmp_path = f"{self.history_path}.tmp{os.getpid()}"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'format': HISTORY_FORMAT, 'runs': self.runs}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.history_path)
+        self._dirty = False
+
+
+def plan_jobs(jobs: list, model: RuntimeModel) -> list:
+    """
+    Annotates jobs with 'features', 'predicted' (seconds) and 'memory'
+    (bytes) and returns them longest-predicted-first.
+
+    Args:
+        jobs:  Job dicts with at least 'idf' (and optionally 'name').
+        model: RuntimeModel used for the predictions.
+
+    Returns:
+        list: The same job dicts, sorted by descending predicted runtime.
+    """
+    for job in jobs:
+        annotate_job(job, model)
+    return sorted(jobs, key=lambda j: j['predicted'], reverse=True)
+
+
+def annotate_job(job: dict, model: RuntimeModel) -> dict:
+    """Adds 'features', 'predicted' and 'memory' to one job dict (unreadable IDFs predict 0 s)."""
+    name = job.get('name') or os.path.basename(job['idf'])
+    try:
+        job['features'] = idf_features(job['idf'])
+        job['predicted'] = model.predict(name, job['features'])
+        job['memory'] = model.predict_memory(name, job['features'])
+    except (OSError, ValueError):
+        job['features'] = None
+        job['predicted'] = 0.0
+        job['memory'] = float(MEMORY_BASE)
+    return job
+
+
+def format_bytes(n: float) -> str:
+    """'1.4 GB' or '350 MB'."""
+    if n >= 1024 ** 3:
+        return f"{n / 1024 ** 3:.1f} GB"
+    return f"{n / 1024 ** 2:.0f} MB"
+
+
+def format_duration(seconds: float) -> str:
+    """'1h02m', '12m05s' or '42s'."""
+    seconds = int(round(seconds))
+    hours, rem = divmod(seconds, 3600)
+    mins, secs = divmod(rem, 60)
+    if hours:
+        return f"{hours}h{mins:02d}m"
+    if mins:
+        return f"{mins}m{secs:02d}s"
+    return f"{secs}s"
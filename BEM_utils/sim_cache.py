@@ -0,0 +1,194 @@
+"""
+sim_cache.py — Content-addressed EnergyPlus result cache.
+
+A simulation is fully determined by the (optimized) IDF, the weather file
+and the EnergyPlus engine. The cache key is the SHA-256 of those three
+digests; each entry keeps eplusout.sql and the other key outputs plus an
+entry.json recording the input digests.
+
+Layout:
+    <cache_dir>/<key[:2]>/<key>/entry.json
+    <cache_dir>/<key[:2]>/<key>/eplusout.sql, eplusout.err, ...
+
+Entries are written to a temporary directory and renamed into place, so
+parallel workers never see a partial entry. When the cache grows past its
+size limit, the least recently used entries are evicted.
+"""
+import hashlib
+import json
+import os
+import shutil
+import time
+
+from BEM_utils import config
+from metadata_store import file_digest
+
+CACHE_FORMAT = 1
+
+# Outputs kept per entry (eplusout.sql is required, the rest when present)
+CACHED_OUTPUTS = config.SIM_RETAINED_OUTPUTS
+
+_ENTRY_FILE = 'entry.json'
+
+# Engine digests, computed once per executable (path, size, mtime)
+_engine_digests: dict = {}
+
+
+def engine_digest(ep_exe: str) -> str:
+    """SHA-256 of the EnergyPlus executable, memoized per file version."""
+    st = os.stat(ep_exe)
+    key = (os.path.realpath(ep_exe), st.st_size, st.st_mtime_ns)
+    if key not in _engine_digests:
+        _engine_digests[key] = file_digest(ep_exe)
+    return _engine_digests[key]
+
+
+def cache_key(idf_path: str, epw_path: str, ep_exe: str) -> tuple:
+    """
+    Returns the cache key of a simulation and the digests it is built from.
+
+    Returns:
+        (key, {'idf': str, 'epw': str, 'engine': str})
+    """
+    digests = {
+        'idf': file_digest(idf_path),
+        'epw': file_digest(epw_path),
+        'engine': engine_digest(ep_exe),
+    }
+    h = hashlib.sha256(str(CACHE_FORMAT).encode())
+    for name in ('idf', 'epw', 'engine'):
+        h.update(digests[name].encode())
+    return h.hexdigest(), digests
+
+
+def _entry_dir(cache_dir: str, key: str) -> str:
+    return os.path.join(cache_dir, key[:2], key)
+
+
+def _read_entry(entry_dir: str):
+    try:
+        with open(os.path.join(entry_dir, _ENTRY_FILE), 'r', encoding='utf-8') as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return entry if entry.get('format') == CACHE_FORMAT else None
+
+
+def lookup(cache_dir: str, key: str, output_dir: str):
+    """
+    Copies a cached result into output_dir.
+
+    Args:
+        cache_dir:  Cache root directory.
+        key:        Key from cache_key().
+        output_dir: Simulation output directory to populate.
+
+    Returns:
+        The entry dict on a hit, None on a miss.
+    """
+    entry_dir = _entry_dir(cache_dir, key)
+    entry = _read_entry(entry_dir)
+    if entry is None:
+        return None
+    os.makedirs(output_dir, exist_ok=True)
+    try:
+        for name in entry['files']:
+            shutil.copy2(os.path.join(entry_dir, name), os.path.join(output_dir, name))
+    except OSError:
+        return None
+    # Mark as recently used for eviction
+    os.utime(os.path.join(entry_dir, _ENTRY_FILE))
+    return entry
+
+
+def store(cache_dir: str, key: str, digests: dict, output_dir: str, name: str,
+          max_bytes: int = None) -> bool:
+    """
+    Adds the outputs of a successful simulation to the cache.
+
+    Args:
+        cache_dir:  Cache root directory.
+        key:        Key from cache_key().
+        digests:    Input digests from cache_key().
+        output_dir: Directory holding the finished simulation outputs.
+        name:       IDF file name, recorded for humans.
+        max_bytes:  Evict least recently used entries above this total size
+                    (default config.SIM_CACHE_MAX_BYTES; None or 0 disables).
+
+    Returns:
+        True if the entry was stored (False when eplusout.sql is missing).
+    """
+    if not os.path.exists(os.path.join(output_dir, 'eplusout.sql')):
+        return False
+    entry_dir = _entry_dir(cache_dir, key)
+    if _read_entry(entry_dir) is not None:
+        return True
+
+    os.makedirs(os.path.dirname(entry_dir), exist_ok=True)
+    tmp_dir = f"{entry_dir}.tmp{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    files = []
+    size = 0
+    for out_name in CACHED_OUTPUTS:
+        src = os.path.join(output_dir, out_name)
+        if os.path.exists(src):
+            shutil.copy2(src, os.path.join(tmp_dir, out_name))
+            files.append(out_name)
+            size += os.path.getsize(src)
+    entry = {
+        'format': CACHE_FORMAT,
+        'key': key,
+        'name': name,
+        'digests': digests,
+        'files': files,
+        'bytes': size,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+    with open(os.path.join(tmp_dir, _ENTRY_FILE), 'w', encoding='utf-8') as f:
+        json.dump(entry, f, indent=2)
+    try:
+        os.rename(tmp_dir, entry_dir)
+    except OSError:
+        # Another worker stored the same result first
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    if max_bytes is None:
+        max_bytes = config.SIM_CACHE_MAX_BYTES
+    if max_bytes:
+        evict(cache_dir, max_bytes)
+    return True
+
+
+def evict(cache_dir: str, max_bytes: int) -> int:
+    """
+    Removes least recently used entries until the cache fits in max_bytes.
+
+    Returns:
+        Number of entries removed.
+    """
+    entries = []
+    total = 0
+    if not os.path.isdir(cache_dir):
+        return 0
+    for prefix in os.listdir(cache_dir):
+        prefix_dir = os.path.join(cache_dir, prefix)
+        if not os.path.isdir(prefix_dir):
+            continue
+        for key in os.listdir(prefix_dir):
+            entry_dir = os.path.join(prefix_dir, key)
+            entry = _read_entry(entry_dir)
+            if entry is None:
+                continue
+            used = os.path.getmtime(os.path.join(entry_dir, _ENTRY_FILE))
+            entries.append((used, entry['bytes'], entry_dir))
+            total += entry['bytes']
+
+    removed = 0
+    for used, size, entry_dir in sorted(entries):
+        if total <= max_bytes:
+            break
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        total -= size
+        removed += 1
+    return removed
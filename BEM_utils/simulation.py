@@ -4,27 +4,47 @@ simulation.py — EnergyPlus Simulation Runner (Phase 3).
 Provides:
 - run_simulation()            Single IDF simulation with ExpandObjects support
 - run_simulations_parallel()  ProcessPoolExecutor-based parallel batch runner
+- run_simulations_pipelined() Preparation and simulation as overlapping stages
+
+Both batch runners dispatch the longest predicted simulations first and
+record actual runtimes for later predictions (see scheduler.py).
 """
+import multiprocessing
 import os
-import subprocess
+import queue
 import platform
 import shutil
+import sys
+import tempfile
 import time
 import threading
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+
+from BEM_utils import config, eplus_monitor, scheduler, sim_cache
 
 
-def run_simulation(idf_path, epw_path, output_dir, ep_path, n_jobs=1, quiet=False):
+def run_simulation(idf_path, epw_path, output_dir, ep_path, n_jobs=1, quiet=False,
+                   use_cache=True, cache_dir=None, scratch_dir=None, progress=None,
+                   run_days=365, stall_timeout=None):
     """
     Runs a single EnergyPlus simulation.
 
     Pipeline:
-      1. Create output_dir
-      2. Copy IDF  →  output_dir/in.idf
-      3. Copy Energy+.idd  →  output_dir/  (required by ExpandObjects)
-      4. Run ExpandObjects (expands HVACTemplate:* objects; no-op if none present)
-      5. Determine simulation IDF (expanded.idf if it exists, else in.idf)
-      6. Run EnergyPlus
+      1. Create output_dir; return the cached outputs if the result cache
+         already holds a run of the same IDF, weather file and engine
+         (see sim_cache.py)
+      2. Create a run directory in scratch_dir (or use output_dir)
+      3. Link IDF  →  run_dir/in.idf
+      4. Link Energy+.idd  →  run_dir/  (required by ExpandObjects)
+      5. Run EnergyPlus with -x (expands HVACTemplate:* objects first),
+         following its output (see eplus_monitor.py): progress is published
+         to `progress`, and the run is killed on a fatal error or after
+         stall_timeout seconds without output
+      6. Move the retained outputs (config.SIM_RETAINED_OUTPUTS) from the
+         scratch run directory to output_dir, also when the run fails
+
+    Links are hard links where possible, symlinks across filesystems, and
+    copies only as a last resort.
 
     Args:
         idf_path:   Path to the (already optimized) IDF file.
@@ -33,9 +53,22 @@ def run_simulation(idf_path, epw_path, output_dir, ep_path, n_jobs=1, quiet=Fals
         ep_path:    Path to EnergyPlus executable OR its directory.
         n_jobs:     Internal EnergyPlus thread count (-j flag).
         quiet:      Suppress verbose stdout/stderr (useful for parallel runs).
+        use_cache:  Reuse and record results in the simulation result cache.
+        cache_dir:  Cache directory (default config.SIM_CACHE_DIR).
+        scratch_dir: Parent of the temporary run directory (default
+                    config.SIM_SCRATCH_DIR; empty runs in output_dir and
+                    keeps every output).
+        progress:   Optional shared mapping; progress[name] = (percent, phase)
+                    while the simulation runs.
+        run_days:   Run period length, used to scale the percentage.
+        stall_timeout: Seconds without output before the run is killed
+                    (default config.SIM_STALL_TIMEOUT; 0 disables).
 
     Returns:
-        dict: {'success': bool, 'name': str, 'message': str, 'output_dir': str}
+        dict: {'success': bool, 'name': str, 'message': str, 'output_dir': str,
+               'cached': bool, 'elapsed': float (EnergyPlus run seconds),
+               'peak_bytes': int or None (EnergyPlus peak RSS),
+               'aborted': bool (failures only)}
     """
     name = os.path.basename(idf_path)
 
@@ -58,40 +91,97 @@ def run_simulation(idf_path, epw_path, output_dir, ep_path, n_jobs=1, quiet=Fals
                 print(f"  [ERROR] {msg}")
             return {'success': False, 'name': name, 'message': msg, 'output_dir': output_dir}
 
-        # Copy IDF into output_dir
-        in_idf_path = os.path.join(output_dir, 'in.idf')
-        shutil.copy2(idf_path, in_idf_path)
-
-        # Copy Energy+.idd — required for ExpandObjects to find the schema
-        idd_path = os.path.join(ep_dir, 'Energy+.idd')
-        if os.path.exists(idd_path):
-            shutil.copy2(idd_path, os.path.join(output_dir, 'Energy+.idd'))
-        elif not quiet:
-            print(f"  [WARNING] Energy+.idd not found at {idd_path} — ExpandObjects may fail if needed.")
-
-        # Build EnergyPlus command
-        # We use -x to let EnergyPlus handle ExpandObjects internally if needed.
-        # This is more robust than calling the ExpandObjects binary directly.
-        cmd = [ep_exe, '-w', epw_path, '-d', output_dir, '-x']
-        if n_jobs > 1:
-            cmd += ['-j', str(n_jobs)]
-        cmd.append(in_idf_path)
+        # Reuse the outputs of an identical earlier run
+        if use_cache:
+            cache_dir = cache_dir or config.SIM_CACHE_DIR
+            key, digests = sim_cache.cache_key(idf_path, epw_path, ep_exe)
+            if sim_cache.lookup(cache_dir, key, output_dir) is not None:
+                msg = f"Cached result reused: {name}"
+                if not quiet:
+                    print(f"  [CACHE] {msg}")
+                return {'success': True, 'name': name, 'message': msg, 'output_dir': output_dir,
+                        'cached': True, 'elapsed': 0.0}
+
+        run_dir = _make_run_dir(output_dir, name, scratch_dir)
+        collect_error = None
+        try:
+            # The IDF and IDD are read-only inputs: link instead of copying
+            in_idf_path = os.path.join(run_dir, 'in.idf')
+            _link_or_copy(idf_path, in_idf_path)
+
+            # Energy+.idd — required for ExpandObjects to find the schema
+            idd_path = os.path.join(ep_dir, 'Energy+.idd')
+            if os.path.exists(idd_path):
+                _link_or_copy(idd_path, os.path.join(run_dir, 'Energy+.idd'))
+            elif not quiet and not _is_script(ep_exe):
+                print(f"  [WARNING] Energy+.idd not found at {idd_path} — ExpandObjects may fail if needed.")
+
+            # Build EnergyPlus command
+            # We use -x to let EnergyPlus handle ExpandObjects internally if needed.
+            # This is more robust than calling the ExpandObjects binary directly.
+            cmd = [ep_exe, '-w', epw_path, '-d', run_dir, '-x']
+            if _is_script(ep_exe):
+                # Python stand-in engine (config.USE_FAKE_ENERGYPLUS)
+                cmd.insert(0, sys.executable)
+            if n_jobs > 1:
+                cmd += ['-j', str(n_jobs)]
+            cmd.append(in_idf_path)
 
-        if not quiet:
-            print(f"  Running EnergyPlus for: {name}")
+            if not quiet:
+                print(f"  Running EnergyPlus for: {name}")
+
+            def publish(percent, phase):
+                if progress is not None:
+                    progress[name] = (percent, phase)
+
+            run_start = time.time()
+            outcome = eplus_monitor.run_monitored(
+                cmd, os.path.join(run_dir, 'eplusout.err'), run_days=run_days,
+                on_progress=publish, echo=not quiet,
+                stall_timeout=config.SIM_STALL_TIMEOUT if stall_timeout is None else stall_timeout,
+            )
+            run_elapsed = time.time() - run_start
+        finally:
+            if run_dir != output_dir:
+                try:
+                    _collect_outputs(run_dir, output_dir)
+                except OSError as e:
+                    collect_error = e
+                finally:
+                    # Always free the scratch run (tmpfs holds it in RAM)
+                    shutil.rmtree(run_dir, ignore_errors=True)
+
+        if collect_error is not None:
+            msg = f"Simulation outputs could not be collected: {name} — {collect_error}"
+            if not quiet:
+                print(f"  [FAIL] {msg}")
+            return {'success': False, 'name': name, 'message': msg, 'output_dir': output_dir,
+                    'aborted': False}
+
+        if outcome['aborted'] or outcome['returncode'] != 0:
+            if outcome['aborted']:
+                msg = f"Simulation aborted: {name} — {outcome['aborted']}"
+            else:
+                detail = outcome['fatal'] or f"exit status {outcome['returncode']}"
+                msg = f"Simulation failed: {name} — {detail}"
+            if not quiet:
+                print(f"  [FAIL] {msg}")
+            return {'success': False, 'name': name, 'message': msg, 'output_dir': output_dir,
+                    'aborted': bool(outcome['aborted'])}
 
-        subprocess.run(cmd, check=True, capture_output=quiet)
+        if use_cache:
+            try:
+                sim_cache.store(cache_dir, key, digests, output_dir, name)
+            except OSError as e:
+                if not quiet:
+                    print(f"  [WARNING] Could not cache result for {name}: {e}")
 
         msg = f"Simulation completed: {name}"
         if not quiet:
             print(f"  [OK] {msg}")
-        return {'success': True, 'name': name, 'message': msg, 'output_dir': output_dir}
+        return {'success': True, 'name': name, 'message': msg, 'output_dir': output_dir,
+                'cached': False, 'elapsed': run_elapsed, 'peak_bytes': outcome['peak_bytes']}
 
-    except subprocess.CalledProcessError as e:
-        msg = f"Simulation failed: {name} — {e}"
-        if not quiet:
-            print(f"  [FAIL] {msg}")
-        return {'success': False, 'name': name, 'message': msg, 'output_dir': output_dir}
     except Exception as e:
         msg = f"Unexpected error for {name}: {e}"
         if not quiet:
@@ -99,6 +189,65 @@ def run_simulation(idf_path, epw_path, output_dir, ep_path, n_jobs=1, quiet=Fals
         return {'success': False, 'name': name, 'message': msg, 'output_dir': output_dir}
 
 
+def _is_script(ep_exe):
+    return ep_exe.endswith('.py')
+
+
+def _make_run_dir(output_dir, name, scratch_dir):
+    """Creates a private run directory under scratch_dir (output_dir if unset or unusable)."""
+    if scratch_dir is None:
+        scratch_dir = config.SIM_SCRATCH_DIR
+    if not scratch_dir:
+        return output_dir
+    try:
+        return tempfile.mkdtemp(prefix=f"bem_{os.path.splitext(name)[0]}_", dir=scratch_dir)
+    except OSError:
+        return output_dir
+
+
+def _link_or_copy(src, dst):
+    """Hard link, else symlink (across filesystems), else copy src to dst."""
+    if os.path.lexists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+        return
+    except OSError:
+        pass
+    try:
+        os.symlink(os.path.abspath(src), dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def _collect_outputs(run_dir, output_dir):
+    """
+    Moves the retained outputs of a scratch run into output_dir. Each file
+    appears at its final path complete or not at all.
+    """
+    if config.SIM_KEEP_ALL_OUTPUTS:
+        names = [n for n in os.listdir(run_dir) if n not in ('in.idf', 'Energy+.idd')]
+    else:
+        names = config.SIM_RETAINED_OUTPUTS
+    for out_name in names:
+        src = os.path.join(run_dir, out_name)
+        if not os.path.isfile(src):
+            continue
+        dst = os.path.join(output_dir, out_name)
+        try:
+            os.replace(src, dst)
+        except OSError:
+            # Different filesystem (e.g. tmpfs scratch): copy beside dst, then rename
+            part = f"{dst}.part"
+            try:
+                shutil.copy2(src, part)
+                os.replace(part, dst)
+            except OSError:
+                if os.path.exists(part):
+                    os.remove(part)
+                raise
+
+
 def _run_simulation_wrapper(args):
     """Pickle-safe wrapper for ProcessPoolExecutor (must be module-level)."""
     return run_simulation(
@@ -108,6 +257,10 @@ def _run_simulation_wrapper(args):
         ep_path=args['ep_path'],
         n_jobs=args.get('n_jobs', 1),
         quiet=args.get('quiet', True),
+        use_cache=args.get('use_cache', True),
+        scratch_dir=args.get('scratch_dir'),
+        progress=args.get('progress'),
+        run_days=(args.get('features') or {}).get('run_days') or 365,
     )
 
 
@@ -115,21 +268,27 @@ def run_simulations_parallel(simulation_jobs, ep_path, max_workers=None):
     """
     Runs multiple EnergyPlus simulations in parallel using ProcessPoolExecutor.
 
-    Each worker runs with n_jobs=1 to avoid CPU over-subscription:
+    Each job normally runs with n_jobs=1 to avoid CPU over-subscription:
     N parallel sims × 1 thread each = N total threads (correct).
     N parallel sims × M threads each = N×M total threads (too many).
+    Only the last jobs of a batch, when fewer remain than free workers, get
+    extra threads (config.SIM_TAIL_THREADS).
+
+    Jobs start longest-predicted-first, and only while their predicted
+    peak memory fits the batch memory budget (see _dispatch).
 
     Args:
         simulation_jobs: List of dicts with keys: 'idf', 'epw', 'output_dir', 'name'.
         ep_path:         Path to EnergyPlus executable or directory.
-        max_workers:     Max concurrent simulations (default: CPU count).
+        max_workers:     Max concurrent EnergyPlus threads (default: CPU count);
+                         the process pool is capped at the number of jobs.
 
     Returns:
         dict: {'successful': list, 'failed': list, 'total_time': float}
     """
-    if max_workers is None:
-        max_workers = os.cpu_count() or 4
-    max_workers = min(max_workers, len(simulation_jobs))
+    # Thread budget for _dispatch; only the process pool is capped at the job count
+    max_threads = max_workers or os.cpu_count() or 4
+    max_workers = min(max_threads, len(simulation_jobs))
 
     # Attach runtime args to each job copy
     jobs = []
@@ -141,59 +300,322 @@ def run_simulations_parallel(simulation_jobs, ep_path, max_workers=None):
         j['n_jobs'] = 1
         j['quiet'] = True
         jobs.append(j)
+    model = scheduler.RuntimeModel()
+    jobs = scheduler.plan_jobs(jobs, model)
+    memory_budget = _memory_budget()
 
     print(f"\n{'='*60}")
     print(f"Starting {len(jobs)} simulations with {max_workers} parallel workers")
+    _print_admission(max_threads, memory_budget, jobs)
     print(f"{'='*60}")
 
-    successful = []
-    failed = []
-    start_time = time.time()
-    completed = 0
+    ready = queue.PriorityQueue()
+    for seq, job in enumerate(jobs):
+        ready.put((-job['predicted'], seq, job))
+    ready.put((float('inf'), len(jobs), None))
+
+    # Workers publish per-job progress; a background thread prints it every 30 s
+    manager = multiprocessing.Manager()
+    progress = manager.dict()
+    for job in jobs:
+        job['progress'] = progress
+    batch = _BatchReport(len(jobs), model, progress)
+    dispatched = []
+    stop_event, monitor = _start_progress_monitor(batch.start_time, len(jobs),
+                                                  lambda: batch.completed, progress)
+    try:
+        _dispatch(ready, max_threads, dispatched, batch.report, memory_budget, max_workers)
+    finally:
+        stop_event.set()
+        monitor.join(timeout=1)
+        manager.shutdown()
+
+    return batch.summary(dispatched, max_workers)
+
+
+class _BatchReport:
+    """Collects and prints the results of a batch as its jobs complete."""
+
+    def __init__(self, total, model, progress):
+        self.total = total
+        self.model = model
+        self.progress = progress
+        self.successful = []
+        self.failed = []
+        self.completed = 0
+        self.start_time = time.time()
+
+    def report(self, future, job):
+        self.completed += 1
+        job_name = job.get('name', os.path.basename(job['idf']))
+        self.progress.pop(os.path.basename(job['idf']), None)
+        mins, secs = divmod(int(time.time() - self.start_time), 60)
+        prefix = f"  [{self.completed}/{self.total}]"
+        try:
+            result = future.result()
+            if result['success']:
+                self.successful.append(result)
+                _record_runtime(self.model, job, result)
+                tag = '[CACHE]' if result.get('cached') else '[OK]  '
+                print(f"{prefix} {tag} {job_name} ({mins:02d}:{secs:02d})")
+            else:
+                self.failed.append(result)
+                tag = '[KILL]' if result.get('aborted') else '[FAIL]'
+                print(f"{prefix} {tag} {job_name} ({mins:02d}:{secs:02d}) — {result['message']}")
+        except Exception as e:
+            self.failed.append({'name': job_name, 'message': str(e), 'success': False})
+            print(f"{prefix} [ERR]  {job_name} — {e}")
+
+    def summary(self, dispatched, max_workers):
+        elapsed = time.time() - self.start_time
+        print(f"\n{'='*60}")
+        print(f"SUMMARY  |  Total: {elapsed:.1f}s  |  OK: {len(self.successful)}  |  Failed: {len(self.failed)}")
+        _report_makespan(self.model, dispatched, max_workers, elapsed)
+        print(f"{'='*60}")
+        return {'successful': self.successful, 'failed': self.failed, 'total_time': elapsed}
+
+
+def _memory_budget():
+    """Memory the concurrent jobs of a batch may use (None when unknown)."""
+    available = scheduler.available_memory()
+    return available * config.SIM_MEMORY_FRACTION if available else None
+
+
+def _print_admission(max_threads, memory_budget, jobs=()):
+    largest = max((j.get('memory', 0) for j in jobs), default=0)
+    budget = scheduler.format_bytes(memory_budget) if memory_budget else 'unknown'
+    line = f"Admission: {max_threads} CPU slots  |  memory budget {budget}"
+    if largest:
+        line += f"  |  largest job ≈ {scheduler.format_bytes(largest)}"
+    print(line)
+
+
+def _dispatch(ready, max_threads, dispatched, report, memory_budget=None, pool_size=None):
+    """
+    Simulation stage shared by the batch runners: starts jobs from the ready
+    queue, longest predicted first, while the CPU and memory budgets allow.
+
+    - At most max_threads EnergyPlus threads run at once, in a process pool
+      of pool_size workers (default: max_threads).
+    - The predicted peak memory ('memory') of the running jobs stays within
+      memory_budget. A job that does not fit waits while smaller jobs behind
+      it may start; a job always starts when nothing else is running.
+    - Once the queue is drained and fewer jobs remain than free workers,
+      each job started gets up to config.SIM_TAIL_THREADS threads (-j).
+    """
+    with ProcessPoolExecutor(max_workers=pool_size or max_threads) as executor:
+        running = {}
+        pending = []
+        held = set()
+        exhausted = False
+        while not exhausted or pending or running:
+            # Take ready jobs into a local window of admission candidates
+            while not exhausted and len(pending) < max_threads:
+                if not running and not pending:
+                    timeout = None
+                elif pending or sum(j['n_jobs'] for j in running.values()) >= max_threads:
+                    timeout = 0
+                else:
+                    timeout = 0.5
+                try:
+                    _, _, job = ready.get(timeout=timeout) if timeout != 0 else ready.get_nowait()
+                except queue.Empty:
+                    break
+                if job is None:
+                    exhausted = True
+                    break
+                pending.append(job)
+
+            threads_used = sum(j['n_jobs'] for j in running.values())
+            memory_used = sum(j.get('memory', 0) for j in running.values())
+            pending.sort(key=lambda j: -j.get('predicted', 0))
+            for job in list(pending):
+                if threads_used >= max_threads:
+                    break
+                memory = job.get('memory', 0)
+                if running and memory_budget and memory_used + memory > memory_budget:
+                    job_name = job.get('name') or os.path.basename(job['idf'])
+                    if job_name not in held:
+                        held.add(job_name)
+                        print(f"  [MEM]  Holding {job_name} (≈ {scheduler.format_bytes(memory)}; "
+                              f"{scheduler.format_bytes(memory_used)} of "
+                              f"{scheduler.format_bytes(memory_budget)} in use)", flush=True)
+                    continue
+                threads = 1
+                free = max_threads - threads_used
+                if exhausted and config.SIM_TAIL_THREADS > 1 and len(pending) < free:
+                    threads = max(1, min(config.SIM_TAIL_THREADS, free // len(pending)))
+                job['n_jobs'] = threads
+                pending.remove(job)
+                dispatched.append(job)
+                running[executor.submit(_run_simulation_wrapper, job)] = job
+                threads_used += threads
+                memory_used += memory
+
+            if running:
+                # Poll for new jobs while a slot is free; otherwise block on simulations
+                can_take_more = not exhausted and not pending and threads_used < max_threads
+                done, _ = wait(running, timeout=0 if can_take_more else None,
+                               return_when=FIRST_COMPLETED)
+                for future in done:
+                    report(future, running.pop(future))
+
+
+def _start_progress_monitor(start_time, total, get_completed, progress, interval=30):
+    """
+    Background thread: every `interval` seconds without a completed job,
+    prints the elapsed time and the progress of each running simulation.
 
-    # Background thread: prints elapsed time every 30 s
+    Returns:
+        (stop_event, thread)
+    """
     stop_event = threading.Event()
 
     def progress_monitor():
         last = 0
         while not stop_event.is_set():
+            completed = get_completed()
             elapsed = time.time() - start_time
             mins, secs = divmod(int(elapsed), 60)
             if completed == last:
-                print(f"  [SIM] Running... [{completed}/{len(jobs)}] Elapsed: {mins:02d}:{secs:02d}", flush=True)
+                print(f"  [SIM] Running... [{completed}/{total}] Elapsed: {mins:02d}:{secs:02d}", flush=True)
+                try:
+                    running = sorted(progress.items(), key=lambda item: -item[1][0])
+                except (OSError, EOFError):
+                    running = []
+                for job_name, (percent, phase) in running:
+                    print(f"        {percent:3d}%  {phase:<12}  {job_name}", flush=True)
             last = completed
-            stop_event.wait(30)
+            stop_event.wait(interval)
 
     monitor = threading.Thread(target=progress_monitor, daemon=True)
     monitor.start()
+    return stop_event, monitor
+
+
+def _record_runtime(model, job, result):
+    """Adds a finished simulation's runtime to the scheduler history."""
+    if result.get('cached') or not job.get('features') or not result.get('elapsed'):
+        return
+    model.record(job.get('name') or os.path.basename(job['idf']), job['features'], result['elapsed'],
+                 result.get('peak_bytes'))
+
 
+def _report_makespan(model, dispatched, max_workers, elapsed):
+    """Prints predicted vs actual batch wall time and saves the timing history."""
+    expected = scheduler.expected_makespan([j.get('predicted', 0.0) for j in dispatched], max_workers)
+    print(f"SCHEDULE |  Expected makespan: {scheduler.format_duration(expected)}"
+          f"  |  Actual: {scheduler.format_duration(elapsed)}  (longest-first)")
     try:
-        with ProcessPoolExecutor(max_workers=max_workers) as executor:
-            futures = {executor.submit(_run_simulation_wrapper, job): job for job in jobs}
-            for future in as_completed(futures):
-                completed += 1
-                job = futures[future]
-                job_name = job.get('name', os.path.basename(job['idf']))
-                elapsed = time.time() - start_time
-                mins, secs = divmod(int(elapsed), 60)
-                try:
-                    result = future.result()
-                    if result['success']:
-                        successful.append(result)
-                        print(f"  [{completed}/{len(jobs)}] [OK]   {job_name} ({mins:02d}:{secs:02d})")
-                    else:
-                        failed.append(result)
-                        print(f"  [{completed}/{len(jobs)}] [FAIL] {job_name} ({mins:02d}:{secs:02d})")
-                except Exception as e:
-                    failed.append({'name': job_name, 'message': str(e), 'success': False})
-                    print(f"  [{completed}/{len(jobs)}] [ERR]  {job_name} — {e}")
+        model.save()
+    except OSError as e:
+        print(f"  [WARNING] Could not save simulation timings: {e}")
+
+
+def run_simulations_pipelined(idf_paths, epw_path, output_dir_for, prepare, max_workers=None,
+                              prep_workers=None, queue_size=None):
+    """
+    Prepares and simulates IDFs as a two-stage pipeline.
+
+    Preparation (version detection + optimization) runs in its own process
+    pool and feeds a bounded queue of ready jobs. EnergyPlus jobs are taken
+    from the queue whenever a simulation slot is free, so the first
+    simulation starts as soon as its own IDF is ready instead of after the
+    whole batch has been prepared.
+
+    Large files are prepared first, and among the prepared jobs the longest
+    predicted simulation takes the next free slot, subject to the same CPU
+    and memory admission control as run_simulations_parallel.
+
+    Args:
+        idf_paths:      IDF files to prepare and simulate.
+        epw_path:       Path to the EPW weather file.
+        output_dir_for: Callable mapping an IDF path to its output directory.
+        prepare:        Module-level callable run in the preparation pool;
+                        returns {'idf', 'ep_path', 'warning', ...}
+                        (e.g. idf_optimizer.prepare_idf).
+        max_workers:    Max concurrent EnergyPlus threads (default: CPU count);
+                        the simulation pool is capped at the number of IDFs.
+        prep_workers:   Preparation processes (default: half the CPU count).
+        queue_size:     Max prepared jobs waiting for a simulation slot
+                        (default: max_workers).
+
+    Returns:
+        dict: {'successful': list, 'failed': list, 'total_time': float}
+    """
+    if not idf_paths:
+        return {'successful': [], 'failed': [], 'total_time': 0.0}
+    cpus = os.cpu_count() or 4
+    # Thread budget for _dispatch; only the process pool is capped at the job count
+    max_threads = max_workers or cpus
+    max_workers = min(max_threads, len(idf_paths))
+    prep_workers = min(prep_workers or max(1, cpus // 2), len(idf_paths))
+    ready = queue.PriorityQueue(maxsize=queue_size or max_workers)
+    total = len(idf_paths)
+    model = scheduler.RuntimeModel()
+    memory_budget = _memory_budget()
+    manager = multiprocessing.Manager()
+    progress = manager.dict()
+    # File size is a cheap stand-in for model size until the IDF is parsed
+    prep_order = sorted(idf_paths, key=_file_size, reverse=True)
+
+    print(f"\n{'='*60}")
+    print(f"Preparing and running {total} simulations "
+          f"({prep_workers} preparation / {max_workers} simulation workers)")
+    _print_admission(max_threads, memory_budget)
+    print(f"{'='*60}")
+
+    def feed():
+        """Preparation stage: hands each prepared job to the bounded queue."""
+        try:
+            with ProcessPoolExecutor(max_workers=prep_workers) as prep_pool:
+                futures = {prep_pool.submit(prepare, p): p for p in prep_order}
+                for seq, future in enumerate(as_completed(futures)):
+                    idf_path = futures[future]
+                    try:
+                        prepared = future.result()
+                    except Exception as e:
+                        # Simulate the unmodified IDF, as when optimization fails
+                        version = config.get_idf_version(idf_path)
+                        prepared = {'idf': idf_path, 'ep_path': config.get_ep_paths(version)['exe'],
+                                    'warning': f"{os.path.basename(idf_path)} — {e}"}
+                    if prepared.get('warning'):
+                        print(f"    Warning: {prepared['warning']}")
+                    job = scheduler.annotate_job({
+                        'idf': idf_path,
+                        'epw': epw_path,
+                        'output_dir': output_dir_for(idf_path),
+                        'name': os.path.basename(idf_path),
+                        'ep_path': prepared['ep_path'],
+                        'n_jobs': 1,
+                        'quiet': True,
+                        'progress': progress,
+                    }, model)
+                    ready.put((-job['predicted'], seq, job))
+        finally:
+            # Sorts after every job, so it is only taken once the queue is drained
+            ready.put((float('inf'), total, None))
+
+    feeder = threading.Thread(target=feed, daemon=True)
+    feeder.start()
+
+    batch = _BatchReport(total, model, progress)
+    dispatched = []
+    stop_event, monitor = _start_progress_monitor(batch.start_time, total,
+                                                  lambda: batch.completed, progress)
+    try:
+        _dispatch(ready, max_threads, dispatched, batch.report, memory_budget, max_workers)
+        feeder.join()
     finally:
         stop_event.set()
         monitor.join(timeout=1)
+        manager.shutdown()
+
+    return batch.summary(dispatched, max_workers)
 
-    elapsed = time.time() - start_time
-    print(f"\n{'='*60}")
-    print(f"SUMMARY  |  Total: {elapsed:.1f}s  |  OK: {len(successful)}  |  Failed: {len(failed)}")
-    print(f"{'='*60}")
 
-    return {'successful': successful, 'failed': failed, 'total_time': elapsed}
+def _file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
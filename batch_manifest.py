@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+"""
+Batch Manifest Module.
+
+Keeps a JSON manifest of batch runs over many IDF files so that an interrupted
+or partially failed run can be resumed. For every input file the manifest
+records its content digest, the code version and options it was processed
+with, the output paths, the final status and the per-stage timings.
+
+A file is skipped on a re-run when its digest, the code version and the
+options all match a completed entry whose outputs still exist. Failed,
+changed and new files are (re)processed.
+"""
+
+import datetime
+import hashlib
+import json
+import os
+from typing import Any
+
+
+_PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+MANIFEST_NAME = "batch_manifest.json"
+MANIFEST_FORMAT = 1
+
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+
+# Source files whose content determines the metadata report output. A change
+# to any of them invalidates every completed manifest entry.
+_PIPELINE_FILES = [
+    "idf_processor.py",
+    "idf_parser.py",
+    "geometry.py",
+    "extractors.py",
+    "construction_extractor.py",
+    "process_load_extractor.py",
+    "schedule_extractor.py",
+    "visualizer_adapter.py",
+    "report_generator.py",
+    "hvac_graph.py",
+    "hvac_validator.py",
+    "metadata_store.py",
+    os.path.join("Templates", "construction", "construction_baseline.idf"),
+]
+
+_code_version_cache: str | None = None
+
+
+def code_version() -> str:
+    """Returns a short digest of the pipeline source files.
+
+    Computed once per process.
+    """
+    global _code_version_cache
+    if _code_version_cache is None:
+        h = hashlib.sha256()
+        for rel_path in _PIPELINE_FILES:
+            path = os.path.join(_PROJECT_DIR, rel_path)
+            h.update(rel_path.replace(os.sep, "/").encode("utf-8"))
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    h.update(f.read())
+        _code_version_cache = h.hexdigest()[:16]
+    return _code_version_cache
+
+
+def load_manifest(path: str) -> dict[str, Any]:
+    """Loads a manifest from disk, returning an empty one if absent or unreadable.
+
+    Args:
+        path: Path to the manifest JSON file.
+
+    Returns:
+        The manifest dict with an ``entries`` mapping keyed by input path.
+    """
+    if os.path.exists(path):
+        try:
+            with open(path, encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("format") == MANIFEST_FORMAT:
+                return manifest
+            print(f"  [manifest] Ignoring manifest with unknown format: {path}")
+        except (OSError, ValueError) as e:
+            print(f"  [manifest] Could not read {path}: {e}")
+    return {"format": MANIFEST_FORMAT, "entries": {}}
+
+
+def save_manifest(path: str, manifest: dict[str, Any]) -> None:
+    """Atomically writes the manifest so a crash never leaves a truncated file.
+
+    Args:
+        path: Destination path of the manifest JSON file.
+        manifest: The manifest dict to persist.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _entry_key(input_path: str) -> str:
+    """Normalises an input path into a stable manifest key."""
+    return os.path.abspath(input_path).replace("\\", "/")
+
+
+def get_entry(manifest: dict[str, Any], input_path: str) -> dict[str, Any] | None:
+    """Returns the manifest entry for an input file, if any."""
+    return manifest["entries"].get(_entry_key(input_path))
+
+
+def is_up_to_date(
+    entry: dict[str, Any] | None,
+    digest: str,
+    options: dict[str, Any] | None = None,
+) -> bool:
+    """Checks whether an entry can be reused instead of re-processing the file.
+
+    Args:
+        entry: The existing manifest entry (or None).
+        digest: Current content digest of the input file.
+        options: Processing options that affect the outputs.
+
+    Returns:
+        True when the entry completed with the same digest, code version and
+        options, and every recorded output still exists.
+    """
+    if not entry or entry.get("status") != STATUS_COMPLETED:
+        return False
+    if entry.get("digest") != digest or entry.get("code_version") != code_version():
+        return False
+    if entry.get("options", {}) != (options or {}):
+        return False
+    return all(os.path.exists(p) for p in entry.get("outputs", []))
+
+
+def record_entry(
+    manifest: dict[str, Any],
+    input_path: str,
+    digest: str,
+    status: str,
+    outputs: list[str] | None = None,
+    timings: dict[str, float] | None = None,
+    options: dict[str, Any] | None = None,
+    message: str = "",
+) -> dict[str, Any]:
+    """Creates or replaces the manifest entry for one input file.
+
+    Args:
+        manifest: The manifest dict to update in place.
+        input_path: Path to the processed IDF file.
+        digest: Content digest of the input file.
+        status: STATUS_COMPLETED or STATUS_FAILED.
+        outputs: Paths of the files produced.
+        timings: Stage name → seconds.
+        options: Processing options that affect the outputs.
+        message: Error or informational message.
+
+    Returns:
+        The new entry.
+    """
+    entry = {
+        "digest": digest,
+        "code_version": code_version(),
+        "status": status,
+        "outputs": outputs or [],
+        "timings": timings or {},
+        "options": options or {},
+        "message": message,
+        "updated_at": datetime.datetime.now().isoformat(timespec="seconds"),
+    }
+    manifest["entries"][_entry_key(input_path)] = entry
+    return entry
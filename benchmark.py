@@ -0,0 +1,478 @@
+"""
+Benchmark Suite for the IDF Reader Pipeline.
+
+Times the main pipeline entry points on a fixed sample of Content/ files
+(small office, hospital, neighbourhood), stores the results as JSON and can
+compare them against a saved baseline, failing when any benchmark regresses
+by more than a configurable threshold or a baseline benchmark no longer runs
+(unless --filter / --scale deselected it).
+
+Benchmarked:
+    parse_idf, get_zone_geometry, every extractor in extractors.py,
+    render_idf_to_base64, generate_reports, compare_idfs,
+    parse_neighbourhood, compose_equipment_demand, plus parse_idf,
+    get_zone_geometry, extract_water_use and _collapse_rows on synthetic
+    neighbourhoods (synthetic_idf.py) to show scaling behaviour.
+
+Usage (from project root):
+    python benchmark.py --save-baseline                 # record baseline
+    python benchmark.py --baseline outputs_benchmark/baseline.json --threshold 0.2
+    python benchmark.py --filter hospital --repeat 3
+    python benchmark.py --filter scaling --scale 10000 100000 1000000
+
+Exit status is 1 when a regression is detected, so the script can gate CI.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import datetime
+import functools
+import io
+import json
+import os
+import platform
+import re
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from collections import defaultdict
+from typing import Any, Callable
+
+_PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, _PROJECT_DIR)
+
+import extractors  # noqa: E402
+from batch_manifest import code_version  # noqa: E402
+from equipment_demand_composer import compose_equipment_demand  # noqa: E402
+from geometry import get_zone_geometry  # noqa: E402
+from idf_comparator import compare_idfs  # noqa: E402
+from idf_parser import parse_idf  # noqa: E402
+from NUs_parser import parse_neighbourhood  # noqa: E402
+from report_generator import _collapse_rows, _get_base_name, generate_reports  # noqa: E402
+from synthetic_idf import Prototype, copies_for_objects, load_prototype, write_synthetic_idf  # noqa: E402
+from visualizer_adapter import render_idf_to_base64  # noqa: E402
+
+
+_CONTENT_DIR = os.path.join(_PROJECT_DIR, "Content")
+DEFAULT_OUTPUT_DIR = os.path.join(_PROJECT_DIR, "outputs_benchmark")
+DEFAULT_BASELINE = os.path.join(DEFAULT_OUTPUT_DIR, "baseline.json")
+DEFAULT_RESULTS = os.path.join(DEFAULT_OUTPUT_DIR, "latest.json")
+
+# Fixed sample so results stay comparable across runs
+SAMPLES = {
+    "small_office": os.path.join(_CONTENT_DIR, "ASHRAE901_STD2022", "ASHRAE901_OfficeSmall_STD2022_Denver.idf"),
+    "hospital": os.path.join(_CONTENT_DIR, "ASHRAE901_STD2022", "ASHRAE901_Hospital_STD2022_Denver.idf"),
+    "neighbourhood": os.path.join(_CONTENT_DIR, "neighbourhoods", "Cluster_24_Houses_NEW.idf"),
+}
+COMPARE_PAIR = (
+    os.path.join(_CONTENT_DIR, "ASHRAE901_STD2022", "ASHRAE901_OfficeMedium_STD2019_Denver.idf"),
+    os.path.join(_CONTENT_DIR, "ASHRAE901_STD2022", "ASHRAE901_OfficeMedium_STD2022_Denver.idf"),
+)
+EQUIPMENT_SAMPLE = os.path.join(_CONTENT_DIR, "low_rise_Res", "US+SF+CZ6A+gasfurnace+unheatedbsmt+IECC_2024.idf")
+
+# Object counts of the synthetic scaling inputs (see synthetic_idf.py);
+# 1_000_000 can be added with --scale
+SCALE_OBJECTS = [10_000, 100_000]
+
+# Regressions smaller than this are treated as timer noise
+MIN_DELTA_S = 0.002
+
+
+@dataclass
+class BenchCase:
+    """One named benchmark: a zero-argument callable and its group."""
+    name: str
+    func: Callable[[], Any]
+    group: str
+
+
+@dataclass
+class CaseSpec:
+    """A benchmark case before its inputs are prepared.
+
+    build() prepares the inputs (parsing, rendering, synthetic files) and
+    returns the BenchCase; inputs shared by several cases are prepared once.
+    """
+    name: str
+    group: str
+    make: Callable[[], Callable[[], Any]]
+
+    def build(self) -> BenchCase:
+        return BenchCase(self.name, self.make(), self.group)
+
+
+def _quiet(func: Callable[[], Any]) -> Callable[[], Any]:
+    """Wraps func so its console output is discarded while timing."""
+    def run() -> Any:
+        with contextlib.redirect_stdout(io.StringIO()):
+            return func()
+    return run
+
+
+# Extractor calls benchmarked per sample, given (idf_data, zone_geo, zone_names)
+_EXTRACTOR_CALLS: dict[str, Callable[[dict, dict, list[str]], Any]] = {
+    "extract_zone_metadata": lambda d, g, z: extractors.extract_zone_metadata(d),
+    "extract_people": lambda d, g, z: extractors.extract_people(d, g),
+    "extract_loads.lights": lambda d, g, z: extractors.extract_loads(d, g, "LIGHTS"),
+    "extract_loads.electric": lambda d, g, z: extractors.extract_loads(
+        d, g, "ELECTRICEQUIPMENT", exclude_subcat_filter="elevator"
+    ),
+    "extract_loads.gas": lambda d, g, z: extractors.extract_loads(d, g, "GASEQUIPMENT"),
+    "extract_water_use": lambda d, g, z: extractors.extract_water_use(d, g),
+    "extract_infiltration": lambda d, g, z: extractors.extract_infiltration(d, g),
+    "extract_ventilation": lambda d, g, z: extractors.extract_ventilation(d, g),
+    "extract_thermostats": lambda d, g, z: extractors.extract_thermostats(d, g),
+    "extract_process_loads": lambda d, g, z: extractors.extract_process_loads(d, g),
+    "extract_hvac_systems": lambda d, g, z: extractors.extract_hvac_systems(d, z),
+    "extract_natural_ventilation": lambda d, g, z: extractors.extract_natural_ventilation(d, g),
+}
+
+
+def _report_inputs(idf_data: dict, zone_geo: dict) -> tuple[list[dict], dict]:
+    """Builds the minimal zone_data / hvac_data inputs for generate_reports()."""
+    lights = extractors.extract_loads(idf_data, zone_geo, "LIGHTS")
+    people = extractors.extract_people(idf_data, zone_geo)
+    zone_data = [
+        {
+            "name": z,
+            "floor_area": g["floor_area"],
+            "story_count": g.get("story_count", 1),
+            "multiplier": g["multiplier"],
+            "people": people.get(z, 0.0),
+            "lights": lights.get(z, 0.0),
+        }
+        for z, g in sorted(zone_geo.items())
+    ]
+    with contextlib.redirect_stdout(io.StringIO()):
+        hvac_data = extractors.extract_hvac_systems(idf_data, list(zone_geo.keys()))
+    return zone_data, hvac_data
+
+
+def case_specs(work_dir: str, scale_objects: list[int] | None = None) -> list[CaseSpec]:
+    """Lists every benchmark case without preparing any inputs.
+
+    Args:
+        work_dir: Scratch directory for report outputs and synthetic inputs.
+        scale_objects: Object counts of the synthetic scaling inputs
+            (default SCALE_OBJECTS).
+
+    Returns:
+        The case specs in execution order.
+    """
+    specs: list[CaseSpec] = []
+
+    for label, path in SAMPLES.items():
+        if not os.path.exists(path):
+            print(f"  [bench] Sample missing, skipped: {path}")
+            continue
+        sample = functools.cache(lambda p=path: _prepare_sample(p))
+        report = functools.cache(lambda p=path, s=sample: _prepare_report(p, s()))
+        out_base = os.path.join(work_dir, f"{label}_metadata")
+
+        specs.append(CaseSpec(f"{label}.parse_idf", "parse", lambda p=path: lambda: parse_idf(p)))
+        specs.append(CaseSpec(
+            f"{label}.get_zone_geometry", "geometry",
+            lambda s=sample: lambda d=s()["idf_data"]: get_zone_geometry(d),
+        ))
+        for name, call in _EXTRACTOR_CALLS.items():
+            specs.append(CaseSpec(
+                f"{label}.{name}", "extractors",
+                lambda s=sample, c=call: _quiet(
+                    lambda d=s()["idf_data"], g=s()["zone_geo"], z=s()["zone_names"]: c(d, g, z)
+                ),
+            ))
+        specs.append(CaseSpec(
+            f"{label}.render_idf_to_base64", "render",
+            lambda p=path: _quiet(lambda: render_idf_to_base64(p)),
+        ))
+        specs.append(CaseSpec(
+            f"{label}.generate_reports", "report",
+            lambda r=report, b=out_base: _quiet(
+                lambda z=r()["zone_data"], v=r()["viz_b64"], h=r()["hvac_data"]: generate_reports(z, b, v, h)
+            ),
+        ))
+
+    if all(os.path.exists(p) for p in COMPARE_PAIR):
+        specs.append(CaseSpec("compare_idfs.office_medium", "compare", lambda: lambda: compare_idfs(*COMPARE_PAIR)))
+
+    if os.path.exists(SAMPLES["neighbourhood"]):
+        specs.append(CaseSpec(
+            "neighbourhood.parse_neighbourhood", "neighbourhood",
+            lambda: lambda: parse_neighbourhood(SAMPLES["neighbourhood"]),
+        ))
+
+    if os.path.exists(EQUIPMENT_SAMPLE):
+        equip_dir = os.path.join(work_dir, "equipment")
+        specs.append(CaseSpec(
+            "low_rise_sf.compose_equipment_demand", "equipment",
+            lambda: _quiet(lambda: compose_equipment_demand(EQUIPMENT_SAMPLE, 167.22, equip_dir)),
+        ))
+
+    specs.extend(_scaling_specs(work_dir, SCALE_OBJECTS if scale_objects is None else scale_objects))
+    return specs
+
+
+def build_cases(
+    work_dir: str, scale_objects: list[int] | None = None, name_filter: str = ""
+) -> list[BenchCase]:
+    """Creates the benchmark cases whose name contains name_filter.
+
+    Cases are selected before their inputs are prepared, so a filtered run
+    only parses, renders and generates the samples it times.
+
+    Args:
+        work_dir: Scratch directory for report outputs and synthetic inputs.
+        scale_objects: Object counts of the synthetic scaling inputs
+            (default SCALE_OBJECTS).
+        name_filter: Only build cases whose name contains this substring.
+
+    Returns:
+        The list of benchmark cases in execution order.
+    """
+    return [spec.build() for spec in case_specs(work_dir, scale_objects) if name_filter in spec.name]
+
+
+def _prepare_sample(path: str) -> dict[str, Any]:
+    """Parses a sample once for the cases that share it."""
+    idf_data = parse_idf(path)
+    zone_geo = get_zone_geometry(idf_data)
+    return {"idf_data": idf_data, "zone_geo": zone_geo, "zone_names": list(zone_geo.keys())}
+
+
+def _prepare_report(path: str, sample: dict[str, Any]) -> dict[str, Any]:
+    """The generate_reports() inputs of a prepared sample."""
+    zone_data, hvac_data = _report_inputs(sample["idf_data"], sample["zone_geo"])
+    return {"zone_data": zone_data, "hvac_data": hvac_data, "viz_b64": render_idf_to_base64(path)}
+
+
+def _collapse_groups(zone_data: list[dict]) -> dict[str, list[dict]]:
+    """Groups zone rows by base name with the building prefix removed, so
+    every copy of a prototype zone lands in the same group."""
+    groups: dict[str, list[dict]] = defaultdict(list)
+    for row in zone_data:
+        groups[_get_base_name(re.sub(r"^\d+(?:_\d+)*_", "", row["name"]))].append(row)
+    return groups
+
+
+def _scaling_specs(work_dir: str, scale_objects: list[int]) -> list[CaseSpec]:
+    """parse_idf, get_zone_geometry, extract_water_use and _collapse_rows on
+    synthetic neighbourhoods of increasing size."""
+    if not scale_objects or not os.path.exists(SAMPLES["small_office"]):
+        return []
+    prototype = functools.cache(lambda: load_prototype(SAMPLES["small_office"]))
+
+    specs = []
+    for target in scale_objects:
+        label = _scaling_label(target)
+        path = os.path.join(work_dir, f"synthetic_{target}.idf")
+        synthetic = functools.cache(lambda t=target, p=path: _prepare_synthetic(prototype(), t, p))
+
+        specs.append(CaseSpec(
+            f"{label}.parse_idf", "scaling",
+            lambda s=synthetic: lambda p=s()["path"]: parse_idf(p),
+        ))
+        specs.append(CaseSpec(
+            f"{label}.get_zone_geometry", "scaling",
+            lambda s=synthetic: lambda d=s()["idf_data"]: get_zone_geometry(d),
+        ))
+        specs.append(CaseSpec(
+            f"{label}.extract_water_use", "scaling",
+            lambda s=synthetic: _quiet(
+                lambda d=s()["idf_data"], g=s()["zone_geo"]: extractors.extract_water_use(d, g)
+            ),
+        ))
+        specs.append(CaseSpec(
+            f"{label}._collapse_rows", "scaling",
+            lambda s=synthetic: lambda g=s()["groups"]: _collapse_rows(g, ["people", "lights"]),
+        ))
+    return specs
+
+
+def _scaling_label(target: int) -> str:
+    """Case-name prefix of the scaling cases for one object count."""
+    return f"scaling.{target // 1000}k"
+
+
+def _prepare_synthetic(prototype: Prototype, target: int, path: str) -> dict[str, Any]:
+    """Writes one synthetic neighbourhood and builds the inputs its cases share."""
+    write_synthetic_idf(prototype, copies_for_objects(prototype, target), path)
+    idf_data = parse_idf(path)
+    zone_geo = get_zone_geometry(idf_data)
+    zone_data, _ = _report_inputs(idf_data, zone_geo)
+    return {"path": path, "idf_data": idf_data, "zone_geo": zone_geo, "groups": _collapse_groups(zone_data)}
+
+
+def time_case(case: BenchCase, repeat: int, budget_s: float) -> dict[str, Any]:
+    """Runs one case up to repeat times (at least once), stopping early once
+    the cumulative time exceeds budget_s.
+
+    Returns:
+        Timing statistics in seconds.
+    """
+    times: list[float] = []
+    total = 0.0
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        case.func()
+        elapsed = time.perf_counter() - t0
+        times.append(elapsed)
+        total += elapsed
+        if total >= budget_s:
+            break
+    return {
+        "group": case.group,
+        "runs": len(times),
+        "median_s": statistics.median(times),
+        "min_s": min(times),
+        "mean_s": statistics.fmean(times),
+    }
+
+
+def run_benchmarks(
+    repeat: int = 5,
+    budget_s: float = 3.0,
+    name_filter: str = "",
+    scale_objects: list[int] | None = None,
+) -> dict[str, Any]:
+    """Runs the suite and returns the JSON-serialisable result document.
+
+    Args:
+        repeat: Maximum runs per case.
+        budget_s: Per-case time budget; slow cases stop after this.
+        name_filter: Only run cases whose name contains this substring.
+        scale_objects: Object counts of the synthetic scaling inputs.
+    """
+    results: dict[str, Any] = {}
+    with tempfile.TemporaryDirectory(prefix="idf_bench_") as work_dir:
+        print("  [bench] Preparing samples...")
+        with contextlib.redirect_stdout(io.StringIO()):
+            cases = build_cases(work_dir, scale_objects, name_filter)
+        print(f"  [bench] Running {len(cases)} benchmark(s)\n")
+        for case in cases:
+            stats = time_case(case, repeat, budget_s)
+            results[case.name] = stats
+            print(f"    {case.name:<52} {stats['median_s'] * 1000:10.2f} ms  (n={stats['runs']})")
+
+    return {
+        "meta": {
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "repeat": repeat,
+            "filter": name_filter,
+            "scale_objects": SCALE_OBJECTS if scale_objects is None else scale_objects,
+            "code_version": code_version(),
+        },
+        "results": results,
+    }
+
+
+def compare_to_baseline(
+    current: dict[str, Any],
+    baseline: dict[str, Any],
+    threshold: float,
+    min_delta_s: float = MIN_DELTA_S,
+) -> list[str]:
+    """Prints a current-vs-baseline table and returns the failing case names.
+
+    A case regresses when its median exceeds the baseline median by more than
+    threshold (a fraction, e.g. 0.2 = 20 %) and by more than min_delta_s.
+    A baseline case missing from the current run also fails, unless the
+    run's --filter or --scale deselected it on purpose.
+    """
+    regressions: list[str] = []
+    cur_results = current["results"]
+    base_results = baseline.get("results", {})
+
+    print(f"\n  {'Benchmark':<52} {'Baseline':>10} {'Current':>10} {'Change':>8}")
+    print(f"  {'-' * 84}")
+    for name, cur in cur_results.items():
+        base = base_results.get(name)
+        if base is None:
+            print(f"  {name:<52} {'—':>10} {cur['median_s'] * 1000:9.2f}m {'new':>8}")
+            continue
+        b, c = base["median_s"], cur["median_s"]
+        change = (c - b) / b if b > 0 else 0.0
+        flag = ""
+        if change > threshold and (c - b) > min_delta_s:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"  {name:<52} {b * 1000:9.2f}m {c * 1000:9.2f}m {change * 100:+7.1f}%{flag}")
+
+    missing: list[str] = []
+    for name, base in base_results.items():
+        if name in cur_results or _deselected(name, current.get("meta", {})):
+            continue
+        missing.append(name)
+        print(f"  {name:<52} {base['median_s'] * 1000:9.2f}m {'—':>10} {'missing':>8}  MISSING")
+
+    print(f"\n  {len(regressions)} regression(s) above {threshold * 100:.0f}% threshold")
+    if missing:
+        print(f"  {len(missing)} baseline benchmark(s) missing from this run (dropped or renamed)")
+    return regressions + missing
+
+
+def _deselected(name: str, meta: dict[str, Any]) -> bool:
+    """Whether a run's --filter or --scale options excluded the case on purpose."""
+    if meta.get("filter", "") not in name:
+        return True
+    if name.startswith("scaling."):
+        labels = {_scaling_label(n) for n in meta.get("scale_objects", SCALE_OBJECTS)}
+        return not any(name.startswith(f"{label}.") for label in labels)
+    return False
+
+
+def _save_json(path: str, doc: dict[str, Any]) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(doc, f, indent=2)
+    print(f"  [bench] Results saved: {path}")
+
+
+def _cli() -> None:
+    """Command-line interface entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark the IDF reader pipeline on a fixed Content/ sample.")
+    parser.add_argument("--output", default=DEFAULT_RESULTS, help="Where to write this run's results JSON.")
+    parser.add_argument("--baseline", help="Baseline results JSON to compare against.")
+    parser.add_argument(
+        "--save-baseline", action="store_true",
+        help=f"Write this run as the new baseline ({DEFAULT_BASELINE} unless --baseline is given).",
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=0.25,
+        help="Allowed slowdown as a fraction of the baseline median (default 0.25 = 25%%).",
+    )
+    parser.add_argument(
+        "--min-delta", type=float, default=MIN_DELTA_S,
+        help=f"Ignore slowdowns smaller than this many seconds (default {MIN_DELTA_S}).",
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Maximum runs per benchmark (default 5).")
+    parser.add_argument("--budget", type=float, default=3.0, help="Per-benchmark time budget in seconds (default 3).")
+    parser.add_argument(
+        "--scale", type=int, nargs="*", default=SCALE_OBJECTS, metavar="N",
+        help="Object counts of the synthetic scaling inputs (default: 10000 100000; pass none to skip).",
+    )
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this text.")
+    args = parser.parse_args()
+
+    current = run_benchmarks(args.repeat, args.budget, args.filter, args.scale)
+    _save_json(args.output, current)
+
+    if args.save_baseline:
+        _save_json(args.baseline or DEFAULT_BASELINE, current)
+        return
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare_to_baseline(current, baseline, args.threshold, args.min_delta):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    _cli()
@@ -10,7 +10,7 @@ from __future__ import annotations
 import datetime
 import os
 
-from idf_comparator import CompareResult, MissingType, MissingObject, ObjectDiff
+from idf_comparator import CompareResult, MissingType, MissingObject, ObjectDiff, RenamedObject
 
 
 # ── Helpers ────────────────────────────────────────────────────────────────────
@@ -50,13 +50,13 @@ def _esc(s: str) -> str:
 def _summary_cards(result: CompareResult) -> str:
     total_issues = (
         len(result.missing_types)
-        + len(result.missing_objects)
-        + len(result.value_diffs)
+        + result.total_missing_objects
+        + result.total_value_diffs
     )
     cards = [
-        ("Missing Types",   len(result.missing_types),   "#ef4444"),
-        ("Missing Objects", len(result.missing_objects), "#f97316"),
-        ("Value Diffs",     len(result.value_diffs),     "#eab308"),
+        ("Missing Types",   len(result.missing_types),        "#ef4444"),
+        ("Missing Objects", result.total_missing_objects,     "#f97316"),
+        ("Value Diffs",     result.total_value_diffs,         "#eab308"),
         ("Perfect Matches", result.perfect_matches,      "#22c55e"),
     ]
     items = ""
@@ -136,6 +136,41 @@ def _missing_objects_table(items: list[MissingObject], name_a: str, name_b: str)
     </div>"""
 
 
+def _renamed_objects_table(items: list[RenamedObject], name_a: str, name_b: str) -> str:
+    if not items:
+        return ""
+    rows = ""
+    for ro in items:
+        rows += f"""
+        <tr>
+            <td>{_esc(ro.obj_type)}</td>
+            <td style="color:#818cf8;">{_esc(ro.name_a)}</td>
+            <td style="color:#f472b6;">{_esc(ro.name_b)}</td>
+            <td style="text-align:center;">{ro.similarity * 100:.0f}%</td>
+            <td style="text-align:center;">{_impact_badge(ro.impact)}</td>
+        </tr>"""
+    return f"""
+    <div class="card">
+        <div class="card-header">Renamed Objects
+            <span style="font-size:0.8rem;color:#94a3b8;font-weight:400;margin-left:8px;">
+                matched by field similarity despite a different name
+            </span>
+        </div>
+        <div class="table-container">
+            <table>
+                <thead><tr>
+                    <th>Object Type</th>
+                    <th style="color:#818cf8;">Reference Name</th>
+                    <th style="color:#f472b6;">Compare Name</th>
+                    <th style="text-align:center;">Similarity</th>
+                    <th style="text-align:center;">Impact</th>
+                </tr></thead>
+                <tbody>{rows}</tbody>
+            </table>
+        </div>
+    </div>"""
+
+
 def _value_diffs_section(items: list[ObjectDiff], name_a: str, name_b: str) -> str:
     if not items:
         return ""
@@ -207,9 +242,20 @@ def generate_compare_report(result: CompareResult, output_path: str) -> None:
 
     total_issues = (
         len(result.missing_types)
-        + len(result.missing_objects)
-        + len(result.value_diffs)
+        + result.total_missing_objects
+        + result.total_value_diffs
     )
+    truncated_note = ""
+    if (
+        result.total_missing_objects > len(result.missing_objects)
+        or result.total_value_diffs > len(result.value_diffs)
+        or result.total_renamed_objects > len(result.renamed_objects)
+    ):
+        log_name = os.path.basename(result.diff_log) if result.diff_log else "the diff log"
+        truncated_note = (
+            f'<div class="metadata">Showing the highest-impact entries only; '
+            f'every entry is listed in {_esc(log_name)}.</div>'
+        )
 
     html = f"""<!DOCTYPE html>
 <html lang="en">
@@ -316,10 +362,14 @@ def generate_compare_report(result: CompareResult, output_path: str) -> None:
 
     {_summary_cards(result)}
 
+    {truncated_note}
+
     {_missing_types_table(result.missing_types, name_a, name_b)}
 
     {_missing_objects_table(result.missing_objects, name_a, name_b)}
 
+    {_renamed_objects_table(result.renamed_objects, name_a, name_b)}
+
     {_value_diffs_section(result.value_diffs, name_a, name_b)}
 
     {'<div class="no-issues">No energy-relevant differences found — files match on all compared objects.</div>' if total_issues == 0 else ''}
@@ -10,6 +10,8 @@ per square meter of floor area (or facade area where appropriate).
 
 import re
 
+from hvac_graph import HVACGraph, build_hvac_graph, vertex_id
+
 
 def get_first_num(text: str) -> float | None:
     """Helper to extract the first numeric value from a string."""
@@ -1200,49 +1202,36 @@ def extract_process_loads(idf_data: dict, zone_geo: dict) -> dict[str, float]:
     return results
 
 
-def extract_hvac_systems(idf_data: dict, zone_names: list[str]) -> dict[str, dict[str, str]]:
+def extract_hvac_systems(
+    idf_data: dict,
+    zone_names: list[str],
+    graph: HVACGraph | None = None,
+) -> dict[str, dict[str, str]]:
     """Extracts HVAC templates, economizer limits, and DCV settings.
-    
+
+    Each zone's equipment, terminal, air loop and outdoor air controllers are
+    found by traversing the HVAC connectivity graph (see hvac_graph.py).
+
     Args:
         idf_data: Parsed IDF dictionary.
         zone_names: List of zone names.
-        
+        graph: HVAC graph of the same model, built here when omitted.
+
     Returns:
         A dictionary mapping zone names to their HVAC template, dcv, and economizer types.
     """
+    if graph is None:
+        graph = build_hvac_graph(idf_data)
+
     conditioned_zones = set()
     for obj in idf_data.get("ZONECONTROL:THERMOSTAT", []):
         if len(obj) >= 2:
             conditioned_zones.add(obj[1])
 
-    zone_equip_list = {}
+    zone_equip_list = set()
     for obj in idf_data.get("ZONEHVAC:EQUIPMENTCONNECTIONS", []):
         if len(obj) > 4:
-            zone_equip_list[obj[0]] = obj[1]
-
-    equip_list_objects = {}
-    for obj in idf_data.get("ZONEHVAC:EQUIPMENTLIST", []):
-        if len(obj) >= 2:
-            name = obj[0]
-            types_names = []
-            # Start at index 1 to support both EnergyPlus 8.x (equipment type
-            # at field[1]) and 22.x (optional LoadDistributionScheme at
-            # field[1] then types at field[2]+). The startswith checks skip
-            # numeric/sequence fields safely.
-            for i in range(1, len(obj) - 1):
-                part = str(obj[i]).upper()
-                if (
-                    part.startswith("ZONEHVAC:")
-                    or part.startswith("AIRTERMINAL:")
-                    or part.startswith("FAN:")
-                ):
-                    types_names.append((obj[i], obj[i + 1]))
-            equip_list_objects[name] = types_names
-
-    controller_oa = idf_data.get("CONTROLLER:OUTDOORAIR", [])
-    mech_vent = idf_data.get("CONTROLLER:MECHANICALVENTILATION", [])
-    zone_mixers = idf_data.get("AIRLOOPHVAC:ZONEMIXER", [])
-    zone_splitters = idf_data.get("AIRLOOPHVAC:ZONESPLITTER", [])
+            zone_equip_list.add(obj[0])
 
     # Global building-level checks to refine Honeybee templates (e.g., Boiler, Chiller, District loops)
     has_boiler = "BOILER:HOTWATER" in idf_data
@@ -1310,55 +1299,6 @@ def extract_hvac_systems(idf_data: dict, zone_names: list[str]) -> dict[str, dic
     elif has_elec_coil:
         psz_template_base = "PSZAC_ElectricBaseboard" if has_baseboard else "PSZAC_ElectricCoil"
 
-    # Build zone → AirLoop name mapping via ZoneSplitter
-    # ZoneSplitter outlet nodes are named like "<ZoneName> VAV Box Inlet Node"
-    # The AirLoop name is derived from the splitter name prefix.
-    zone_to_airloop: dict[str, str] = {}
-
-    # First, map splitter names to AirLoop names via AirLoopHVAC objects
-    splitter_to_airloop: dict[str, str] = {}
-    for airloop in idf_data.get("AIRLOOPHVAC:SUPPLYPATH", []):
-        # Fields: Name, Supply Inlet Node, Component Type, Component Name
-        if len(airloop) >= 4:
-            airloop_name = airloop[0]
-            for i in range(2, len(airloop) - 1, 2):
-                comp_type = str(airloop[i]).upper()
-                if "ZONESPLITTER" in comp_type:
-                    splitter_to_airloop[airloop[i + 1]] = airloop_name
-
-    for splitter in zone_splitters:
-        if len(splitter) >= 3:
-            splitter_name = splitter[0]
-            airloop_name = splitter_to_airloop.get(
-                splitter_name, splitter_name.replace(" Supply Air Splitter", "")
-            )
-            # Outlet nodes (index 2+) are zone inlet nodes
-            for outlet_node in splitter[2:]:
-                # Extract zone name from node: "<ZoneName> VAV Box Inlet Node"
-                zone_from_node = outlet_node.rsplit(" VAV Box", 1)[0]
-                if " " in zone_from_node:
-                    zone_from_node = outlet_node.rsplit(" ", 3)[0]
-                zone_to_airloop[zone_from_node.upper()] = airloop_name
-
-    # Build AirLoop → Controller:OutdoorAir mapping
-    airloop_to_oa: dict[str, list] = {}
-    for oa in controller_oa:
-        oa_name = oa[0].upper()
-        # Match by finding the AirLoop whose name is a prefix of the OA controller
-        for airloop_name in set(zone_to_airloop.values()):
-            if airloop_name.upper().replace(" ", "_") in oa_name.replace(" ", "_"):
-                airloop_to_oa[airloop_name] = oa
-                break
-
-    # Build AirLoop → Controller:MechanicalVentilation mapping
-    airloop_to_mv: dict[str, list] = {}
-    for mv in mech_vent:
-        mv_name = mv[0].upper()
-        for airloop_name in set(zone_to_airloop.values()):
-            if airloop_name.upper().replace(" ", "_") in mv_name.replace(" ", "_"):
-                airloop_to_mv[airloop_name] = mv
-                break
-
     results = {}
     
     for z in zone_names:
@@ -1370,8 +1310,11 @@ def extract_hvac_systems(idf_data: dict, zone_names: list[str]) -> dict[str, dic
         dcv = "No"
         economizer = "NoEconomizer"
 
-        eq_list_name = zone_equip_list.get(z)
-        equipments = equip_list_objects.get(eq_list_name, [])
+        # Entries of the zone's equipment list that can set a template
+        equipments = [
+            (graph.kind[v], graph.names[v]) for v in graph.equipment(z)
+            if graph.kind[v].startswith(("ZONEHVAC:", "AIRTERMINAL:", "FAN:"))
+        ]
 
         if not equipments:
             results[z] = {"template": "Unconditioned", "dcv": "N/A", "economizer": "N/A"}
@@ -1401,21 +1344,20 @@ def extract_hvac_systems(idf_data: dict, zone_names: list[str]) -> dict[str, dic
                 template = "Dehumidifier"
             elif "AIRDISTRIBUTIONUNIT" in eq_typ:
                 # Find the ATU
-                for adu in idf_data.get("ZONEHVAC:AIRDISTRIBUTIONUNIT", []):
-                    if adu[0] == eq_name:
-                        atu_type = adu[2].upper() if len(adu) > 2 else ""
-                        if "VAV" in atu_type:
-                            # VAV terminal found — distinguish VAV vs PVAV
-                            # by cooling source: chiller → VAV, DX → PVAV
-                            if has_chiller or has_district_clg:
-                                template = vav_template_base
-                            elif has_dx_cooling:
-                                template = pvav_template_base
-                            else:
-                                template = vav_template_base
-                        elif "CONSTANTVOLUME" in atu_type:
-                            template = psz_template_base
-                        break
+                adu = graph.fields.get(vertex_id("ZONEHVAC:AIRDISTRIBUTIONUNIT", eq_name))
+                if adu is not None:
+                    atu_type = adu[2].upper() if len(adu) > 2 else ""
+                    if "VAV" in atu_type:
+                        # VAV terminal found — distinguish VAV vs PVAV
+                        # by cooling source: chiller → VAV, DX → PVAV
+                        if has_chiller or has_district_clg:
+                            template = vav_template_base
+                        elif has_dx_cooling:
+                            template = pvav_template_base
+                        else:
+                            template = vav_template_base
+                    elif "CONSTANTVOLUME" in atu_type:
+                        template = psz_template_base
             # ----------------------------------------------------------------
             # EnergyPlus 8.x legacy: AirTerminal:SingleDuct:Uncontrolled
             # was renamed to AirTerminal:SingleDuct:ConstantVolume:NoReheat
@@ -1439,13 +1381,14 @@ def extract_hvac_systems(idf_data: dict, zone_names: list[str]) -> dict[str, dic
                 elif "FCU" in eq_name.upper(): template = "FCUwithDOASAbridged"
 
         # Look up DCV and Economizer via zone → AirLoop → Controller chain
-        airloop_name = zone_to_airloop.get(z.upper())
-        if airloop_name:
-            oa = airloop_to_oa.get(airloop_name)
-            if oa:
-                economizer = oa[7] if len(oa) > 7 else "NoEconomizer"
-            mv = airloop_to_mv.get(airloop_name)
-            if mv:
+        airloop = graph.air_loop(z)
+        oa_controller = graph.outdoor_air_controller(airloop) if airloop else None
+        if oa_controller:
+            oa = graph.fields[oa_controller]
+            economizer = oa[7] if len(oa) > 7 else "NoEconomizer"
+            mv_controller = graph.follow(oa_controller, "CONTROLLER:MECHANICALVENTILATION")
+            if mv_controller:
+                mv = graph.fields[mv_controller]
                 dcv = mv[2] if len(mv) > 2 else "No"
 
         results[z] = {"template": template, "dcv": dcv, "economizer": economizer}
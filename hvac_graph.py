@@ -0,0 +1,293 @@
+from __future__ import annotations
+
+"""
+HVAC Topology Graph Module.
+
+Builds a connectivity graph of the HVAC objects in a parsed IDF, once per
+model. Vertices are HVAC objects (zones, equipment lists, air distribution
+units, terminals, splitters, supply paths, air loops, branches, outdoor air
+systems, controllers, coils, plant loops, ...) and the fluid nodes that join
+them. Edges come from the references EnergyPlus itself resolves:
+
+- a node name shared by two objects (e.g. a terminal inlet and a splitter
+  outlet, or a supply path inlet and an air loop demand inlet);
+- an "object type, object name" field pair (equipment list entries, branch
+  components, controller lists, terminal coils);
+- a plain name reference to a zone or a list-like object (branch lists,
+  equipment lists, controller lists, mechanical ventilation controllers).
+
+Building the graph is one pass over the HVAC objects with dictionary
+lookups, so it is linear in the model size, and questions such as "which
+air loop serves this zone" become short traversals. The graph is built by
+idf_processor and shared by extract_hvac_systems() and
+validate_hvac_results().
+"""
+
+from collections import deque
+from dataclasses import dataclass, field
+
+
+# Vertex kind of fluid nodes; every other vertex kind is its object type
+NODE = "NODE"
+
+# Object type prefixes that make up the HVAC topology
+_HVAC_PREFIXES = (
+    "ZONEHVAC:", "AIRTERMINAL:", "AIRLOOPHVAC", "BRANCH", "CONNECTOR", "CONTROLLER:",
+    "COIL:", "COILSYSTEM:", "FAN:", "PUMP:", "HEADEREDPUMPS:", "PIPE:", "PLANTLOOP",
+    "CONDENSERLOOP", "BOILER:", "CHILLER:", "CHILLERHEATER:", "DISTRICTHEATING",
+    "DISTRICTCOOLING", "COOLINGTOWER:", "FLUIDCOOLER:", "HEATEXCHANGER:", "HEATPUMP:",
+    "WATERHEATER:", "HUMIDIFIER:", "DEHUMIDIFIER:", "EVAPORATIVECOOLER:",
+    "HEATRECOVERY", "OUTDOORAIR:", "NODELIST",
+)
+
+# Node name fields at fixed positions: object type → {index: edge label}
+_NODE_FIELDS = {
+    "ZONEHVAC:EQUIPMENTCONNECTIONS": {2: "inlet", 3: "exhaust", 4: "air", 5: "return"},
+    "ZONEHVAC:AIRDISTRIBUTIONUNIT": {1: "outlet"},
+    "AIRLOOPHVAC": {6: "supply inlet", 7: "demand outlet", 8: "demand inlet", 9: "supply outlet"},
+    "AIRLOOPHVAC:SUPPLYPATH": {1: "inlet"},
+    "AIRLOOPHVAC:RETURNPATH": {1: "outlet"},
+}
+
+# Object types whose fields are all node names from this index on
+_NODE_FIELDS_FROM = {
+    "NODELIST": 1,
+    "AIRLOOPHVAC:ZONESPLITTER": 1,
+    "AIRLOOPHVAC:ZONEMIXER": 1,
+    "AIRLOOPHVAC:SUPPLYPLENUM": 2,
+    "AIRLOOPHVAC:RETURNPLENUM": 2,
+}
+
+# Object types referenced by plain name (without a preceding type field)
+_NAMED_TARGETS = (
+    "ZONE",
+    "BRANCH",
+    "BRANCHLIST",
+    "CONNECTORLIST",
+    "ZONEHVAC:EQUIPMENTLIST",
+    "AIRLOOPHVAC:CONTROLLERLIST",
+    "AIRLOOPHVAC:OUTDOORAIRSYSTEM:EQUIPMENTLIST",
+    "CONTROLLER:MECHANICALVENTILATION",
+)
+
+# Vertex kinds on the supply side between a zone and its air loop
+_SUPPLY_SIDE = (
+    "ZONEHVAC:EQUIPMENTLIST", "ZONEHVAC:AIRDISTRIBUTIONUNIT", "AIRTERMINAL:", NODE,
+    "AIRLOOPHVAC:ZONESPLITTER", "AIRLOOPHVAC:SUPPLYPLENUM", "AIRLOOPHVAC:SUPPLYPATH",
+)
+
+
+def vertex_id(kind: str, name: str) -> str:
+    """Vertex id of an object or node; EnergyPlus names are case-insensitive."""
+    return f"{kind.upper()}:{name.upper()}"
+
+
+@dataclass
+class HVACGraph:
+    """Undirected HVAC connectivity graph of one model."""
+    kind: dict[str, str] = field(default_factory=dict)                  # vertex → object type, or NODE
+    names: dict[str, str] = field(default_factory=dict)                 # vertex → name as written
+    fields: dict[str, list[str]] = field(default_factory=dict)          # vertex → fields of its object
+    adjacency: dict[str, dict[str, str]] = field(default_factory=dict)  # vertex → {neighbour: edge label}
+    _air_loops: dict[str, str] | None = field(default=None, repr=False)
+
+    def add_vertex(self, kind: str, name: str) -> str:
+        """Adds a vertex if it is new and returns its id."""
+        vid = vertex_id(kind, name)
+        if vid not in self.kind:
+            self.kind[vid] = kind.upper()
+            self.names[vid] = name
+            self.adjacency[vid] = {}
+        return vid
+
+    def add_edge(self, a: str, b: str, label: str) -> None:
+        """Links two vertices; an edge keeps the first label it was given."""
+        if a != b:
+            self.adjacency[a].setdefault(b, label)
+            self.adjacency[b].setdefault(a, label)
+
+    def neighbours(self, vid: str, kind: str | None = None, label: str | None = None) -> list[str]:
+        """Neighbours of a vertex in field order, optionally filtered by kind and edge label."""
+        return [
+            nb for nb, nb_label in self.adjacency.get(vid, {}).items()
+            if (kind is None or self.kind[nb] == kind) and (label is None or nb_label == label)
+        ]
+
+    def follow(self, start: str, *kinds: str) -> str | None:
+        """Walks a chain of object types, taking the first neighbour of each type.
+
+        Example: ``graph.follow(oa_system, "AIRLOOPHVAC:CONTROLLERLIST", "CONTROLLER:OUTDOORAIR")``.
+        """
+        vid = start
+        for kind in kinds:
+            step = self.neighbours(vid, kind)
+            if not step:
+                return None
+            vid = step[0]
+        return vid
+
+    # --- HVAC queries -------------------------------------------------------
+
+    def equipment(self, zone_name: str) -> list[str]:
+        """Equipment of a zone, in equipment list order."""
+        eq_list = self.follow(vertex_id("ZONE", zone_name), "ZONEHVAC:EQUIPMENTLIST")
+        return self.neighbours(eq_list, label="equipment") if eq_list else []
+
+    def air_loops(self) -> dict[str, str]:
+        """Zone vertex → vertex of the air loop supplying it, computed once.
+
+        One breadth-first search from all air loops at once along the supply
+        side (supply path → splitter → terminal → equipment list / zone inlet
+        node), so every vertex is visited once. A zone served by several
+        loops gets the nearest one.
+        """
+        if self._air_loops is None:
+            self._air_loops = {}
+            loops = [v for v, kind in self.kind.items() if kind == "AIRLOOPHVAC"]
+            owner = {loop: loop for loop in loops}
+            queue = deque(loops)
+            while queue:
+                vid = queue.popleft()
+                for nb, label in self.adjacency[vid].items():
+                    nb_kind = self.kind[nb]
+                    if nb_kind == "ZONE":
+                        # Enter a zone only through its equipment list or inlet
+                        # nodes, never through return air paths
+                        if label in ("equipment list", "inlet"):
+                            self._air_loops.setdefault(nb, owner[vid])
+                    elif nb not in owner and nb_kind.startswith(_SUPPLY_SIDE):
+                        owner[nb] = owner[vid]
+                        queue.append(nb)
+        return self._air_loops
+
+    def air_loop(self, zone_name: str) -> str | None:
+        """Air loop supplying a zone: zone → terminal → splitter → supply path → loop."""
+        return self.air_loops().get(vertex_id("ZONE", zone_name))
+
+    def outdoor_air_controller(self, loop: str) -> str | None:
+        """Controller:OutdoorAir of an air loop: loop → branches → OA system → controllers."""
+        for branch_list in self.neighbours(loop, "BRANCHLIST"):
+            for branch in self.neighbours(branch_list, "BRANCH"):
+                for oa_system in self.neighbours(branch, "AIRLOOPHVAC:OUTDOORAIRSYSTEM"):
+                    controller = self.follow(oa_system, "AIRLOOPHVAC:CONTROLLERLIST", "CONTROLLER:OUTDOORAIR")
+                    if controller is not None:
+                        return controller
+        return None
+
+
+def build_hvac_graph(idf_data: dict) -> HVACGraph:
+    """Builds the HVAC connectivity graph of a parsed IDF in one pass.
+
+    Args:
+        idf_data: Parsed IDF dictionary (uppercase object types).
+
+    Returns:
+        The HVACGraph.
+    """
+    graph = HVACGraph()
+    hvac_types = [
+        t for t in idf_data
+        if t == "ZONE" or t in _NODE_FIELDS or t in _NODE_FIELDS_FROM or t.startswith(_HVAC_PREFIXES)
+    ]
+
+    # Vertices for every defined HVAC object, plus the plain-name index
+    named: dict[str, str] = {}
+    for obj_type in hvac_types:
+        for obj in idf_data[obj_type]:
+            if obj and obj[0]:
+                vid = graph.add_vertex(obj_type, obj[0])
+                graph.fields[vid] = obj
+                if obj_type in _NAMED_TARGETS:
+                    named.setdefault(obj[0].upper(), vid)
+
+    def is_type(value: str) -> bool:
+        key = value.upper()
+        return ":" in key and (key in idf_data or key.startswith(_HVAC_PREFIXES))
+
+    # Node names: fields known to hold nodes, NodeList members and branch
+    # component inlets/outlets. Other fields join the graph through a node
+    # only when their value is one of these names.
+    node_lists: dict[str, list[str]] = {
+        obj[0].upper(): [n for n in obj[1:] if n] for obj in idf_data.get("NODELIST", []) if obj
+    }
+    node_names: set[str] = set()
+    for obj_type, positions in _NODE_FIELDS.items():
+        for obj in idf_data.get(obj_type, []):
+            node_names.update(obj[i].upper() for i in positions if i < len(obj) and obj[i])
+    for obj_type, start in _NODE_FIELDS_FROM.items():
+        for obj in idf_data.get(obj_type, []):
+            node_names.update(n.upper() for n in obj[start:] if n)
+    for obj in idf_data.get("BRANCH", []):
+        for i in range(1, len(obj) - 3):
+            if is_type(obj[i]):
+                node_names.update(n.upper() for n in obj[i + 2:i + 4] if n)
+
+    node_cache: dict[str, list[str]] = {}
+
+    def node_vertices(value: str) -> list[str]:
+        if value not in node_cache:
+            members = node_lists.get(value.upper(), [value])
+            node_cache[value] = [graph.add_vertex(NODE, n) for n in members]
+        return node_cache[value]
+
+    # What a field value refers to, decided once per distinct value:
+    # ("type", None) for the type of a "type, name" pair, ("name", vertex)
+    # for a named object, ("node", vertices) for a node or node list
+    refs: dict[str, tuple[str, str | list[str] | None] | None] = {}
+
+    def classify(value: str) -> tuple[str, str | list[str] | None] | None:
+        key = value.upper()
+        if is_type(value):
+            return ("type", None)
+        if key in named:
+            return ("name", named[key])
+        if key in node_lists or key in node_names:
+            return ("node", node_vertices(value))
+        return None
+
+    for obj_type in hvac_types:
+        if obj_type == "ZONE":
+            continue
+        positions = _NODE_FIELDS.get(obj_type, {})
+        node_from = _NODE_FIELDS_FROM.get(obj_type)
+        pair_label = "equipment" if obj_type == "ZONEHVAC:EQUIPMENTLIST" else "component"
+        for obj in idf_data[obj_type]:
+            if not obj or not obj[0]:
+                continue
+            src = vertex_id(obj_type, obj[0])
+            i = 1
+            while i < len(obj):
+                value = obj[i]
+                if value:
+                    if i in positions or (node_from is not None and i >= node_from):
+                        label = positions.get(i, "node")
+                        for node in node_vertices(value):
+                            graph.add_edge(src, node, label)
+                    else:
+                        if value not in refs:
+                            refs[value] = classify(value)
+                        ref = refs[value]
+                        if ref is None:
+                            pass
+                        elif ref[0] == "type":
+                            if i + 1 < len(obj) and obj[i + 1]:
+                                graph.add_edge(src, graph.add_vertex(value, obj[i + 1]), pair_label)
+                                i += 1
+                        elif ref[0] == "name":
+                            target = ref[1]
+                            kind = graph.kind[target]
+                            graph.add_edge(src, target, "equipment list" if kind == "ZONEHVAC:EQUIPMENTLIST" else "name")
+                        else:
+                            for node in ref[1]:
+                                graph.add_edge(src, node, "node")
+                i += 1
+
+    # A zone's equipment connections object ties the zone to its equipment
+    # list and nodes
+    for obj in idf_data.get("ZONEHVAC:EQUIPMENTCONNECTIONS", []):
+        if obj and obj[0]:
+            zone = graph.add_vertex("ZONE", obj[0])
+            connections = vertex_id("ZONEHVAC:EQUIPMENTCONNECTIONS", obj[0])
+            for nb, label in list(graph.adjacency[connections].items()):
+                graph.add_edge(zone, nb, label)
+    return graph
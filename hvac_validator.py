@@ -9,11 +9,18 @@ valid Honeybee HVAC templates defined in the Templates/HVAC_templates/ folder.
 
 It uses ast.parse() to extract enum values from the template source files
 without importing them, avoiding any dependency on third-party packages such
-as pydantic that may not be installed.
+as pydantic that may not be installed. The result is kept as a template
+registry: cached in memory for the process and on disk keyed by the digest
+of the template files, so a batch run parses the templates at most once.
 """
 
 import ast
+import hashlib
+import json
 import os
+from dataclasses import asdict, dataclass
+
+from hvac_graph import HVACGraph
 
 
 # ---------------------------------------------------------------------------
@@ -30,6 +37,10 @@ _TEMPLATE_FILES = [
     os.path.join(_TEMPLATE_DIR, "heatcool.py"),
 ]
 
+# On-disk registry cache, next to the templates' own bytecode cache
+_REGISTRY_CACHE = os.path.join(_TEMPLATE_DIR, "__pycache__", "template_registry.json")
+_REGISTRY_FORMAT = 1
+
 # ---------------------------------------------------------------------------
 # Additional generic labels produced by the extractor that are not formal
 # Honeybee equipment-type enum values, but are considered valid outputs.
@@ -65,8 +76,64 @@ _VALID_ECONOMIZER: set[str] = {
     "ElectronicEnthalpy",
 }
 
+# Template families that need a central air loop (PTAC and furnaces are
+# zone equipment)
+_AIR_LOOP_FAMILIES: set[str] = {"VAV", "PVAV", "PSZ"}
 
-def build_valid_template_set() -> set[str]:
+
+@dataclass(frozen=True)
+class TemplateInfo:
+    """Where a valid template string is defined."""
+    value: str      # e.g. "VAV_Chiller_Boiler"
+    enum: str       # defining enum class, e.g. "VAVEquipmentType" ("" for generic labels)
+    source: str     # template module stem, e.g. "allair" ("extractor" for generic labels)
+
+    @property
+    def family(self) -> str:
+        """System family of an equipment enum, e.g. "VAV" or "FCUwithDOAS"."""
+        return self.enum.removesuffix("EquipmentType") if self.enum else self.value
+
+
+class TemplateRegistry:
+    """All valid Honeybee HVAC template strings with O(1) membership and metadata."""
+
+    def __init__(self, templates: list[TemplateInfo]):
+        self._by_value: dict[str, TemplateInfo] = {}
+        for info in templates:
+            self._by_value.setdefault(info.value, info)
+        self.valid: frozenset[str] = frozenset(self._by_value)
+
+    def __contains__(self, value: object) -> bool:
+        return value in self._by_value
+
+    def __len__(self) -> int:
+        return len(self._by_value)
+
+    def info(self, value: str) -> TemplateInfo | None:
+        """Metadata of a valid template string, or None if it is not valid."""
+        return self._by_value.get(value)
+
+    def by_source(self, source: str) -> list[TemplateInfo]:
+        """All templates defined in one template module (e.g. "doas")."""
+        return [info for info in self._by_value.values() if info.source == source]
+
+
+_registry: TemplateRegistry | None = None
+
+
+def _templates_digest() -> str:
+    """Digest of the template source files (missing files included as absent)."""
+    h = hashlib.sha256(str(_REGISTRY_FORMAT).encode("utf-8"))
+    for filepath in _TEMPLATE_FILES:
+        h.update(os.path.basename(filepath).encode("utf-8"))
+        if os.path.exists(filepath):
+            with open(filepath, "rb") as fh:
+                h.update(fh.read())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _parse_template_files() -> list[TemplateInfo]:
     """Parse template source files to extract all valid Honeybee equipment strings.
 
     Uses ast.parse() to safely extract string values from every ``str, Enum``
@@ -74,10 +141,9 @@ def build_valid_template_set() -> set[str]:
     pydantic-dependent modules.
 
     Returns:
-        A flat set of all valid equipment-type strings drawn from the
-        template files, plus the extractor's generic labels.
+        One TemplateInfo per enum value, in file order.
     """
-    valid: set[str] = set()
+    templates: list[TemplateInfo] = []
 
     for filepath in _TEMPLATE_FILES:
         if not os.path.exists(filepath):
@@ -87,6 +153,7 @@ def build_valid_template_set() -> set[str]:
             source = fh.read()
 
         tree = ast.parse(source)
+        module = os.path.splitext(os.path.basename(filepath))[0]
 
         for node in ast.walk(tree):
             # We only care about class definitions that inherit from (str, Enum)
@@ -109,16 +176,72 @@ def build_valid_template_set() -> set[str]:
                 if isinstance(item.value, ast.Constant) and isinstance(
                     item.value.value, str
                 ):
-                    valid.add(item.value.value)
+                    templates.append(TemplateInfo(item.value.value, node.name, module))
+
+    return templates
+
+
+def _load_cached_templates(digest: str) -> list[TemplateInfo] | None:
+    """Templates from the on-disk cache when it matches the current digest."""
+    try:
+        with open(_REGISTRY_CACHE, encoding="utf-8") as fh:
+            cached = json.load(fh)
+        if cached.get("format") == _REGISTRY_FORMAT and cached.get("digest") == digest:
+            return [TemplateInfo(**t) for t in cached["templates"]]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+
+def _save_cached_templates(digest: str, templates: list[TemplateInfo]) -> None:
+    """Atomically writes the on-disk cache; a read-only checkout just skips it."""
+    try:
+        os.makedirs(os.path.dirname(_REGISTRY_CACHE), exist_ok=True)
+        tmp_path = f"{_REGISTRY_CACHE}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            json.dump({
+                "format": _REGISTRY_FORMAT,
+                "digest": digest,
+                "templates": [asdict(t) for t in templates],
+            }, fh)
+        os.replace(tmp_path, _REGISTRY_CACHE)
+    except OSError:
+        pass
+
+
+def get_template_registry() -> TemplateRegistry:
+    """Returns the template registry, building it at most once per process.
+
+    The parsed templates are also cached on disk, keyed by the digest of the
+    template files, so new processes skip the ast parse until a template
+    file changes.
+    """
+    global _registry
+    if _registry is None:
+        digest = _templates_digest()
+        templates = _load_cached_templates(digest)
+        if templates is None:
+            templates = _parse_template_files()
+            _save_cached_templates(digest, templates)
+        # Generic extractor labels, sorted for a stable order
+        templates += [TemplateInfo(label, "", "extractor") for label in sorted(_EXTRACTOR_GENERIC_LABELS)]
+        _registry = TemplateRegistry(templates)
+    return _registry
+
 
-    # Merge extractor generic labels
-    valid.update(_EXTRACTOR_GENERIC_LABELS)
-    return valid
+def build_valid_template_set() -> set[str]:
+    """All valid Honeybee equipment strings (template enum values plus the
+    extractor's generic labels).
+
+    Returns:
+        A new set; use get_template_registry() for cached membership checks.
+    """
+    return set(get_template_registry().valid)
 
 
 def _check_templates(
     hvac_data: dict[str, dict[str, str]],
-    valid_templates: set[str],
+    valid_templates: TemplateRegistry | set[str],
 ) -> list[str]:
     """Return a list of (zone, template) error strings for unrecognised templates.
 
@@ -199,9 +322,33 @@ def _check_unconditioned_consistency(
     return errors
 
 
+def _check_air_loops(
+    hvac_data: dict[str, dict[str, str]],
+    valid_templates: TemplateRegistry,
+    graph: HVACGraph,
+) -> list[str]:
+    """Return warning strings for central air templates on zones no air loop supplies.
+
+    Args:
+        hvac_data: Zone-level HVAC extraction results.
+        valid_templates: The template registry.
+        graph: HVAC connectivity graph of the same model.
+
+    Returns:
+        A list of human-readable warning strings, empty when all zones pass.
+    """
+    warnings: list[str] = []
+    for zone, data in hvac_data.items():
+        info = valid_templates.info(data.get("template", ""))
+        if info is not None and info.family in _AIR_LOOP_FAMILIES and graph.air_loop(zone) is None:
+            warnings.append(f'    - {zone} → "{info.value}" (no air loop reaches the zone)')
+    return warnings
+
+
 def validate_hvac_results(
     hvac_data: dict[str, dict[str, str]],
     file_label: str,
+    graph: HVACGraph | None = None,
 ) -> bool:
     """Cross-check extracted HVAC data against the Honeybee template definitions.
 
@@ -212,12 +359,16 @@ def validate_hvac_results(
     4. Unconditioned zones have DCV and Economizer both set to ``N/A``.
     5. No zone retains the catch-all ``Unknown`` template.
 
+    With the model's HVAC graph, VAV, PVAV and PSZ templates whose zone no air loop
+    reaches are also reported, as warnings that do not fail validation.
+
     Prints a formatted pass/fail summary to stdout.
 
     Args:
         hvac_data: The dictionary returned by ``extract_hvac_systems()``.
         file_label: A human-readable label for the file being validated
             (typically the IDF filename stem).
+        graph: HVAC graph the extraction used (see hvac_graph.py).
 
     Returns:
         ``True`` if every check passes, ``False`` if any check fails.
@@ -228,7 +379,7 @@ def validate_hvac_results(
         _print_result(True, 0)
         return True
 
-    valid_templates = build_valid_template_set()
+    valid_templates = get_template_registry()
     total_zones = len(hvac_data)
     all_errors: list[str] = []
 
@@ -283,6 +434,15 @@ def validate_hvac_results(
     else:
         print("  [OK] Unconditioned zone consistency check passed")
 
+    if graph is not None:
+        loop_warnings = _check_air_loops(hvac_data, valid_templates, graph)
+        if loop_warnings:
+            print(f"  [WARN] {len(loop_warnings)} zone(s) have a central air template but no air loop:")
+            for w in loop_warnings:
+                print(w)
+        else:
+            print("  [OK] Every central air template is served by an air loop")
+
     passed = len(all_errors) == 0
     _print_result(passed, len(all_errors))
     return passed
@@ -302,7 +462,7 @@ def _print_line(file_label: str) -> None:
 
 def _print_zone_detail_table(
     hvac_data: dict[str, dict[str, str]],
-    valid_templates: set[str],
+    valid_templates: TemplateRegistry | set[str],
 ) -> None:
     """Print a formatted table of zone → Honeybee HVAC template mappings.
 
@@ -11,10 +11,17 @@ regardless of building type or source software.
 
 from __future__ import annotations
 
+import heapq
+import json
 import os
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
+from itertools import chain
+from typing import Any, TextIO
+
+import numpy as np
 
 from idf_parser import parse_idf
+from object_matcher import match_leftovers, object_tokens
 
 
 # ── Impact scores (0–10) for energy-relevant object types ─────────────────────
@@ -93,6 +100,48 @@ OBJECT_IMPACT: dict[str, int] = {
     "CURVE:CUBIC": 5,
 }
 
+# ── Impact model for types outside OBJECT_IMPACT (all-types audits) ───────────
+# First matching prefix wins. Constructions and materials are left out of
+# OBJECT_IMPACT (intentional differences are expected there) but do matter in
+# a full audit, so they get a moderate score here.
+_IMPACT_BY_PREFIX: list[tuple[str, int]] = [
+    ("OUTPUT", 0),
+    ("METER:", 0),
+    ("LIFECYCLECOST", 0),
+    ("UTILITYCOST", 0),
+    ("CURRENCYTYPE", 0),
+    ("BOILER:", 9),
+    ("CHILLER:", 9),
+    ("COIL:", 7),
+    ("ZONEINFILTRATION:", 7),
+    ("ZONEVENTILATION:", 7),
+    ("ZONEHVAC:", 7),
+    ("AIRLOOPHVAC", 7),
+    ("COOLINGTOWER:", 6),
+    ("FAN:", 6),
+    ("AIRTERMINAL:", 6),
+    ("WATERHEATER:", 5),
+    ("PUMP:", 5),
+    ("MATERIAL", 5),
+    ("WINDOWMATERIAL:", 5),
+    ("CONSTRUCTION", 5),
+    ("SCHEDULE:", 5),
+    ("SETPOINTMANAGER:", 5),
+    ("DESIGNSPECIFICATION:", 5),
+    ("CURVE:", 4),
+    ("TABLE:", 4),
+    ("SIZING:", 4),
+    ("ENERGYMANAGEMENTSYSTEM:", 4),
+    ("SHADING:", 4),
+    ("AVAILABILITYMANAGER", 3),
+    ("EXTERIOR:", 3),
+    ("SITE:", 3),
+]
+DEFAULT_IMPACT = 2
+
+# Number of entries per category kept for the HTML report when diffs are streamed
+DEFAULT_REPORT_TOP_K = 500
+
 # Relative tolerance (%) for numeric field comparison.
 # Differences below this threshold are treated as matching.
 NUMERIC_TOLERANCE_PCT = 1.0
@@ -129,6 +178,16 @@ class MissingObject:
     side: str  # 'A' = exists only in file_a; 'B' = exists only in file_b
 
 
+@dataclass
+class RenamedObject:
+    """An object matched across files by field similarity despite a different name."""
+    obj_type: str
+    name_a: str
+    name_b: str
+    impact: int
+    similarity: float  # Jaccard similarity of the normalized fields (0–1)
+
+
 @dataclass
 class MissingType:
     """An entire object type present in one file but completely absent from the other."""
@@ -147,105 +206,297 @@ class CompareResult:
     missing_objects: list[MissingObject]
     value_diffs: list[ObjectDiff]
     perfect_matches: int  # count of objects that matched with zero field differences
+    renamed_objects: list[RenamedObject] = field(default_factory=list)
+    # Totals before top-K truncation (None when the lists above are complete)
+    missing_object_count: int | None = None
+    value_diff_count: int | None = None
+    renamed_object_count: int | None = None
+    diff_log: str | None = None  # JSON-lines file holding every entry, if streamed
+
+    @property
+    def total_missing_objects(self) -> int:
+        return self.missing_object_count if self.missing_object_count is not None else len(self.missing_objects)
+
+    @property
+    def total_value_diffs(self) -> int:
+        return self.value_diff_count if self.value_diff_count is not None else len(self.value_diffs)
+
+    @property
+    def total_renamed_objects(self) -> int:
+        return self.renamed_object_count if self.renamed_object_count is not None else len(self.renamed_objects)
 
 
 # ── Internal helpers ───────────────────────────────────────────────────────────
 
-def _is_numeric(s: str) -> bool:
-    try:
-        float(s)
-        return True
-    except (ValueError, TypeError):
-        return False
+def object_impact(obj_type: str) -> int:
+    """Impact score (0–10) of an object type: OBJECT_IMPACT, else prefix rules."""
+    if obj_type in OBJECT_IMPACT:
+        return OBJECT_IMPACT[obj_type]
+    for prefix, score in _IMPACT_BY_PREFIX:
+        if obj_type.startswith(prefix):
+            return score
+    return DEFAULT_IMPACT
 
 
-def _numeric_diff_pct(a: str, b: str) -> float | None:
-    try:
-        fa, fb = float(a), float(b)
-    except (ValueError, TypeError):
-        return None
-    if abs(fa) < NUMERIC_TOLERANCE_ABS and abs(fb) < NUMERIC_TOLERANCE_ABS:
-        return 0.0
-    denom = max(abs(fa), abs(fb))
-    if denom == 0:
-        return 0.0
-    return abs(fa - fb) / denom * 100.0
+class _DiffCollector:
+    """Collects result entries of one kind, sorted by impact (highest first).
 
+    With top_k set only the top_k highest-impact entries are kept (a min-heap
+    keyed by impact, ties resolved in discovery order), so memory stays
+    bounded however many differences there are. With a stream every entry is
+    also written as one JSON line as soon as it is found.
+    """
 
-def _compare_fields(fields_a: list[str], fields_b: list[str]) -> list[FieldDiff]:
-    """Compare two field lists (index 0 = name, skipped) and return diffs."""
-    diffs: list[FieldDiff] = []
-    max_len = max(len(fields_a), len(fields_b))
-    for i in range(1, max_len):  # index 0 is the object name — skip
-        va = fields_a[i] if i < len(fields_a) else ""
-        vb = fields_b[i] if i < len(fields_b) else ""
+    def __init__(self, kind: str, top_k: int | None, stream: TextIO | None):
+        self.kind = kind
+        self.top_k = top_k
+        self.stream = stream
+        self.count = 0
+        self._entries: list[tuple[int, int, Any]] = []
+
+    def add(self, item: Any) -> None:
+        if self.stream is not None:
+            self.stream.write(json.dumps({"kind": self.kind, **asdict(item)}, ensure_ascii=False) + "\n")
+        entry = (item.impact, -self.count, item)  # -count: earlier entries win ties
+        self.count += 1
+        if self.top_k is None or len(self._entries) < self.top_k:
+            heapq.heappush(self._entries, entry)
+        elif self._entries and entry[:2] > self._entries[0][:2]:  # top_k <= 0 keeps nothing
+            heapq.heapreplace(self._entries, entry)
+
+    def results(self) -> list[Any]:
+        return [item for _, _, item in sorted(self._entries, key=lambda e: (-e[0], -e[1]))]
+
+
+def _signature(fields: list[str]) -> str:
+    """Normalized, hashable signature of an object's fields (name excluded).
+
+    Two objects with equal signatures have no field differences, so they can
+    be counted as perfect matches without any per-field work. The fields are
+    joined and lowercased in one pass, which is much cheaper than normalizing
+    and float-parsing them one by one.
+    """
+    return "\x1f".join(fields[1:]).lower()
 
-        if va.strip().lower() == vb.strip().lower():
-            continue
 
-        both_numeric = _is_numeric(va) and _is_numeric(vb)
-        diff_pct = _numeric_diff_pct(va, vb) if both_numeric else None
+class _FieldNormalizer(dict):
+    """Typed field values for vectorized comparison, parsed once per distinct string.
 
-        # Ignore numeric differences within tolerance
-        if diff_pct is not None and diff_pct <= NUMERIC_TOLERANCE_PCT:
-            continue
+    IDF files repeat the same values (0, autosize, schedule and node names)
+    many times, so each distinct raw string gets one row in a value table:
+    its normalized text (stripped, lowercased) as an integer code, its float
+    value and whether it is numeric. Objects then become rows of table
+    indices, and comparisons gather typed values from the table with NumPy.
+    Index 0 is the empty field used to pad shorter objects.
+    """
+
+    def __init__(self) -> None:
+        super().__init__({"": 0})
+        self._text_codes: dict[str, int] = {"": 0}
+        self.text = np.zeros(1, dtype=np.int32)
+        self.value = np.full(1, np.nan)
+        self.numeric = np.zeros(1, dtype=bool)
+        # Rows added since the arrays were last extended
+        self._pending: list[tuple[int, float, bool]] = []
+
+    def __missing__(self, raw: str) -> int:
+        idx = self[raw] = len(self)
+        code = self._text_codes.setdefault(raw.strip().lower(), len(self._text_codes))
+        try:
+            self._pending.append((code, float(raw), True))
+        except ValueError:
+            self._pending.append((code, np.nan, False))
+        return idx
+
+    def seed(self, objects: list[list[str]]) -> None:
+        """Adds the field values (name excluded) of objects to the value table."""
+        for fields in objects:
+            for raw in fields[1:]:
+                if raw not in self:
+                    self.__missing__(raw)
+        self._flush()
+
+    def _flush(self) -> None:
+        if self._pending:
+            text, value, numeric = zip(*self._pending)
+            self.text = np.concatenate([self.text, np.array(text, dtype=np.int32)])
+            self.value = np.concatenate([self.value, np.array(value, dtype=np.float64)])
+            self.numeric = np.concatenate([self.numeric, np.array(numeric, dtype=bool)])
+            self._pending = []
+
+    def normalize(self, objects: list[list[str]], width: int) -> np.ndarray:
+        """Value-table indices of the objects' fields (name excluded).
+
+        Returns:
+            An int32 array of shape (len(objects), width); column c holds
+            field c + 1, shorter objects are padded with the empty field.
+        """
+        lengths = np.fromiter((len(fields) - 1 for fields in objects), dtype=np.int64, count=len(objects))
+        np.clip(lengths, 0, width, out=lengths)
+        flat = np.fromiter(
+            map(self.__getitem__, chain.from_iterable(fields[1:width + 1] for fields in objects)),
+            dtype=np.int32,
+            count=int(lengths.sum()),
+        )
+        if (lengths == width).all():
+            return flat.reshape(len(objects), width)
+        rows = np.zeros((len(objects), width), dtype=np.int32)
+        rows[np.arange(width) < lengths[:, None]] = flat
+        return rows
+
+    def differences(self, ids_a: np.ndarray, ids_b: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Element-wise comparison of two same-shape arrays of value indices.
+
+        A field differs when its normalized text differs and it is not a
+        pair of numbers within NUMERIC_TOLERANCE_PCT (values both below
+        NUMERIC_TOLERANCE_ABS count as equal).
+
+        Returns:
+            differs:      bool mask of differing fields
+            both_numeric: bool mask of fields numeric on both sides
+            diff_pct:     relative difference in percent where both_numeric
+        """
+        self._flush()
+        both_numeric = self.numeric[ids_a] & self.numeric[ids_b]
+        va, vb = self.value[ids_a], self.value[ids_b]
+        abs_a, abs_b = np.abs(va), np.abs(vb)
+        denom = np.where(abs_b > abs_a, abs_b, abs_a)
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            diff_pct = np.abs(va - vb) / denom * 100.0
+        diff_pct[((abs_a < NUMERIC_TOLERANCE_ABS) & (abs_b < NUMERIC_TOLERANCE_ABS)) | (denom == 0)] = 0.0
+
+        differs = (self.text[ids_a] != self.text[ids_b]) & ~(both_numeric & (diff_pct <= NUMERIC_TOLERANCE_PCT))
+        return differs, both_numeric, diff_pct
+
+
+def _compare_field_lists(
+    pairs: list[tuple[list[str], list[str]]],
+    normalizer: _FieldNormalizer | None = None,
+) -> list[list[FieldDiff]]:
+    """Compares many (fields_a, fields_b) pairs, typically of one object type.
+
+    Only fields whose raw strings differ are candidates; they are looked up
+    in the normalizer's value table and checked against the tolerance in one
+    vectorized pass, instead of stripping and float-parsing every field.
 
-        diffs.append(FieldDiff(
-            field_index=i,
-            value_a=va,
-            value_b=vb,
-            is_numeric=both_numeric,
-            diff_pct=diff_pct,
+    Returns:
+        One list of FieldDiff per pair, in input order (fields ascending).
+    """
+    normalizer = normalizer or _FieldNormalizer()
+    owner: list[int] = []
+    index: list[int] = []
+    raw_a: list[str] = []
+    raw_b: list[str] = []
+    for k, (fields_a, fields_b) in enumerate(pairs):
+        cells = [i for i, (va, vb) in enumerate(zip(fields_a, fields_b)) if va != vb and i]
+        len_a, len_b = len(fields_a), len(fields_b)
+        if len_a != len_b:
+            cells.extend(range(max(min(len_a, len_b), 1), max(len_a, len_b)))
+        if not cells:
+            continue
+        owner.extend([k] * len(cells))
+        index.extend(cells)
+        raw_a.extend(fields_a[i] if i < len_a else "" for i in cells)
+        raw_b.extend(fields_b[i] if i < len_b else "" for i in cells)
+
+    results: list[list[FieldDiff]] = [[] for _ in pairs]
+    if not index:
+        return results
+    ids_a = np.fromiter(map(normalizer.__getitem__, raw_a), dtype=np.int64, count=len(raw_a))
+    ids_b = np.fromiter(map(normalizer.__getitem__, raw_b), dtype=np.int64, count=len(raw_b))
+    differs, both_numeric, diff_pct = normalizer.differences(ids_a, ids_b)
+
+    for n in np.flatnonzero(differs).tolist():
+        numeric = bool(both_numeric[n])
+        results[owner[n]].append(FieldDiff(
+            field_index=index[n],
+            value_a=raw_a[n],
+            value_b=raw_b[n],
+            is_numeric=numeric,
+            diff_pct=float(diff_pct[n]) if numeric else None,
         ))
-    return diffs
+    return results
+
+
+def _compare_fields(fields_a: list[str], fields_b: list[str]) -> list[FieldDiff]:
+    """Compare two field lists (index 0 = name, skipped) and return diffs."""
+    return _compare_field_lists([(fields_a, fields_b)])[0]
+
+
+def _object_keys(objs: list[list[str]]) -> list[str]:
+    """Case-insensitive name keys of objects (field[0]), "" for empty objects."""
+    return [obj[0].strip().lower() if obj else "" for obj in objs]
 
 
 def _match_objects(
     objs_a: list[list[str]],
     objs_b: list[list[str]],
+    names_a: list[str] | None = None,
 ) -> tuple[list[tuple[list[str], list[str]]], list[list[str]], list[list[str]]]:
     """Match object instances by name (field[0], case-insensitive).
 
+    Args:
+        objs_a: Objects of one type from file A.
+        objs_b: Objects of the same type from file B.
+        names_a: Precomputed _object_keys(objs_a), e.g. from a reference snapshot.
+
     Returns:
         matched: list of (fields_a, fields_b) pairs
         only_a:  objects in A with no name match in B
         only_b:  objects in B with no name match in A
     """
-    index_b: dict[str, list[str]] = {}
-    for obj in objs_b:
-        name = obj[0].strip().lower() if obj else ""
-        index_b[name] = obj
+    names_b = _object_keys(objs_b)
+    index_b: dict[str, list[str]] = dict(zip(names_b, objs_b))
 
     matched: list[tuple[list[str], list[str]]] = []
     only_a: list[list[str]] = []
     used_b: set[str] = set()
 
-    for obj_a in objs_a:
-        name = obj_a[0].strip().lower() if obj_a else ""
+    for obj_a, name in zip(objs_a, names_a if names_a is not None else _object_keys(objs_a)):
         if name in index_b:
             matched.append((obj_a, index_b[name]))
             used_b.add(name)
         else:
             only_a.append(obj_a)
 
-    only_b = [
-        obj for obj in objs_b
-        if (obj[0].strip().lower() if obj else "") not in used_b
-    ]
+    only_b = [obj for name, obj in zip(names_b, objs_b) if name not in used_b]
     return matched, only_a, only_b
 
 
 # ── Public API ─────────────────────────────────────────────────────────────────
 
-def compare_idfs(path_a: str, path_b: str) -> CompareResult:
+def compare_idfs(
+    path_a: str,
+    path_b: str,
+    fuzzy: bool = True,
+    all_types: bool = False,
+    diff_log: str | None = None,
+    top_k: int | None = None,
+) -> CompareResult:
     """Compare two IDF files and return a structured diff result.
 
-    Only object types listed in OBJECT_IMPACT are analysed. Objects are matched
-    by name (field[0]). Field comparisons use a 1% numeric tolerance.
+    By default only object types listed in OBJECT_IMPACT are analysed; with
+    all_types every object type is, scored by object_impact(). Objects are matched
+    by name (field[0]). Field comparisons use a 1% numeric tolerance; matched
+    pairs with identical normalized fields are counted as perfect matches
+    without per-field work.
+
+    With fuzzy matching, objects left unmatched by name are paired by field
+    similarity (object_matcher), so renamed objects are compared instead of
+    being reported as missing from both sides. Unnamed objects are then
+    matched by similarity instead of position, which tolerates reordering.
 
     Args:
         path_a: Path to the trusted reference IDF file.
         path_b: Path to the IDF file being questioned.
+        fuzzy: Pair leftover objects by similarity (default True).
+        all_types: Compare every object type, not only OBJECT_IMPACT.
+        diff_log: Stream every result entry to this JSON-lines file as it is
+            found (one {"kind": ..., ...} object per line).
+        top_k: Keep only the top_k highest-impact entries of each kind in the
+            returned result (default: all, or DEFAULT_REPORT_TOP_K when
+            diff_log is given). The counts before truncation are kept in
+            missing_object_count / value_diff_count.
 
     Returns:
         CompareResult sorted by impact score (highest first).
@@ -257,29 +508,131 @@ def compare_idfs(path_a: str, path_b: str) -> CompareResult:
 
     idf_a = {k.upper(): v for k, v in parse_idf(path_a).items()}
     idf_b = {k.upper(): v for k, v in parse_idf(path_b).items()}
+    return compare_parsed_idfs(path_a, path_b, idf_a, idf_b, fuzzy, all_types, diff_log, top_k)
+
+
+@dataclass
+class ReferenceIndex:
+    """Per-object data of a reference file (A) that no candidate changes.
+
+    Built once by index_reference(), e.g. into a reference snapshot, so
+    comparing many candidates against the same reference does not redo it.
+    Each list is aligned with the objects of its type in the parsed file.
+    """
+    names: dict[str, list[str]]                 # _object_keys() per type
+    signatures: dict[str, list[str]]            # _signature() of each object
+    tokens: dict[str, list[frozenset[str]]]     # object_matcher.object_tokens() of each object
+    normalizer: _FieldNormalizer                # value table seeded with every field of A
+    # id(object) → position per type, rebuilt after unpickling
+    _positions: dict[str, dict[int, int]] = field(default_factory=dict, repr=False, compare=False)
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {**self.__dict__, "_positions": {}}
+
+    def position(self, obj_type: str, objs: list[list[str]], fields: list[str]) -> int:
+        """Index of `fields` among objs, the indexed objects of obj_type."""
+        positions = self._positions.get(obj_type)
+        if positions is None:
+            positions = self._positions[obj_type] = {id(obj): k for k, obj in enumerate(objs)}
+        return positions[id(fields)]
+
+
+def index_reference(idf: dict[str, list[list[str]]]) -> ReferenceIndex:
+    """Precomputes the ReferenceIndex of a parsed file (object types uppercased)."""
+    value_table = _FieldNormalizer()
+    for objs in idf.values():
+        value_table.seed(objs)
+    return ReferenceIndex(
+        names={t: _object_keys(objs) for t, objs in idf.items()},
+        signatures={t: [_signature(obj) for obj in objs] for t, objs in idf.items()},
+        tokens={t: [object_tokens(obj) for obj in objs] for t, objs in idf.items()},
+        normalizer=value_table,
+    )
+
+
+def compare_parsed_idfs(
+    path_a: str,
+    path_b: str,
+    idf_a: dict[str, list[list[str]]],
+    idf_b: dict[str, list[list[str]]],
+    fuzzy: bool = True,
+    all_types: bool = False,
+    diff_log: str | None = None,
+    top_k: int | None = None,
+    index_a: ReferenceIndex | None = None,
+) -> CompareResult:
+    """compare_idfs() on already parsed files (object types uppercased).
+
+    Args:
+        path_a, path_b: Paths recorded in the result.
+        idf_a, idf_b: Parsed files, keyed by uppercase object type.
+        fuzzy, all_types, diff_log, top_k: As for compare_idfs().
+        index_a: index_reference(idf_a), e.g. from a reference snapshot; its
+            names, signatures and tokens replace per-call work on file A. Its
+            value table grows with the candidate values it sees; results do
+            not depend on it.
 
+    Returns:
+        CompareResult sorted by impact score (highest first).
+    """
     types_a = set(idf_a.keys())
     types_b = set(idf_b.keys())
-    relevant = set(OBJECT_IMPACT.keys())
+    relevant = (types_a | types_b) if all_types else set(OBJECT_IMPACT.keys())
+    if diff_log is not None and top_k is None:
+        top_k = DEFAULT_REPORT_TOP_K
+
+    stream = None
+    if diff_log is not None:
+        os.makedirs(os.path.dirname(os.path.abspath(diff_log)), exist_ok=True)
+        stream = open(diff_log, "w", encoding="utf-8")
+    try:
+        return _compare_parsed(
+            path_a, path_b, idf_a, idf_b, relevant, fuzzy, top_k, stream, diff_log, index_a
+        )
+    finally:
+        if stream is not None:
+            stream.close()
+
+
+def _compare_parsed(
+    path_a: str,
+    path_b: str,
+    idf_a: dict[str, list[list[str]]],
+    idf_b: dict[str, list[list[str]]],
+    relevant: set[str],
+    fuzzy: bool,
+    top_k: int | None,
+    stream: TextIO | None,
+    diff_log: str | None,
+    index_a: ReferenceIndex | None = None,
+) -> CompareResult:
+    """Body of compare_idfs() once both files are parsed (index_a: see compare_parsed_idfs())."""
+    types_a = set(idf_a.keys())
+    types_b = set(idf_b.keys())
+
+    if stream is not None:
+        stream.write(json.dumps({"kind": "header", "file_a": path_a, "file_b": path_b}) + "\n")
 
-    missing_types: list[MissingType] = []
-    missing_objects: list[MissingObject] = []
-    value_diffs: list[ObjectDiff] = []
+    missing_types = _DiffCollector("missing_type", None, stream)
+    missing_objects = _DiffCollector("missing_object", top_k, stream)
+    value_diffs = _DiffCollector("value_diff", top_k, stream)
+    renamed_objects = _DiffCollector("renamed_object", top_k, stream)
     perfect_matches = 0
+    normalizer = index_a.normalizer if index_a is not None else _FieldNormalizer()
 
     # ── Entire types missing from one file ────────────────────────────────────
     for t in sorted((types_a - types_b) & relevant):
-        missing_types.append(MissingType(
+        missing_types.add(MissingType(
             obj_type=t,
             count=len(idf_a[t]),
-            impact=OBJECT_IMPACT[t],
+            impact=object_impact(t),
             side="A",
         ))
     for t in sorted((types_b - types_a) & relevant):
-        missing_types.append(MissingType(
+        missing_types.add(MissingType(
             obj_type=t,
             count=len(idf_b[t]),
-            impact=OBJECT_IMPACT[t],
+            impact=object_impact(t),
             side="B",
         ))
 
@@ -287,7 +640,7 @@ def compare_idfs(path_a: str, path_b: str) -> CompareResult:
     for obj_type in sorted((types_a & types_b) & relevant):
         objs_a = idf_a[obj_type]
         objs_b = idf_b[obj_type]
-        impact = OBJECT_IMPACT[obj_type]
+        impact = object_impact(obj_type)
 
         # Skip degenerate empty objects
         if not objs_a or not objs_b:
@@ -296,7 +649,12 @@ def compare_idfs(path_a: str, path_b: str) -> CompareResult:
         has_names = any(obj and obj[0].strip() for obj in objs_a)
 
         if has_names:
-            matched, only_a, only_b = _match_objects(objs_a, objs_b)
+            matched, only_a, only_b = _match_objects(
+                objs_a, objs_b, index_a.names.get(obj_type) if index_a else None
+            )
+        elif fuzzy:
+            # No name field — everything is matched by similarity below
+            matched, only_a, only_b = [], objs_a, objs_b
         else:
             # No name field — match positionally
             min_len = min(len(objs_a), len(objs_b))
@@ -304,22 +662,58 @@ def compare_idfs(path_a: str, path_b: str) -> CompareResult:
             only_a = objs_a[min_len:]
             only_b = objs_b[min_len:]
 
+        if fuzzy and only_a and only_b:
+            tokens_a = None
+            if index_a is not None:
+                tokens_a = [index_a.tokens[obj_type][index_a.position(obj_type, objs_a, obj)]
+                            for obj in only_a]
+            pairs, rest_a, rest_b = match_leftovers(only_a, only_b, tokens_a=tokens_a)
+            for i, j, similarity in pairs:
+                fields_a, fields_b = only_a[i], only_b[j]
+                matched.append((fields_a, fields_b))
+                name_a = fields_a[0].strip() if fields_a else ""
+                name_b = fields_b[0].strip() if fields_b else ""
+                if has_names and name_a.lower() != name_b.lower():
+                    renamed_objects.add(RenamedObject(
+                        obj_type=obj_type, name_a=name_a, name_b=name_b,
+                        impact=impact, similarity=round(similarity, 3),
+                    ))
+            only_a = [only_a[i] for i in rest_a]
+            only_b = [only_b[j] for j in rest_b]
+
         for obj in only_a:
             name = obj[0].strip() if obj else "(unnamed)"
-            missing_objects.append(MissingObject(
+            missing_objects.add(MissingObject(
                 obj_type=obj_type, obj_name=name, impact=impact, side="A"
             ))
         for obj in only_b:
             name = obj[0].strip() if obj else "(unnamed)"
-            missing_objects.append(MissingObject(
+            missing_objects.add(MissingObject(
                 obj_type=obj_type, obj_name=name, impact=impact, side="B"
             ))
 
+        # Fast path: identical (or identical once normalized) fields → perfect match
+        to_diff = []
         for fields_a, fields_b in matched:
-            diffs = _compare_fields(fields_a, fields_b)
+            if fields_a[1:] == fields_b[1:]:
+                perfect_matches += 1
+                continue
+            if index_a is not None:
+                signature_a = index_a.signatures[obj_type][index_a.position(obj_type, objs_a, fields_a)]
+            else:
+                signature_a = _signature(fields_a)
+            if signature_a == _signature(fields_b):
+                perfect_matches += 1
+            else:
+                to_diff.append((fields_a, fields_b))
+
+        for (fields_a, fields_b), diffs in zip(to_diff, _compare_field_lists(to_diff, normalizer)):
             name = fields_a[0].strip() if fields_a else "(unnamed)"
+            name_b = fields_b[0].strip() if fields_b else ""
+            if has_names and name_b.lower() != name.lower():
+                name = f"{name} → {name_b}"
             if diffs:
-                value_diffs.append(ObjectDiff(
+                value_diffs.add(ObjectDiff(
                     obj_type=obj_type,
                     obj_name=name,
                     impact=impact,
@@ -328,18 +722,29 @@ def compare_idfs(path_a: str, path_b: str) -> CompareResult:
             else:
                 perfect_matches += 1
 
-    # Sort all results by impact descending
-    missing_types.sort(key=lambda x: x.impact, reverse=True)
-    missing_objects.sort(key=lambda x: x.impact, reverse=True)
-    value_diffs.sort(key=lambda x: x.impact, reverse=True)
-
+    if stream is not None:
+        stream.write(json.dumps({
+            "kind": "summary",
+            "missing_types": missing_types.count,
+            "missing_objects": missing_objects.count,
+            "value_diffs": value_diffs.count,
+            "renamed_objects": renamed_objects.count,
+            "perfect_matches": perfect_matches,
+        }) + "\n")
+
+    # All results sorted by impact descending
     return CompareResult(
         file_a=path_a,
         file_b=path_b,
-        missing_types=missing_types,
-        missing_objects=missing_objects,
-        value_diffs=value_diffs,
+        missing_types=missing_types.results(),
+        missing_objects=missing_objects.results(),
+        value_diffs=value_diffs.results(),
         perfect_matches=perfect_matches,
+        renamed_objects=renamed_objects.results(),
+        missing_object_count=missing_objects.count,
+        value_diff_count=value_diffs.count,
+        renamed_object_count=renamed_objects.count,
+        diff_log=diff_log,
     )
 
 
@@ -353,9 +758,12 @@ def print_summary(result: CompareResult) -> None:
     print(f"  Compare   : {name_b}")
     print(f"{'='*60}")
     print(f"  Missing object types : {len(result.missing_types)}")
-    print(f"  Missing objects      : {len(result.missing_objects)}")
-    print(f"  Objects with diffs   : {len(result.value_diffs)}")
+    print(f"  Missing objects      : {result.total_missing_objects}")
+    print(f"  Objects with diffs   : {result.total_value_diffs}")
     print(f"  Perfect matches      : {result.perfect_matches}")
+    print(f"  Renamed objects      : {result.total_renamed_objects}")
+    if result.diff_log:
+        print(f"  Full diff log        : {result.diff_log}")
 
     if result.missing_types:
         print(f"\n  Top missing types (by impact):")
@@ -0,0 +1,305 @@
+from __future__ import annotations
+
+"""
+IDF Comparison Matrix Module.
+
+N-way comparison of many variants of one base model (e.g. the outputs of a
+parametric study). Each file is parsed once — in parallel worker processes
+when there are several — and indexed as object type → object key → field
+signature. The matrix is then built from the signature index alone:
+
+- objects whose signature is the same in every variant are skipped outright;
+- only keys that vary are diffed, and only between one representative per
+  distinct signature (not per variant), using the same 1% numeric tolerance
+  as idf_comparator.
+
+This yields a variance report (which objects and fields vary across the set)
+and a pairwise distance matrix (number of differing objects between every two
+variants) without running O(N²) full compare_idfs() calls.
+
+Usage:
+    python idf_matrix.py variants/*.idf --output-dir outputs/output_comparator
+"""
+
+import argparse
+import csv
+import glob
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from idf_comparator import OBJECT_IMPACT, _FieldNormalizer, _signature
+from idf_parser import parse_idf
+
+
+@dataclass
+class VariantIndex:
+    """One parsed variant, indexed for N-way comparison."""
+    path: str
+    # obj_type → object key → raw fields (key = lowercased name, or "#<i>" for unnamed types)
+    objects: dict[str, dict[str, list[str]]]
+    # obj_type → object key → digest of the normalized field signature
+    signatures: dict[str, dict[str, bytes]]
+
+
+@dataclass
+class KeyVariance:
+    """One object that differs in at least one variant."""
+    obj_type: str
+    obj_name: str
+    impact: int
+    present: int                 # number of variants containing the object
+    distinct: int                # number of distinct values (beyond tolerance)
+    varying_fields: list[int] = field(default_factory=list)
+
+
+@dataclass
+class MatrixResult:
+    """Result of an N-way comparison."""
+    paths: list[str]
+    distance: np.ndarray         # (N, N) count of differing objects per pair
+    variance: list[KeyVariance]  # sorted by impact, then distinct values
+    invariant_objects: int       # objects identical in every variant
+
+
+def index_idf(path: str, types: set[str] | None = None) -> VariantIndex:
+    """Parses one IDF and builds its per-type signature index.
+
+    Args:
+        path: Path to the IDF file.
+        types: Uppercase object types to index (default: OBJECT_IMPACT keys).
+
+    Returns:
+        The VariantIndex for the file.
+    """
+    relevant = types if types is not None else set(OBJECT_IMPACT)
+    idf_data = {k.upper(): v for k, v in parse_idf(path).items()}
+
+    objects: dict[str, dict[str, list[str]]] = {}
+    signatures: dict[str, dict[str, bytes]] = {}
+    for obj_type, objs in idf_data.items():
+        if obj_type not in relevant or not objs:
+            continue
+        # Same matching rule as compare_idfs(fuzzy=False): by name, else by position
+        if any(obj and obj[0].strip() for obj in objs):
+            keyed = {(obj[0].strip().lower() if obj else ""): obj for obj in objs}
+        else:
+            keyed = {f"#{i}": obj for i, obj in enumerate(objs)}
+        objects[obj_type] = keyed
+        # A digest (not hash()) so signatures compare equal across worker processes
+        signatures[obj_type] = {
+            key: hashlib.blake2b(_signature(obj).encode("utf-8"), digest_size=16).digest()
+            for key, obj in keyed.items()
+        }
+    return VariantIndex(path, objects, signatures)
+
+
+def index_idfs(paths: list[str], workers: int | None = None) -> list[VariantIndex]:
+    """Indexes every file, in parallel when more than one worker is allowed.
+
+    Args:
+        paths: IDF file paths.
+        workers: Worker processes (default: one per file, capped at the CPU
+            count). 1 indexes serially in this process.
+
+    Returns:
+        One VariantIndex per path, in input order.
+    """
+    workers = workers or min(len(paths), os.cpu_count() or 1)
+    if workers <= 1 or len(paths) <= 1:
+        return [index_idf(p) for p in paths]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(index_idf, paths))
+
+
+def _pair_distance_table(
+    reps: list[list[str]], normalizer: _FieldNormalizer
+) -> tuple[np.ndarray, set[int]]:
+    """Diffs one representative per distinct signature against each other.
+
+    All G·(G-1)/2 pairs are compared in one vectorized pass over the
+    representatives' normalized fields.
+
+    Returns:
+        A (G+1, G+1) 0/1 matrix of "differs beyond tolerance" between groups,
+        where the last row/column stands for "object absent", and the union
+        of field indices that differ between any two groups.
+    """
+    g = len(reps)
+    table = np.ones((g + 1, g + 1), dtype=np.int32)
+    np.fill_diagonal(table, 0)
+    if g < 2:
+        return table, set()
+
+    rows = normalizer.normalize(reps, max(max(len(r) for r in reps), 2) - 1)
+    ia, ib = np.triu_indices(g, 1)
+    differs, _, _ = normalizer.differences(rows[ia], rows[ib])
+    same = ~differs.any(axis=1)
+    table[ia[same], ib[same]] = table[ib[same], ia[same]] = 0
+    return table, set((np.flatnonzero(differs.any(axis=0)) + 1).tolist())
+
+
+def compare_matrix(paths: list[str], workers: int | None = None) -> MatrixResult:
+    """Compares N IDF variants against each other.
+
+    Objects are matched by type and case-insensitive name, or by position for
+    types without names, as in compare_idfs(fuzzy=False). There is no
+    similarity matching, so a renamed object counts as missing from the
+    variants that renamed it. Two variants differ on an object when it is
+    missing from one of them or has field differences beyond the 1% numeric
+    tolerance.
+
+    Args:
+        paths: IDF file paths (at least two).
+        workers: Worker processes used for parsing.
+
+    Returns:
+        MatrixResult with the distance matrix and variance report.
+    """
+    for p in paths:
+        if not os.path.exists(p):
+            raise FileNotFoundError(f"IDF not found: {p}")
+
+    indexes = index_idfs(paths, workers)
+    n = len(indexes)
+    distance = np.zeros((n, n), dtype=np.int64)
+    variance: list[KeyVariance] = []
+    invariant = 0
+    normalizer = _FieldNormalizer()
+
+    all_types = sorted(set().union(*(ix.signatures.keys() for ix in indexes)))
+    for obj_type in all_types:
+        per_variant = [ix.signatures.get(obj_type, {}) for ix in indexes]
+        keys = set().union(*per_variant)
+        impact = OBJECT_IMPACT.get(obj_type, 0)
+
+        for key in sorted(keys):
+            sigs = [s.get(key) for s in per_variant]
+            distinct = {sig for sig in sigs if sig is not None}
+            if len(distinct) == 1 and None not in sigs:
+                invariant += 1
+                continue
+
+            # Group variants by signature; label n_groups = absent
+            group_of: dict[bytes, int] = {}
+            reps: list[list[str]] = []
+            labels = np.empty(n, dtype=np.int64)
+            for i, sig in enumerate(sigs):
+                if sig is None:
+                    labels[i] = -1
+                    continue
+                if sig not in group_of:
+                    group_of[sig] = len(reps)
+                    reps.append(indexes[i].objects[obj_type][key])
+                labels[i] = group_of[sig]
+            labels[labels == -1] = len(reps)
+
+            table, varying = _pair_distance_table(reps, normalizer)
+            contribution = table[np.ix_(labels, labels)]
+            if not contribution.any():
+                invariant += 1
+                continue
+            distance += contribution
+
+            # Distinct values beyond tolerance (greedy: a group equal to an earlier one is merged)
+            distinct_values = sum(
+                1 for gi in range(len(reps)) if all(table[gi, gj] for gj in range(gi))
+            )
+            first = reps[0]
+            variance.append(KeyVariance(
+                obj_type=obj_type,
+                obj_name=first[0].strip() if first and not key.startswith("#") else key,
+                impact=impact,
+                present=int(sum(sig is not None for sig in sigs)),
+                distinct=distinct_values,
+                varying_fields=sorted(varying),
+            ))
+
+    variance.sort(key=lambda v: (v.impact, v.distinct), reverse=True)
+    return MatrixResult(paths=list(paths), distance=distance, variance=variance, invariant_objects=invariant)
+
+
+def print_matrix_summary(result: MatrixResult, top: int = 15) -> None:
+    """Prints a compact console summary of an N-way comparison."""
+    names = [os.path.splitext(os.path.basename(p))[0] for p in result.paths]
+    print(f"\n{'='*60}")
+    print(f"  IDF Comparison Matrix ({len(names)} variants)")
+    print(f"{'='*60}")
+    print(f"  Objects identical in all variants : {result.invariant_objects}")
+    print(f"  Objects varying across variants   : {len(result.variance)}")
+
+    if result.variance:
+        print(f"\n  Top varying objects (by impact):")
+        for v in result.variance[:top]:
+            fields = ", ".join(map(str, v.varying_fields[:8])) or "-"
+            print(
+                f"    [{v.impact}/10] {v.obj_type} :: {v.obj_name}  "
+                f"({v.distinct} value(s), in {v.present}/{len(names)}, fields {fields})"
+            )
+
+    print(f"\n  Pairwise distance (differing objects):")
+    width = max(len(str(int(result.distance.max()))) if result.distance.size else 1, 3)
+    print("    " + " ".join(f"{i:>{width}}" for i in range(len(names))))
+    for i, row in enumerate(result.distance):
+        print(f"    " + " ".join(f"{int(d):>{width}}" for d in row) + f"   [{i}] {names[i]}")
+    print(f"{'='*60}\n")
+
+
+def write_matrix_csv(result: MatrixResult, output_dir: str, stem: str = "comparison_matrix") -> list[str]:
+    """Writes the distance matrix and variance report as CSV files.
+
+    Args:
+        result: The MatrixResult to write.
+        output_dir: Destination directory.
+        stem: File name prefix.
+
+    Returns:
+        The paths written: [distance CSV, variance CSV].
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    names = [os.path.splitext(os.path.basename(p))[0] for p in result.paths]
+
+    distance_path = os.path.join(output_dir, f"{stem}_distance.csv")
+    with open(distance_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow([""] + names)
+        for name, row in zip(names, result.distance):
+            writer.writerow([name] + [int(d) for d in row])
+
+    variance_path = os.path.join(output_dir, f"{stem}_variance.csv")
+    with open(variance_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Object Type", "Object Name", "Impact", "Present In", "Distinct Values", "Varying Fields"])
+        for v in result.variance:
+            writer.writerow([
+                v.obj_type, v.obj_name, v.impact, v.present, v.distinct,
+                " ".join(map(str, v.varying_fields)),
+            ])
+
+    print(f"  Matrix written: {distance_path}")
+    print(f"  Variance written: {variance_path}")
+    return [distance_path, variance_path]
+
+
+def _cli() -> None:
+    """Command-line interface entry point."""
+    parser = argparse.ArgumentParser(description="N-way comparison of IDF variants.")
+    parser.add_argument("idf_files", nargs="+", help="IDF files or glob patterns (at least two files).")
+    parser.add_argument("--output-dir", default=os.path.join(os.getcwd(), "outputs", "output_comparator"))
+    parser.add_argument("--workers", type=int, help="Parallel parse workers (default: one per file, up to CPU count).")
+    args = parser.parse_args()
+
+    paths = sorted({os.path.abspath(p) for pattern in args.idf_files for p in glob.glob(pattern)})
+    if len(paths) < 2:
+        parser.error("at least two IDF files are required")
+
+    result = compare_matrix(paths, args.workers)
+    print_matrix_summary(result)
+    write_matrix_csv(result, args.output_dir)
+
+
+if __name__ == "__main__":
+    _cli()
@@ -8,6 +8,21 @@ comments and normalizing whitespace.
 
 import os
 import re
+from dataclasses import dataclass
+
+
+# A comment (to end of line) or a field / object separator
+_TOKEN_RE = re.compile(r"!.*|[,;]")
+_COMMENT_RE = re.compile(r"!.*")
+
+
+@dataclass
+class ObjectSpan:
+    """An IDF object with the character offsets of its field values."""
+    obj_type: str                       # uppercase object type
+    fields: list[str]                   # field values, as parse_idf() returns them
+    field_spans: list[tuple[int, int]]  # (start, end) offsets of each field value (up to any comment)
+    end: int                            # offset of the terminating semicolon
 
 
 def parse_idf(file_path: str) -> dict[str, list[list[str]]]:
@@ -59,3 +74,61 @@ def parse_idf(file_path: str) -> dict[str, list[list[str]]]:
         idf_data[obj_type].append(obj_values)
 
     return idf_data
+
+
+def scan_idf_objects(content: str) -> list[ObjectSpan]:
+    """Tokenizes IDF text like parse_idf(), keeping where each field value is.
+
+    Offsets index into ``content``, so a caller can rewrite single field
+    values (or insert fields before ``end``) and leave every other byte of
+    the file, including comments and layout, untouched.
+
+    A value interrupted by a comment (``foo ! note`` + ``bar,`` on the next
+    line) is returned without the comment, as parse_idf() does, but its span
+    stops at the comment so a splice never removes it.
+
+    Args:
+        content: The IDF text. Decode files as latin-1 to make character
+            offsets equal byte offsets.
+
+    Returns:
+        The objects in file order.
+    """
+    objects: list[ObjectSpan] = []
+    fields: list[str] = []
+    spans: list[tuple[int, int]] = []
+    value_start = value_end = -1   # stripped value text of the current field, up to any comment
+    split = False                  # a comment interrupts the current field's value
+    field_pos = pos = 0
+
+    for match in _TOKEN_RE.finditer(content):
+        # Text between the previous token and this one belongs to the field
+        segment = content[pos:match.start()]
+        stripped = segment.strip()
+        if stripped:
+            if value_start < 0:
+                value_start = pos + (len(segment) - len(segment.lstrip()))
+                value_end = value_start + len(stripped)
+            else:
+                split = True
+        pos = match.end()
+
+        token = match.group()
+        if token[0] == "!":
+            continue
+        if value_start < 0:
+            value_start = value_end = match.start()
+        if split:
+            fields.append(_COMMENT_RE.sub("", content[field_pos:match.start()]).strip())
+        else:
+            fields.append(content[value_start:value_end])
+        spans.append((value_start, value_end))
+        value_start = value_end = -1
+        split = False
+        field_pos = pos
+        if token == ";":
+            if fields != [""]:
+                objects.append(ObjectSpan(fields[0].upper(), fields[1:], spans[1:], match.start()))
+            fields, spans = [], []
+
+    return objects
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import os
 import sys
+from typing import Callable
 
 from extractors import (
     extract_hvac_systems,
@@ -16,8 +17,20 @@ from extractors import (
 )
 from construction_extractor import extract_baseline_constructions
 from geometry import get_zone_geometry
+from hvac_graph import build_hvac_graph
 from hvac_validator import validate_hvac_results
+from batch_manifest import (
+    STATUS_COMPLETED,
+    STATUS_FAILED,
+    get_entry,
+    is_up_to_date,
+    load_manifest,
+    record_entry,
+    save_manifest,
+)
 from idf_parser import parse_idf
+from instrumentation import Profiler
+from metadata_store import file_digest, open_store, store_file_metadata
 from process_load_extractor import extract_building_process_loads
 from report_generator import generate_reports
 from schedule_extractor import extract_zone_schedules
@@ -87,53 +100,117 @@ def select_idf_interactive(base_dir: str) -> list[str]:
         print("Invalid selection. Please try again.")
 
 
-def process_file(idf_path: str, output_dir: str) -> None:
+def process_file(
+    idf_path: str,
+    output_dir: str,
+    image_mode: str = "inline",
+    asset_dir: str | None = None,
+    db_path: str | None = None,
+    profiler: Profiler | None = None,
+) -> dict:
     """Parse a single IDF file and generate metadata reports.
 
     Args:
         idf_path: The absolute path to the .idf file.
         output_dir: The directory where the reports will be saved.
+        image_mode: How the 3D visualization is stored ("inline", "sibling"
+            or "assets"); see report_generator.generate_reports.
+        asset_dir: Shared content-addressed image directory for "assets" mode.
+        db_path: Optional SQLite metadata store; when given, the extracted
+            results are also written there (see metadata_store).
+        profiler: Optional Profiler collecting per-stage spans (wall, CPU,
+            memory). A private one is used when omitted.
+
+    Returns:
+        dict: {'status': str, 'outputs': list, 'timings': dict, 'message': str}
+        where status is "completed" or "failed" and timings maps each stage
+        to its wall time in seconds.
     """
+    if profiler is None:
+        profiler = Profiler()
+    first_span = len(profiler.spans)
     file_name = os.path.splitext(os.path.basename(idf_path))[0]
-    output_base = os.path.join(output_dir, f"{file_name}_metadata")
+    result = {"status": STATUS_COMPLETED, "outputs": [], "timings": {}, "message": ""}
 
     print(f"\nProcessing: {file_name}...")
+    with profiler.span("process_file", file=file_name):
+        _run_pipeline(idf_path, output_dir, file_name, image_mode, asset_dir, db_path, profiler, result)
+
+    result["timings"] = profiler.timings(since=first_span)
+    return result
+
+
+def _run_pipeline(
+    idf_path: str,
+    output_dir: str,
+    file_name: str,
+    image_mode: str,
+    asset_dir: str | None,
+    db_path: str | None,
+    profiler: Profiler,
+    result: dict,
+) -> None:
+    """Runs the process_file() stages, each inside its own profiler span."""
+    span = profiler.span
+    output_base = os.path.join(output_dir, f"{file_name}_metadata")
+
     try:
-        idf_data = parse_idf(idf_path)
+        with span("parse"):
+            idf_data = parse_idf(idf_path)
     except Exception as e:
         print(f"  Failed to parse IDF: {e}")
+        result.update(status=STATUS_FAILED, message=f"Failed to parse IDF: {e}")
         return
 
     from extractors import get_idf_version_tuple
     major, minor = get_idf_version_tuple(idf_data)
     print(f"  Detected IDF Version: {major}.{minor}")
 
-    zone_geo = get_zone_geometry(idf_data)
+    with span("geometry"):
+        zone_geo = get_zone_geometry(idf_data)
     if not zone_geo:
         print("  No zones found in the IDF file.")
+        result["message"] = "No zones found in the IDF file."
         return
 
-    people = extract_people(idf_data, zone_geo)
-    lights = extract_loads(idf_data, zone_geo, "LIGHTS")
-    electric = extract_loads(idf_data, zone_geo, "ELECTRICEQUIPMENT", exclude_subcat_filter="elevator")
-    gas = extract_loads(idf_data, zone_geo, "GASEQUIPMENT")
-    water = extract_water_use(idf_data, zone_geo)
-    infiltration = extract_infiltration(idf_data, zone_geo)
-    ventilation = extract_ventilation(idf_data, zone_geo)
-    thermostats = extract_thermostats(idf_data, zone_geo)
-    process = extract_process_loads(idf_data, zone_geo)
-    natural_vent = extract_natural_ventilation(idf_data, zone_geo)
-    hvac_data = extract_hvac_systems(idf_data, list(zone_geo.keys()))
-    
-    # Extract building-level process loads (Exterior lights, elevators, refrig)
-    building_process_loads = extract_building_process_loads(idf_data)
-
-    # Extract zone schedule assignments (Occupancy, Lighting, etc.)
-    schedule_assignments = extract_zone_schedules(idf_data)
+    with span("extract"):
+        with span("extract.people"):
+            people = extract_people(idf_data, zone_geo)
+        with span("extract.lights"):
+            lights = extract_loads(idf_data, zone_geo, "LIGHTS")
+        with span("extract.electric"):
+            electric = extract_loads(idf_data, zone_geo, "ELECTRICEQUIPMENT", exclude_subcat_filter="elevator")
+        with span("extract.gas"):
+            gas = extract_loads(idf_data, zone_geo, "GASEQUIPMENT")
+        with span("extract.water"):
+            water = extract_water_use(idf_data, zone_geo)
+        with span("extract.infiltration"):
+            infiltration = extract_infiltration(idf_data, zone_geo)
+        with span("extract.ventilation"):
+            ventilation = extract_ventilation(idf_data, zone_geo)
+        with span("extract.thermostats"):
+            thermostats = extract_thermostats(idf_data, zone_geo)
+        with span("extract.process"):
+            process = extract_process_loads(idf_data, zone_geo)
+        with span("extract.natural_ventilation"):
+            natural_vent = extract_natural_ventilation(idf_data, zone_geo)
+        with span("extract.hvac_graph"):
+            hvac_graph = build_hvac_graph(idf_data)
+        with span("extract.hvac"):
+            hvac_data = extract_hvac_systems(idf_data, list(zone_geo.keys()), hvac_graph)
+
+        # Extract building-level process loads (Exterior lights, elevators, refrig)
+        with span("extract.building_process_loads"):
+            building_process_loads = extract_building_process_loads(idf_data)
+
+        # Extract zone schedule assignments (Occupancy, Lighting, etc.)
+        with span("extract.schedules"):
+            schedule_assignments = extract_zone_schedules(idf_data)
 
     # Generate 3D Visualization
     print("Generating 3D visualization...")
-    viz_b64 = render_idf_to_base64(idf_path)
+    with span("render"):
+        viz_b64 = render_idf_to_base64(idf_path)
 
     summarized_data = []
     for zone_name in sorted(zone_geo.keys()):
@@ -165,16 +242,114 @@ def process_file(idf_path: str, output_dir: str) -> None:
     baseline_path = os.path.join(os.path.dirname(__file__), "Templates", "construction", "construction_baseline.idf")
     if os.path.exists(baseline_path):
         try:
-            construction_data = extract_baseline_constructions(baseline_path)
+            with span("constructions"):
+                construction_data = extract_baseline_constructions(baseline_path)
         except Exception as e:
             print(f"  Warning: Could not extract baseline constructions: {e}")
 
-    generate_reports(
-        summarized_data, output_base, viz_b64, hvac_data, 
-        construction_data, building_process_loads, schedule_assignments,
-        natural_vent
-    )
+    with span("report"):
+        result["outputs"] = generate_reports(
+            summarized_data, output_base, viz_b64, hvac_data, 
+            construction_data, building_process_loads, schedule_assignments,
+            natural_vent, image_mode=image_mode, asset_dir=asset_dir
+        )
 
+    if db_path:
+        with span("store"):
+            conn = open_store(db_path)
+            try:
+                store_file_metadata(
+                    conn, idf_path, summarized_data, hvac_data, schedule_assignments,
+                    building_process_loads, natural_vent, idf_version=f"{major}.{minor}",
+                )
+                print(f"  Metadata stored in: {db_path}")
+            finally:
+                conn.close()
 
     # Validate extracted HVAC data against Honeybee template definitions
-    validate_hvac_results(hvac_data, file_name)
+    with span("validate"):
+        validate_hvac_results(hvac_data, file_name, hvac_graph)
+
+
+def process_batch(
+    targets: list[str],
+    output_dir_for: Callable[[str], str],
+    image_mode: str = "inline",
+    asset_dir: str | None = None,
+    db_path: str | None = None,
+    manifest_path: str | None = None,
+    force: bool = False,
+    profiler: Profiler | None = None,
+) -> dict[str, int]:
+    """Process many IDF files, resuming from a batch manifest when given.
+
+    Files whose content digest, pipeline code version and options match a
+    completed manifest entry (with outputs still on disk) are skipped. Failed
+    entries are retried. An exception in one file is recorded as a failure
+    and the batch continues; the manifest is saved after every file so a
+    crash loses at most the file in progress.
+
+    Args:
+        targets: Absolute paths of the IDF files to process.
+        output_dir_for: Maps an IDF path to its report output directory.
+        image_mode: Passed through to process_file().
+        asset_dir: Passed through to process_file().
+        db_path: Passed through to process_file().
+        manifest_path: Path of the JSON manifest; None disables resuming.
+        force: Re-process every file even when its entry is up to date.
+        profiler: Optional Profiler shared by every processed file.
+
+    Returns:
+        Counts of processed, skipped and failed files.
+    """
+    manifest = load_manifest(manifest_path) if manifest_path else None
+    options = {
+        "image_mode": image_mode,
+        "db_path": os.path.abspath(db_path) if db_path else None,
+    }
+    counts = {"processed": 0, "skipped": 0, "failed": 0}
+
+    for i, target in enumerate(targets, 1):
+        label = f"[{i}/{len(targets)}] {os.path.basename(target)}"
+        digest = file_digest(target)
+
+        if manifest is not None:
+            entry = get_entry(manifest, target)
+            if not force and is_up_to_date(entry, digest, options):
+                print(f"\n{label}: unchanged, skipping")
+                counts["skipped"] += 1
+                continue
+            if entry and entry.get("status") == STATUS_FAILED:
+                print(f"\n{label}: retrying previously failed file")
+
+        try:
+            result = process_file(
+                target, output_dir_for(target), image_mode, asset_dir, db_path, profiler
+            )
+        except Exception as e:
+            print(f"  [ERROR] {label} failed: {type(e).__name__}: {e}")
+            result = {
+                "status": STATUS_FAILED,
+                "outputs": [],
+                "timings": {},
+                "message": f"{type(e).__name__}: {e}",
+            }
+
+        if result["status"] == STATUS_FAILED:
+            counts["failed"] += 1
+        else:
+            counts["processed"] += 1
+
+        if manifest is not None:
+            record_entry(
+                manifest, target, digest, result["status"], result["outputs"],
+                result["timings"], options, result["message"],
+            )
+            save_manifest(manifest_path, manifest)
+
+    print(
+        f"\nBatch summary: {counts['processed']} processed, "
+        f"{counts['skipped']} skipped (unchanged), {counts['failed']} failed"
+    )
+    return counts
+
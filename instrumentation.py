@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+"""
+Instrumentation Module.
+
+Lightweight, dependency-free stage profiling for the metadata pipeline.
+A Profiler hands out context-manager spans that record, per stage:
+
+- wall time (time.perf_counter)
+- CPU time of the process (time.process_time)
+- how far the span raised the process's peak resident set size, and that
+  process-wide peak at span exit (resource.getrusage, where available — not
+  on Windows). The peak never falls, so stages after the heaviest one show
+  the same process peak and no growth.
+- optionally, the peak traced Python heap while the span was open (tracemalloc)
+
+Spans nest, so a parent stage (e.g. "extract") contains its children
+(e.g. "extract.lights"). Results can be written as JSON lines, one record per
+span, or as a Chrome trace file viewable in chrome://tracing or Perfetto.
+
+Usage:
+    profiler = Profiler(trace_memory=True)
+    with profiler.span("parse", file="Hospital.idf"):
+        idf_data = parse_idf(path)
+    profiler.write_jsonl("profile.jsonl")
+    profiler.write_chrome_trace("trace.json")
+"""
+
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Iterator
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+@dataclass
+class Span:
+    """One timed stage."""
+    name: str
+    depth: int
+    start_s: float              # seconds since the profiler was created
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    process_peak_rss_kb: float | None = None   # process high-water RSS at span exit
+    peak_rss_growth_kb: float | None = None    # rise of that high-water mark during the span
+    tracemalloc_peak_kb: float | None = None
+    attrs: dict[str, Any] = field(default_factory=dict)
+
+
+def _peak_rss_kb() -> float | None:
+    """Returns the process high-water RSS in KiB, or None when unsupported."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes
+    return peak / 1024.0 if sys.platform == "darwin" else float(peak)
+
+
+class Profiler:
+    """Collects nested stage spans for one or more processed files."""
+
+    def __init__(self, trace_memory: bool = False):
+        """
+        Args:
+            trace_memory: Track the Python heap peak of every span with
+                tracemalloc. Accurate but slows allocation-heavy code.
+        """
+        self.trace_memory = trace_memory
+        self.spans: list[Span] = []
+        self._origin = time.perf_counter()
+        self._depth = 0
+        # Running heap peak of each open span, innermost last
+        self._heap_peaks: list[int] = []
+        self._started_tracemalloc = False
+
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+    @contextmanager
+    def span(self, name: str, **attrs: Any) -> Iterator[Span]:
+        """Times the enclosed block as one stage.
+
+        Args:
+            name: Stage name, e.g. "parse" or "extract.lights".
+            **attrs: Extra values stored with the span (e.g. file name).
+
+        Yields:
+            The Span being recorded; attrs may be added to it inside the block.
+        """
+        record = Span(name=name, depth=self._depth, start_s=time.perf_counter() - self._origin, attrs=attrs)
+        self.spans.append(record)
+
+        if self.trace_memory:
+            # Fold the parent's peak so far into its running max before resetting
+            if self._heap_peaks:
+                self._heap_peaks[-1] = max(self._heap_peaks[-1], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            self._heap_peaks.append(tracemalloc.get_traced_memory()[0])
+
+        self._depth += 1
+        rss0 = _peak_rss_kb()
+        wall0 = time.perf_counter()
+        cpu0 = time.process_time()
+        try:
+            yield record
+        finally:
+            record.wall_s = time.perf_counter() - wall0
+            record.cpu_s = time.process_time() - cpu0
+            self._depth -= 1
+            record.process_peak_rss_kb = _peak_rss_kb()
+            if rss0 is not None:
+                record.peak_rss_growth_kb = record.process_peak_rss_kb - rss0
+
+            if self.trace_memory:
+                peak = max(self._heap_peaks.pop(), tracemalloc.get_traced_memory()[1])
+                record.tracemalloc_peak_kb = peak / 1024.0
+                if self._heap_peaks:
+                    self._heap_peaks[-1] = max(self._heap_peaks[-1], peak)
+                tracemalloc.reset_peak()
+
+    def timings(self, since: int = 0) -> dict[str, float]:
+        """Returns stage name → wall seconds for spans recorded from index since.
+
+        Args:
+            since: Index into self.spans (e.g. len(profiler.spans) taken
+                before processing a file) to restrict the result to one file.
+        """
+        return {s.name: round(s.wall_s, 4) for s in self.spans[since:]}
+
+    def write_jsonl(self, path: str) -> None:
+        """Writes one JSON object per span to path."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            for s in self.spans:
+                f.write(json.dumps(asdict(s)) + "\n")
+
+    def write_chrome_trace(self, path: str) -> None:
+        """Writes the spans in Chrome Trace Event format ("X" complete events)."""
+        pid = os.getpid()
+        events = []
+        for s in self.spans:
+            args = dict(s.attrs)
+            args["cpu_s"] = round(s.cpu_s, 6)
+            if s.process_peak_rss_kb is not None:
+                args["process_peak_rss_kb"] = s.process_peak_rss_kb
+                args["peak_rss_growth_kb"] = s.peak_rss_growth_kb
+            if s.tracemalloc_peak_kb is not None:
+                args["tracemalloc_peak_kb"] = round(s.tracemalloc_peak_kb, 1)
+            events.append({
+                "name": s.name,
+                "ph": "X",
+                "ts": round(s.start_s * 1e6, 1),
+                "dur": round(s.wall_s * 1e6, 1),
+                "pid": pid,
+                "tid": 1,
+                "args": args,
+            })
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def close(self) -> None:
+        """Stops tracemalloc if this profiler started it."""
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def print_summary(self, top: int = 10) -> None:
+        """Prints the slowest leaf-level stages."""
+        if not self.spans:
+            return
+        parents = {s.name.rsplit(".", 1)[0] for s in self.spans if "." in s.name}
+        leaves: list[tuple[Span, str]] = []
+        root_label = ""
+        for s in self.spans:
+            if s.depth == 0:
+                # Children are labelled with the file of their top-level span
+                root_label = str(s.attrs.get("file", ""))
+            elif s.name not in parents:
+                leaves.append((s, root_label))
+        leaves.sort(key=lambda item: item[0].wall_s, reverse=True)
+        print("\n  Slowest stages:")
+        for s, label in leaves[:top]:
+            print(f"    {s.wall_s * 1000:9.1f} ms  {s.name:<28} {label}")
@@ -12,15 +12,31 @@ import argparse
 import os
 import sys
 
-from idf_processor import process_file, select_idf_interactive
+from batch_manifest import MANIFEST_NAME
+from idf_processor import find_idf_files, process_batch, process_file, select_idf_interactive
 from idf_comparator import compare_idfs, print_summary
+from instrumentation import Profiler
 from compare_report_generator import generate_compare_report
+from idf_matrix import compare_matrix, print_matrix_summary, write_matrix_csv
+from reference_snapshot import compare_many, load_or_build_snapshot, print_batch_summary
+from report_generator import IMAGE_MODES
 
 
 # The base directory containing IDF subfolders (e.g., ASHRAE901_STD2022, others)
 CONTENT_DIR = os.path.join(os.path.dirname(__file__), "Content")
 
 
+def _positive_int(value: str) -> int:
+    """argparse type for options that need an integer of at least 1."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
 def main() -> None:
     """Main entry point for extracting and analyzing IDF metadata.
 
@@ -40,17 +56,121 @@ def main() -> None:
         "--output-dir",
         help="Directory to save the reports. Defaults to 'outputs' in project folder.",
     )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Process every IDF file under Content/ without the interactive menu.",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help=(
+            "Re-process all selected files in batch mode, ignoring the batch manifest "
+            "that normally skips files unchanged since their last successful run."
+        ),
+    )
     parser.add_argument(
         "--compare",
         nargs=2,
         metavar=("REFERENCE_IDF", "COMPARE_IDF"),
         help="Compare two IDF files. Pass the trusted reference first, then the file to question.",
     )
+    parser.add_argument(
+        "--no-fuzzy-match",
+        action="store_true",
+        help=(
+            "With --compare, match objects by name (or position) only; by default objects "
+            "left unmatched are paired by field similarity to detect renames."
+        ),
+    )
+    parser.add_argument(
+        "--all-types",
+        action="store_true",
+        help="With --compare, compare every object type instead of only the energy-relevant ones.",
+    )
+    parser.add_argument(
+        "--diff-jsonl",
+        action="store_true",
+        help=(
+            "With --compare, stream every difference to a JSON-lines file next to the report; "
+            "the HTML then shows only the highest-impact entries (see --top-k)."
+        ),
+    )
+    parser.add_argument(
+        "--top-k",
+        type=_positive_int,
+        metavar="N",
+        help="Entries per category kept for the comparison report (default: all, or 500 with --diff-jsonl).",
+    )
+    parser.add_argument(
+        "--compare-against-snapshot",
+        nargs="+",
+        metavar="IDF",
+        help=(
+            "Compare many candidates against one reference: REFERENCE CANDIDATE [CANDIDATE ...]. "
+            "The reference (an IDF, or a .refsnap file) is parsed and indexed once into a cached "
+            "snapshot, and the candidates are compared in parallel (see reference_snapshot.py)."
+        ),
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Worker processes for --compare-against-snapshot (default: one per candidate, up to CPU count).",
+    )
+    parser.add_argument(
+        "--compare-matrix",
+        nargs="+",
+        metavar="IDF",
+        help=(
+            "N-way comparison of many variants of one model: writes a pairwise distance "
+            "matrix and a report of which objects vary (see idf_matrix.py)."
+        ),
+    )
+    parser.add_argument(
+        "--image-mode",
+        choices=IMAGE_MODES,
+        default="inline",
+        help=(
+            "How the 3D visualization is stored: 'inline' embeds base64 in the HTML, "
+            "'sibling' writes a PNG next to each report, 'assets' writes it once to a "
+            "shared content-addressed <output-dir>/assets/ folder."
+        ),
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="JSONL_PATH",
+        help="Record per-stage wall/CPU time and peak memory, written as JSON lines to this path.",
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="TRACE_PATH",
+        help="Also write the stage spans as a Chrome trace file (open in chrome://tracing or Perfetto).",
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="Track the Python heap peak of every stage with tracemalloc (slower).",
+    )
+    parser.add_argument(
+        "--db",
+        help=(
+            "Also store extracted metadata in this SQLite file for cross-building "
+            "queries (see metadata_store.py)."
+        ),
+    )
 
     args = parser.parse_args()
 
     # Base output directory
     base_output_dir = args.output_dir or os.path.join(os.getcwd(), "outputs")
+    # Shared across the routed sub-folders so identical images are stored once
+    asset_dir = os.path.join(base_output_dir, "assets")
+    # Batch runs record per-file status here so interrupted runs can resume
+    manifest_path = os.path.join(base_output_dir, MANIFEST_NAME)
+
+    profiler = None
+    if args.profile or args.trace or args.trace_memory:
+        profiler = Profiler(trace_memory=args.trace_memory)
     
     def get_output_dir_for_idf(idf_path: str) -> str:
         """Helper to determine the output directory based on the IDF source folder."""
@@ -85,9 +205,6 @@ def main() -> None:
         print(f"  Reference : {path_a}")
         print(f"  Compare   : {path_b}")
 
-        result = compare_idfs(path_a, path_b)
-        print_summary(result)
-
         name_a = os.path.splitext(os.path.basename(path_a))[0]
         name_b = os.path.splitext(os.path.basename(path_b))[0]
         report_name = f"{name_a}_vs_{name_b}_comparison.html"
@@ -96,8 +213,74 @@ def main() -> None:
             "output_comparator",
         )
         os.makedirs(output_dir, exist_ok=True)
+        diff_log = None
+        if args.diff_jsonl:
+            diff_log = os.path.join(output_dir, f"{name_a}_vs_{name_b}_diffs.jsonl")
+
+        result = compare_idfs(
+            path_a, path_b,
+            fuzzy=not args.no_fuzzy_match,
+            all_types=args.all_types,
+            diff_log=diff_log,
+            top_k=args.top_k,
+        )
+        print_summary(result)
+
         generate_compare_report(result, os.path.join(output_dir, report_name))
 
+    elif args.compare_against_snapshot:
+        # Snapshot mode: many candidates against one pre-indexed reference
+        reference, *candidates = [os.path.abspath(p) for p in args.compare_against_snapshot]
+        for p in [reference] + candidates:
+            if not os.path.exists(p):
+                print(f"Error: File not found: {p}")
+                sys.exit(1)
+        if not candidates:
+            print("Error: --compare-against-snapshot needs a reference and at least one candidate.")
+            sys.exit(1)
+
+        output_dir = os.path.join(base_output_dir, "output_comparator")
+        os.makedirs(output_dir, exist_ok=True)
+        print(f"\nComparing {len(candidates)} IDF file(s) against {os.path.basename(reference)}...")
+        try:
+            snapshot, snapshot_path = load_or_build_snapshot(reference, os.path.join(output_dir, "snapshots"))
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+
+        name_a = os.path.splitext(os.path.basename(snapshot.path))[0]
+        names_b = [os.path.splitext(os.path.basename(c))[0] for c in candidates]
+        diff_logs = None
+        if args.diff_jsonl:
+            diff_logs = [os.path.join(output_dir, f"{name_a}_vs_{n}_diffs.jsonl") for n in names_b]
+
+        results = compare_many(
+            snapshot_path, candidates, args.workers,
+            fuzzy=not args.no_fuzzy_match,
+            all_types=args.all_types,
+            diff_logs=diff_logs,
+            top_k=args.top_k,
+        )
+        print_batch_summary(results)
+        for result, name_b in zip(results, names_b):
+            generate_compare_report(result, os.path.join(output_dir, f"{name_a}_vs_{name_b}_comparison.html"))
+
+    elif args.compare_matrix:
+        # Matrix mode: N-way comparison of many variants
+        paths = [os.path.abspath(p) for p in args.compare_matrix]
+        for p in paths:
+            if not os.path.exists(p):
+                print(f"Error: File not found: {p}")
+                sys.exit(1)
+        if len(paths) < 2:
+            print("Error: --compare-matrix needs at least two IDF files.")
+            sys.exit(1)
+
+        print(f"\nComparing {len(paths)} IDF variants...")
+        matrix = compare_matrix(paths)
+        print_matrix_summary(matrix)
+        write_matrix_csv(matrix, os.path.join(base_output_dir, "output_comparator"))
+
     elif args.idf:
         # Explicit mode: process the provided file path
         idf_path = os.path.abspath(args.idf)
@@ -106,7 +289,14 @@ def main() -> None:
             sys.exit(1)
             
         output_dir = get_output_dir_for_idf(idf_path)
-        process_file(idf_path, output_dir)
+        process_file(idf_path, output_dir, args.image_mode, asset_dir, args.db, profiler)
+    elif args.all:
+        # Batch mode: every IDF under Content/, resuming from the manifest
+        targets = [full for _, full in find_idf_files(CONTENT_DIR)]
+        process_batch(
+            targets, get_output_dir_for_idf, args.image_mode, asset_dir, args.db,
+            manifest_path=manifest_path, force=args.force, profiler=profiler,
+        )
     else:
         # Interactive mode: allow user to select files from all content subfolders
         while True:
@@ -114,14 +304,28 @@ def main() -> None:
             if not targets:
                 break
 
-            for target in targets:
-                output_dir = get_output_dir_for_idf(target)
-                process_file(target, output_dir)
+            # Only "a" (all files) resumes from the manifest; a file picked by
+            # number is always processed, as with --idf
+            process_batch(
+                targets, get_output_dir_for_idf, args.image_mode, asset_dir, args.db,
+                manifest_path=manifest_path if len(targets) > 1 else None,
+                force=args.force, profiler=profiler,
+            )
 
             print("\n" + "=" * 50)
             print("Processing complete.")
             print("=" * 50)
 
+    if profiler is not None:
+        profiler.print_summary()
+        if args.profile:
+            profiler.write_jsonl(args.profile)
+            print(f"  Stage profile saved → {args.profile}")
+        if args.trace:
+            profiler.write_chrome_trace(args.trace)
+            print(f"  Chrome trace saved → {args.trace}")
+        profiler.close()
+
     print("\nExecution completed successfully.")
 
 
@@ -24,30 +24,8 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, BASE_DIR)
 
 from BEM_utils import config, idf_optimizer, simulation, plotting
+from BEM_utils.config import get_idf_version
 
-def get_idf_version(idf_path: str) -> str:
-    """
-    Peeks at the IDF file to find the Version object.
-    Returns e.g. '22.1' or '24.2'. Defaults to config.DEFAULT_VERSION.
-    """
-    try:
-        with open(idf_path, 'r', encoding='latin-1', errors='ignore') as f:
-            lines = f.readlines()
-            for i, line in enumerate(lines):
-                if 'VERSION' in line.upper():
-                    # Look for the value in the next line or same line
-                    # Usually: Version, 22.1;
-                    content = "".join(lines[i:i+3])
-                    import re
-                    match = re.search(r'Version\s*,\s*([\d\.]+)', content, re.IGNORECASE)
-                    if match:
-                        v = match.group(1)
-                        # Normalize 22.1.0 -> 22.1
-                        parts = v.split('.')
-                        return f"{parts[0]}.{parts[1]}"
-    except Exception:
-        pass
-    return config.DEFAULT_VERSION
 
 def organize_output_files(output_dir: str, idf_basename: str):
     """
@@ -254,31 +232,15 @@ def option_run_parallel():
     except ValueError:
         n_workers = max_cpus
 
-    # Optimize IDFs first (each using its own version-specific IDD)
-    print(f"\n  Optimizing {len(idf_files)} IDF files...")
-    jobs = []
-    for idf_path in idf_files:
-        version = get_idf_version(idf_path)
-        paths = config.get_ep_paths(version)
-        try:
-            idf_optimizer.optimize_idf(idf_path, paths['idd'], ep_version=version)
-        except Exception as e:
-            print(f"    Warning: {os.path.basename(idf_path)} — {e}")
-
-        # Build job list
+    # Prepare (version detection + optimization) in a process pool and start
+    # each simulation as soon as its own IDF is ready
+    def output_dir_for(idf_path: str) -> str:
         idf_name = os.path.splitext(os.path.basename(idf_path))[0]
-        jobs.append({
-            'idf': idf_path,
-            'epw': epw_path,
-            'output_dir': os.path.join(SIM_RESULTS_DIR, f"{idf_name}_{epw_name}"),
-            'name': os.path.basename(idf_path),
-            'ep_path': paths['exe'], # Specific EXE per job
-        })
-
-    # Run simulations in parallel
-    # Note: we pass ENERGYPLUS_EXE as a dummy here because each job now has its own 'ep_path'
-    # but we need to update simulation.py to PRIORITIZE job['ep_path'] if provided.
-    results = simulation.run_simulations_parallel(jobs, config.ENERGYPLUS_EXE, max_workers=n_workers)
+        return os.path.join(SIM_RESULTS_DIR, f"{idf_name}_{epw_name}")
+
+    results = simulation.run_simulations_pipelined(
+        idf_files, epw_path, output_dir_for, idf_optimizer.prepare_idf, max_workers=n_workers,
+    )
 
     # Auto-process successful results
     if results['successful']:
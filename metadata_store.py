@@ -0,0 +1,392 @@
+from __future__ import annotations
+
+"""
+Metadata Store Module.
+
+Persists the per-file extraction results of idf_processor.process_file() into a
+corpus-wide SQLite database so that cross-building questions (e.g. lighting
+W/m2 across every ASHRAE prototype) become single SQL queries instead of
+re-processing IDF files or scraping the HTML reports.
+
+Every table is keyed by the SHA-256 digest of the source IDF. Re-processing a
+file replaces its rows inside one transaction.
+
+Usage:
+    python metadata_store.py buildings
+    python metadata_store.py metric lights
+    python metadata_store.py sql "SELECT building, zone, value FROM zone_metrics WHERE metric = 'lights'"
+"""
+
+import argparse
+import datetime
+import hashlib
+import os
+import sqlite3
+import sys
+from typing import Any
+
+
+DEFAULT_DB_PATH = os.path.join(os.getcwd(), "outputs", "metadata.sqlite")
+
+# Zone-level load metrics stored in long format (one row per zone × metric).
+# floor_area / story_count / multiplier live in the `zones` table instead.
+ZONE_METRICS = [
+    "people",
+    "lights",
+    "electric",
+    "gas",
+    "water",
+    "water_temp",
+    "infiltration",
+    "vent_person",
+    "vent_area",
+    "vent_ach",
+    "htg_sp",
+    "clg_sp",
+    "process",
+]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    digest           TEXT PRIMARY KEY,
+    building         TEXT NOT NULL,
+    path             TEXT NOT NULL,
+    idf_version      TEXT,
+    zone_count       INTEGER,
+    total_floor_area REAL,
+    processed_at     TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_files_building ON files (building);
+CREATE INDEX IF NOT EXISTS idx_files_path ON files (path);
+
+CREATE TABLE IF NOT EXISTS zones (
+    digest      TEXT NOT NULL,
+    building    TEXT NOT NULL,
+    zone        TEXT NOT NULL,
+    floor_area  REAL,
+    story_count INTEGER,
+    multiplier  REAL,
+    PRIMARY KEY (digest, zone)
+);
+CREATE INDEX IF NOT EXISTS idx_zones_building ON zones (building, zone);
+
+CREATE TABLE IF NOT EXISTS zone_metrics (
+    digest   TEXT NOT NULL,
+    building TEXT NOT NULL,
+    zone     TEXT NOT NULL,
+    metric   TEXT NOT NULL,
+    value    REAL
+);
+CREATE INDEX IF NOT EXISTS idx_zone_metrics_metric ON zone_metrics (metric, building);
+CREATE INDEX IF NOT EXISTS idx_zone_metrics_zone ON zone_metrics (digest, zone, metric);
+CREATE INDEX IF NOT EXISTS idx_zone_metrics_building ON zone_metrics (building, zone);
+
+CREATE TABLE IF NOT EXISTS hvac_assignments (
+    digest     TEXT NOT NULL,
+    building   TEXT NOT NULL,
+    zone       TEXT NOT NULL,
+    template   TEXT,
+    dcv        TEXT,
+    economizer TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_hvac_digest ON hvac_assignments (digest);
+CREATE INDEX IF NOT EXISTS idx_hvac_building ON hvac_assignments (building, zone);
+CREATE INDEX IF NOT EXISTS idx_hvac_template ON hvac_assignments (template);
+
+CREATE TABLE IF NOT EXISTS schedules (
+    digest        TEXT NOT NULL,
+    building      TEXT NOT NULL,
+    load_type     TEXT NOT NULL,
+    schedule_name TEXT,
+    zone          TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_schedules_digest ON schedules (digest);
+CREATE INDEX IF NOT EXISTS idx_schedules_building ON schedules (building, zone);
+CREATE INDEX IF NOT EXISTS idx_schedules_load_type ON schedules (load_type, building);
+
+CREATE TABLE IF NOT EXISTS process_loads (
+    digest      TEXT NOT NULL,
+    building    TEXT NOT NULL,
+    category    TEXT,
+    name        TEXT,
+    zone        TEXT,
+    power_w     REAL,
+    subcategory TEXT,
+    details     TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_process_digest ON process_loads (digest);
+CREATE INDEX IF NOT EXISTS idx_process_category ON process_loads (category, building);
+
+CREATE TABLE IF NOT EXISTS natural_ventilation (
+    digest       TEXT NOT NULL,
+    building     TEXT NOT NULL,
+    zone         TEXT NOT NULL,
+    name         TEXT,
+    opening_area REAL,
+    schedule     TEXT,
+    min_in_temp  REAL,
+    max_in_temp  REAL,
+    min_out_temp REAL,
+    max_out_temp REAL
+);
+CREATE INDEX IF NOT EXISTS idx_natvent_digest ON natural_ventilation (digest);
+CREATE INDEX IF NOT EXISTS idx_natvent_building ON natural_ventilation (building, zone);
+"""
+
+# Child tables whose rows are replaced whenever a file is re-processed
+_FILE_TABLES = [
+    "zones",
+    "zone_metrics",
+    "hvac_assignments",
+    "schedules",
+    "process_loads",
+    "natural_ventilation",
+]
+
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    """Returns the SHA-256 hex digest of a file's contents.
+
+    Args:
+        path: Path to the file.
+        chunk_size: Read block size in bytes.
+
+    Returns:
+        The hex digest string.
+    """
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def open_store(db_path: str) -> sqlite3.Connection:
+    """Opens (and creates if needed) the metadata database.
+
+    Args:
+        db_path: Path to the SQLite file. Parent directories are created.
+
+    Returns:
+        An open sqlite3 connection with the schema in place.
+    """
+    parent = os.path.dirname(os.path.abspath(db_path))
+    os.makedirs(parent, exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _as_float(val: Any) -> float | None:
+    """Returns val as a float, or None for non-numeric values."""
+    if isinstance(val, (int, float)):
+        return float(val)
+    try:
+        return float(val)
+    except (TypeError, ValueError):
+        return None
+
+
+def store_file_metadata(
+    conn: sqlite3.Connection,
+    idf_path: str,
+    zone_data: list[dict],
+    hvac_data: dict[str, dict[str, str]] | None = None,
+    schedule_data: list[dict] | None = None,
+    process_data: list[dict] | None = None,
+    natural_vent_data: dict[str, list[dict]] | None = None,
+    idf_version: str | None = None,
+    digest: str | None = None,
+) -> str:
+    """Writes one file's extraction results to the store in a single transaction.
+
+    Any rows previously stored for the same digest, or for an earlier
+    version of the same source path, are replaced, so each file has one
+    current set of rows.
+
+    Args:
+        conn: Connection returned by open_store().
+        idf_path: Path to the source IDF file.
+        zone_data: The per-zone summary dicts built by process_file().
+        hvac_data: Output of extract_hvac_systems().
+        schedule_data: Output of extract_zone_schedules().
+        process_data: Output of extract_building_process_loads().
+        natural_vent_data: Output of extract_natural_ventilation().
+        idf_version: Detected "major.minor" version string.
+        digest: Precomputed file digest; computed from idf_path when omitted.
+
+    Returns:
+        The file digest the rows were stored under.
+    """
+    if digest is None:
+        digest = file_digest(idf_path)
+    building = os.path.splitext(os.path.basename(idf_path))[0]
+
+    zone_rows = []
+    metric_rows = []
+    total_area = 0.0
+    for zone in zone_data:
+        name = zone["name"]
+        area = zone.get("floor_area", 0.0)
+        total_area += area * zone.get("multiplier", 1)
+        zone_rows.append((
+            digest, building, name, area, zone.get("story_count", 1), zone.get("multiplier", 1),
+        ))
+        for metric in ZONE_METRICS:
+            if metric in zone:
+                metric_rows.append((digest, building, name, metric, _as_float(zone[metric])))
+
+    hvac_rows = [
+        (digest, building, z, d.get("template"), d.get("dcv"), d.get("economizer"))
+        for z, d in (hvac_data or {}).items()
+    ]
+
+    schedule_rows = [
+        (digest, building, item["load_type"], item["schedule_name"], z)
+        for item in (schedule_data or [])
+        for z in item["zones"]
+    ]
+
+    process_rows = [
+        (
+            digest, building, item.get("category"), item.get("name"), item.get("zone"),
+            _as_float(item.get("power_w")), item.get("subcategory"),
+            None if item.get("details") is None else str(item.get("details")),
+        )
+        for item in (process_data or [])
+    ]
+
+    natvent_rows = [
+        (
+            digest, building, z, obj.get("name"), _as_float(obj.get("opening_area")),
+            obj.get("schedule"), _as_float(obj.get("min_in_temp")), _as_float(obj.get("max_in_temp")),
+            _as_float(obj.get("min_out_temp")), _as_float(obj.get("max_out_temp")),
+        )
+        for z, objs in (natural_vent_data or {}).items()
+        for obj in objs
+    ]
+
+    processed_at = datetime.datetime.now().isoformat(timespec="seconds")
+    source_path = os.path.abspath(idf_path)
+
+    # One transaction per file: either every table is updated or none is
+    with conn:
+        # Rows of this digest plus those of earlier contents of the same path
+        stale = [digest] + [
+            row[0] for row in conn.execute(
+                "SELECT digest FROM files WHERE path = ? AND digest != ?", (source_path, digest)
+            )
+        ]
+        placeholders = ", ".join("?" * len(stale))
+        for table in _FILE_TABLES + ["files"]:
+            conn.execute(f"DELETE FROM {table} WHERE digest IN ({placeholders})", stale)
+        conn.execute(
+            "INSERT INTO files VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (digest, building, source_path, idf_version,
+             len(zone_rows), total_area, processed_at),
+        )
+        conn.executemany("INSERT INTO zones VALUES (?, ?, ?, ?, ?, ?)", zone_rows)
+        conn.executemany("INSERT INTO zone_metrics VALUES (?, ?, ?, ?, ?)", metric_rows)
+        conn.executemany("INSERT INTO hvac_assignments VALUES (?, ?, ?, ?, ?, ?)", hvac_rows)
+        conn.executemany("INSERT INTO schedules VALUES (?, ?, ?, ?, ?)", schedule_rows)
+        conn.executemany("INSERT INTO process_loads VALUES (?, ?, ?, ?, ?, ?, ?, ?)", process_rows)
+        conn.executemany(
+            "INSERT INTO natural_ventilation VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", natvent_rows
+        )
+
+    return digest
+
+
+# ---------------------------------------------------------------------------
+# Query helpers
+# ---------------------------------------------------------------------------
+
+def query_metric_summary(conn: sqlite3.Connection, metric: str, building_like: str = "%") -> list[tuple]:
+    """Summarises one zone metric per building.
+
+    The area-weighted mean weights each zone by floor area × zone multiplier.
+
+    Args:
+        conn: Open store connection.
+        metric: One of ZONE_METRICS (e.g. "lights").
+        building_like: SQL LIKE pattern to restrict buildings.
+
+    Returns:
+        Rows of (building, zone_count, min, max, area_weighted_mean).
+    """
+    query = """
+    SELECT m.building,
+           COUNT(*),
+           MIN(m.value),
+           MAX(m.value),
+           SUM(m.value * z.floor_area * z.multiplier) / NULLIF(SUM(z.floor_area * z.multiplier), 0)
+    FROM zone_metrics m
+    JOIN zones z ON z.digest = m.digest AND z.zone = m.zone
+    WHERE m.metric = ? AND m.building LIKE ?
+    GROUP BY m.digest
+    ORDER BY m.building
+    """
+    return conn.execute(query, (metric, building_like)).fetchall()
+
+
+def _print_rows(headers: list[str], rows: list[tuple]) -> None:
+    """Prints query results as an aligned text table."""
+    cells = [[("" if v is None else (f"{v:.4g}" if isinstance(v, float) else str(v))) for v in r] for r in rows]
+    widths = [len(h) for h in headers]
+    for r in cells:
+        for i, v in enumerate(r):
+            widths[i] = max(widths[i], len(v))
+    print("  ".join(h.ljust(w) for h, w in zip(headers, widths)))
+    print("  ".join("-" * w for w in widths))
+    for r in cells:
+        print("  ".join(v.ljust(w) for v, w in zip(r, widths)))
+    print(f"\n({len(rows)} row(s))")
+
+
+def _cli() -> None:
+    """Command-line entry point for querying the metadata store."""
+    parser = argparse.ArgumentParser(description="Query the corpus-wide IDF metadata store.")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help=f"SQLite store path (default: {DEFAULT_DB_PATH})")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("buildings", help="List stored files.")
+
+    p_metric = sub.add_parser("metric", help="Per-building summary of one zone metric.")
+    p_metric.add_argument("name", choices=ZONE_METRICS)
+    p_metric.add_argument("--building", default="%", help="SQL LIKE pattern on the building name.")
+
+    p_sql = sub.add_parser("sql", help="Run an arbitrary read-only SQL query.")
+    p_sql.add_argument("query")
+
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"Error: Store not found: {args.db}")
+        sys.exit(1)
+
+    conn = sqlite3.connect(f"file:{os.path.abspath(args.db)}?mode=ro", uri=True)
+    try:
+        if args.command == "buildings":
+            rows = conn.execute(
+                "SELECT building, idf_version, zone_count, total_floor_area, processed_at, substr(digest, 1, 12) "
+                "FROM files ORDER BY building"
+            ).fetchall()
+            _print_rows(["Building", "Version", "Zones", "Floor Area [m2]", "Processed", "Digest"], rows)
+        elif args.command == "metric":
+            rows = query_metric_summary(conn, args.name, args.building)
+            _print_rows(["Building", "Zones", "Min", "Max", "Area-Weighted Mean"], rows)
+        else:
+            cur = conn.execute(args.query)
+            headers = [d[0] for d in cur.description] if cur.description else []
+            _print_rows(headers, cur.fetchall())
+    except sqlite3.Error as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    _cli()
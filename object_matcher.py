@@ -0,0 +1,294 @@
+from __future__ import annotations
+
+"""
+Object Matcher Module.
+
+Similarity-based pairing of IDF objects that could not be matched by name —
+renamed objects (e.g. surfaces and schedules renamed by Honeybee) and
+reordered unnamed objects. Used by idf_comparator for the leftovers of
+name/positional matching.
+
+Pipeline:
+1. Each object becomes a set of tokens: "<field index>=<normalized value>"
+   for every field after the name (numbers rounded to 3 significant digits).
+2. Objects with identical token sets are paired directly.
+3. MinHash signatures + LSH banding propose candidate pairs, so the cost
+   grows with the number of similar objects rather than |A| x |B|.
+4. Candidates are scored by exact Jaccard similarity and split into
+   connected components; small components are solved with an optimal
+   (Hungarian) assignment, large ones greedily by similarity.
+"""
+
+import zlib
+from collections import defaultdict, deque
+
+import numpy as np
+
+
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16                  # 16 bands x 4 rows ≈ 0.5 similarity threshold
+SIMILARITY_THRESHOLD = 0.5      # minimum Jaccard similarity for a pair
+OPTIMAL_ASSIGNMENT_MAX = 40     # components up to this many objects get the Hungarian solve
+MAX_BUCKET_PAIRS = 2500         # larger LSH buckets fall back to a sorted-neighbourhood window
+MAX_CANDIDATES_PER_OBJECT = 5   # best candidates (by MinHash estimate) kept per object
+_ESTIMATE_SLACK = 0.15          # MinHash estimates below threshold - slack are dropped unscored
+_BUCKET_WINDOW = 8
+
+_MERSENNE_PRIME = (1 << 31) - 1
+_rng = np.random.default_rng(20240611)
+_HASH_A = _rng.integers(1, _MERSENNE_PRIME, size=(MINHASH_PERMUTATIONS, 1), dtype=np.int64)
+_HASH_B = _rng.integers(0, _MERSENNE_PRIME, size=(MINHASH_PERMUTATIONS, 1), dtype=np.int64)
+
+
+def object_tokens(fields: list[str]) -> frozenset[str]:
+    """Tokenizes an object's fields (name excluded) for similarity matching."""
+    tokens = []
+    for i, value in enumerate(fields[1:], start=1):
+        v = value.strip().lower()
+        if not v:
+            continue
+        try:
+            v = f"{float(v):.3g}"
+        except ValueError:
+            pass
+        tokens.append(f"{i}={v}")
+    return frozenset(tokens)
+
+
+def jaccard(a: frozenset[str], b: frozenset[str]) -> float:
+    """Jaccard similarity of two token sets (0 when both are empty)."""
+    if not a and not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def minhash_signatures(token_sets: list[frozenset[str]]) -> np.ndarray:
+    """Returns an (n, MINHASH_PERMUTATIONS) array of MinHash signatures."""
+    sigs = np.full((len(token_sets), MINHASH_PERMUTATIONS), _MERSENNE_PRIME, dtype=np.int64)
+    rows = [r for r, tokens in enumerate(token_sets) if tokens]
+    if not rows:
+        return sigs
+    # crc32 rather than hash(): str hashing is salted per process
+    x = np.fromiter(
+        (zlib.crc32(t.encode("utf-8")) & _MERSENNE_PRIME for r in rows for t in token_sets[r]),
+        dtype=np.int64,
+    )
+    starts = np.cumsum([0] + [len(token_sets[r]) for r in rows[:-1]])
+    # All objects at once: hash every token under every permutation, then
+    # take the per-object minimum over each object's token span
+    sigs[rows] = np.minimum.reduceat((_HASH_A * x + _HASH_B) % _MERSENNE_PRIME, starts, axis=1).T
+    return sigs
+
+
+def _lsh_candidates(sig_a: np.ndarray, sig_b: np.ndarray) -> set[tuple[int, int]]:
+    """Proposes (i, j) pairs that share at least one LSH band."""
+    rows = MINHASH_PERMUTATIONS // LSH_BANDS
+    candidates: set[tuple[int, int]] = set()
+    for band in range(LSH_BANDS):
+        cols = slice(band * rows, (band + 1) * rows)
+        buckets: dict[bytes, tuple[list[int], list[int]]] = defaultdict(lambda: ([], []))
+        for i, key in enumerate(map(np.ndarray.tobytes, sig_a[:, cols])):
+            buckets[key][0].append(i)
+        for j, key in enumerate(map(np.ndarray.tobytes, sig_b[:, cols])):
+            buckets[key][1].append(j)
+
+        for side_a, side_b in buckets.values():
+            if not side_a or not side_b:
+                continue
+            if len(side_a) * len(side_b) <= MAX_BUCKET_PAIRS:
+                candidates.update((i, j) for i in side_a for j in side_b)
+                continue
+            # Degenerate bucket: only pair neighbours in full-signature order
+            merged = sorted(
+                [(sig_a[i].tobytes(), 0, i) for i in side_a] + [(sig_b[j].tobytes(), 1, j) for j in side_b]
+            )
+            for pos, (_, side, idx) in enumerate(merged):
+                if side:
+                    continue
+                for _, other_side, other in merged[pos + 1:pos + 1 + _BUCKET_WINDOW]:
+                    if other_side:
+                        candidates.add((idx, other))
+    return candidates
+
+
+def _best_candidates(sig_a: np.ndarray, sig_b: np.ndarray, threshold: float) -> list[tuple[int, int]]:
+    """LSH candidates, pruned by MinHash similarity estimate to the
+    MAX_CANDIDATES_PER_OBJECT most similar partners of each A object."""
+    candidates = _lsh_candidates(sig_a, sig_b)
+    if not candidates:
+        return []
+    pairs = np.array(sorted(candidates), dtype=np.int64)
+    ci, cj = pairs[:, 0], pairs[:, 1]
+    estimate = (sig_a[ci] == sig_b[cj]).mean(axis=1)
+
+    keep = estimate >= threshold - _ESTIMATE_SLACK
+    ci, cj, estimate = ci[keep], cj[keep], estimate[keep]
+
+    # Rank each A object's candidates by estimate (descending) and keep the top K
+    order = np.lexsort((cj, -estimate, ci))
+    ci, cj = ci[order], cj[order]
+    first = np.r_[0, np.flatnonzero(np.diff(ci)) + 1]
+    rank = np.arange(len(ci)) - np.repeat(first, np.diff(np.r_[first, len(ci)]))
+    top = rank < MAX_CANDIDATES_PER_OBJECT
+    return list(zip(ci[top].tolist(), cj[top].tolist()))
+
+
+def _hungarian(cost: list[list[float]]) -> list[tuple[int, int]]:
+    """Minimum-cost assignment for a rectangular cost matrix with rows <= cols.
+
+    Returns:
+        (row, col) pairs, one per row.
+    """
+    n, m = len(cost), len(cost[0])
+    inf = float("inf")
+    u = [0.0] * (n + 1)
+    v = [0.0] * (m + 1)
+    p = [0] * (m + 1)
+    way = [0] * (m + 1)
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = [inf] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[j0] = True
+            i0, delta, j1 = p[j0], inf, 0
+            for j in range(1, m + 1):
+                if not used[j]:
+                    cur = cost[i0 - 1][j - 1] - u[i0] - v[j]
+                    if cur < minv[j]:
+                        minv[j], way[j] = cur, j0
+                    if minv[j] < delta:
+                        delta, j1 = minv[j], j
+            for j in range(m + 1):
+                if used[j]:
+                    u[p[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while True:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+            if j0 == 0:
+                break
+    return [(p[j] - 1, j - 1) for j in range(1, m + 1) if p[j]]
+
+
+def _assign_component(
+    rows: list[int], cols: list[int], scores: dict[tuple[int, int], float]
+) -> list[tuple[int, int, float]]:
+    """Pairs the objects of one connected component of candidate pairs."""
+    if len(rows) + len(cols) <= OPTIMAL_ASSIGNMENT_MAX:
+        transpose = len(rows) > len(cols)
+        r, c = (cols, rows) if transpose else (rows, cols)
+        cost = [
+            [1.0 - scores.get((ci, ri) if transpose else (ri, ci), 0.0) for ci in c]
+            for ri in r
+        ]
+        pairs = []
+        for ri, ci in _hungarian(cost):
+            i, j = (c[ci], r[ri]) if transpose else (r[ri], c[ci])
+            if (i, j) in scores:  # non-candidate cells are padding, not pairs
+                pairs.append((i, j, scores[(i, j)]))
+        return pairs
+
+    # Large component: greedy by descending similarity
+    pairs, used_a, used_b = [], set(), set()
+    ranked = sorted(
+        ((sim, i, j) for (i, j), sim in scores.items()),
+        key=lambda t: (-t[0], t[1], t[2]),
+    )
+    for sim, i, j in ranked:
+        if i not in used_a and j not in used_b:
+            used_a.add(i)
+            used_b.add(j)
+            pairs.append((i, j, sim))
+    return pairs
+
+
+def match_leftovers(
+    objs_a: list[list[str]],
+    objs_b: list[list[str]],
+    threshold: float = SIMILARITY_THRESHOLD,
+    tokens_a: list[frozenset[str]] | None = None,
+) -> tuple[list[tuple[int, int, float]], list[int], list[int]]:
+    """Pairs unmatched objects of one type by field similarity.
+
+    Args:
+        objs_a: Leftover objects from file A.
+        objs_b: Leftover objects from file B.
+        threshold: Minimum Jaccard similarity for a pair.
+        tokens_a: Precomputed object_tokens() of objs_a (e.g. from a
+            reference snapshot).
+
+    Returns:
+        pairs:       (index in objs_a, index in objs_b, similarity), in objs_a order
+        unmatched_a: indices into objs_a that found no partner
+        unmatched_b: indices into objs_b that found no partner
+    """
+    if tokens_a is None:
+        tokens_a = [object_tokens(o) for o in objs_a]
+    tokens_b = [object_tokens(o) for o in objs_b]
+    pairs: list[tuple[int, int, float]] = []
+
+    # Identical token sets pair up first, in file order
+    by_tokens: dict[frozenset[str], deque[int]] = defaultdict(deque)
+    for j, t in enumerate(tokens_b):
+        if t:
+            by_tokens[t].append(j)
+    rest_a: list[int] = []
+    taken_b: set[int] = set()
+    for i, t in enumerate(tokens_a):
+        if by_tokens.get(t):
+            j = by_tokens[t].popleft()
+            taken_b.add(j)
+            pairs.append((i, j, 1.0))
+        else:
+            rest_a.append(i)
+    rest_b = [j for j in range(len(objs_b)) if j not in taken_b]
+
+    if rest_a and rest_b:
+        sig_a = minhash_signatures([tokens_a[i] for i in rest_a])
+        sig_b = minhash_signatures([tokens_b[j] for j in rest_b])
+        scores: dict[tuple[int, int], float] = {}
+        for ci, cj in _best_candidates(sig_a, sig_b, threshold):
+            i, j = rest_a[ci], rest_b[cj]
+            sim = jaccard(tokens_a[i], tokens_b[j])
+            if sim >= threshold:
+                scores[(i, j)] = sim
+
+        # Connected components over candidate edges (union-find; B nodes offset)
+        parent: dict[int, int] = {}
+
+        def find(x: int) -> int:
+            while parent.setdefault(x, x) != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        offset = len(objs_a)
+        for i, j in scores:
+            parent[find(i)] = find(offset + j)
+        components: dict[int, tuple[list[int], list[int]]] = defaultdict(lambda: ([], []))
+        for i in sorted({i for i, _ in scores}):
+            components[find(i)][0].append(i)
+        for j in sorted({j for _, j in scores}):
+            components[find(offset + j)][1].append(j)
+
+        component_scores: dict[int, dict[tuple[int, int], float]] = defaultdict(dict)
+        for (i, j), sim in scores.items():
+            component_scores[find(i)][(i, j)] = sim
+
+        for root, (rows, cols) in components.items():
+            pairs.extend(_assign_component(rows, cols, component_scores[root]))
+
+    pairs.sort()
+    matched_a = {i for i, _, _ in pairs}
+    matched_b = {j for _, j, _ in pairs}
+    unmatched_a = [i for i in range(len(objs_a)) if i not in matched_a]
+    unmatched_b = [j for j in range(len(objs_b)) if j not in matched_b]
+    return pairs, unmatched_a, unmatched_b
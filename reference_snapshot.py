@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+"""
+Reference Snapshot Module.
+
+Many candidate IDFs are often compared against the same trusted reference
+(e.g. Content/Compare_idfs/smallOffice_HVAC.idf). A reference snapshot holds
+that reference already parsed, with object types uppercased and its
+candidate-independent comparison data precomputed (idf_comparator.ReferenceIndex:
+case-insensitive object names, field signatures, fuzzy-match tokens and the
+normalized field-value table), serialized to a single file. It is built once
+and reused, so comparing N candidates costs N candidate parses instead of
+N reference + N candidate parses.
+
+Snapshots are content-addressed: the cached file name carries the digest of
+the reference IDF, and a snapshot is only reused when it was written by the
+same parser/comparator code (SNAPSHOT_FORMAT and code digest). A snapshot
+file passed directly gets the same code check.
+
+Usage:
+    python reference_snapshot.py Content/Compare_idfs/smallOffice_HVAC.idf candidates/*.idf
+    python main.py --compare-against-snapshot REFERENCE.idf CANDIDATE.idf [CANDIDATE.idf ...]
+"""
+
+import argparse
+import glob
+import hashlib
+import os
+import pickle
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+from idf_comparator import CompareResult, ReferenceIndex, compare_parsed_idfs, index_reference
+from idf_parser import parse_idf
+from metadata_store import file_digest
+
+
+_PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+SNAPSHOT_FORMAT = 2
+SNAPSHOT_SUFFIX = ".refsnap"
+
+# Source files that determine the snapshot contents
+_SNAPSHOT_SOURCES = ["idf_parser.py", "idf_comparator.py", "object_matcher.py", "reference_snapshot.py"]
+
+_code_version_cache: str | None = None
+
+# Snapshot loaded once per worker process by _init_worker()
+_worker_snapshot: ReferenceSnapshot | None = None
+
+
+@dataclass
+class ReferenceSnapshot:
+    """A parsed and indexed reference IDF."""
+    path: str                               # reference IDF the snapshot was built from
+    digest: str                             # SHA-256 of the reference IDF contents
+    code_version: str                       # snapshot_code_version() at build time
+    objects: dict[str, list[list[str]]]     # uppercase object type → objects
+    index: ReferenceIndex                   # index_reference(objects)
+
+
+def snapshot_code_version() -> str:
+    """Short digest of the sources that shape a snapshot, computed once per process."""
+    global _code_version_cache
+    if _code_version_cache is None:
+        h = hashlib.sha256(str(SNAPSHOT_FORMAT).encode("utf-8"))
+        for rel_path in _SNAPSHOT_SOURCES:
+            with open(os.path.join(_PROJECT_DIR, rel_path), "rb") as f:
+                h.update(f.read())
+        _code_version_cache = h.hexdigest()[:16]
+    return _code_version_cache
+
+
+def build_snapshot(reference_path: str) -> ReferenceSnapshot:
+    """Parses and indexes a reference IDF.
+
+    Args:
+        reference_path: Path to the trusted reference IDF.
+
+    Returns:
+        The ReferenceSnapshot.
+    """
+    if not os.path.exists(reference_path):
+        raise FileNotFoundError(f"Reference IDF not found: {reference_path}")
+    objects = {k.upper(): v for k, v in parse_idf(reference_path).items()}
+    return ReferenceSnapshot(
+        path=os.path.abspath(reference_path),
+        digest=file_digest(reference_path),
+        code_version=snapshot_code_version(),
+        objects=objects,
+        index=index_reference(objects),
+    )
+
+
+def save_snapshot(snapshot: ReferenceSnapshot, path: str) -> None:
+    """Atomically writes a snapshot file.
+
+    Args:
+        snapshot: The snapshot to persist.
+        path: Destination path (conventionally ending in SNAPSHOT_SUFFIX).
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump({"format": SNAPSHOT_FORMAT, "snapshot": snapshot}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(path: str) -> ReferenceSnapshot:
+    """Loads a snapshot file written by save_snapshot().
+
+    Snapshots are pickles; only load files this tool wrote.
+
+    Raises:
+        ValueError: If the file is not a snapshot of the current format.
+    """
+    with open(path, "rb") as f:
+        data = pickle.load(f)
+    if not isinstance(data, dict) or data.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"Not a reference snapshot of format {SNAPSHOT_FORMAT}: {path}")
+    return data["snapshot"]
+
+
+def snapshot_path_for(reference_path: str, cache_dir: str, digest: str | None = None) -> str:
+    """Content-addressed cache path of a reference's snapshot."""
+    digest = digest or file_digest(reference_path)
+    stem = os.path.splitext(os.path.basename(reference_path))[0]
+    return os.path.join(cache_dir, f"{stem}-{digest[:12]}{SNAPSHOT_SUFFIX}")
+
+
+def load_or_build_snapshot(reference: str, cache_dir: str) -> tuple[ReferenceSnapshot, str]:
+    """Returns the snapshot of a reference, building and caching it if needed.
+
+    Args:
+        reference: A reference IDF, or a snapshot file (SNAPSHOT_SUFFIX).
+        cache_dir: Directory holding cached snapshots of reference IDFs.
+
+    Returns:
+        (snapshot, path of the snapshot file on disk).
+
+    Raises:
+        ValueError: If a snapshot file was built by different parser/comparator code.
+    """
+    if reference.endswith(SNAPSHOT_SUFFIX):
+        snapshot = load_snapshot(reference)
+        if snapshot.code_version != snapshot_code_version():
+            raise ValueError(
+                f"Snapshot {reference} was built by a different version of the comparator "
+                f"(code {snapshot.code_version}, current {snapshot_code_version()}); "
+                f"pass the reference IDF ({snapshot.path}) to rebuild it."
+            )
+        return snapshot, reference
+
+    digest = file_digest(reference)
+    path = snapshot_path_for(reference, cache_dir, digest)
+    if os.path.exists(path):
+        try:
+            snapshot = load_snapshot(path)
+            if snapshot.digest == digest and snapshot.code_version == snapshot_code_version():
+                print(f"  [snapshot] Reusing {path}")
+                return snapshot, path
+        except (OSError, ValueError, pickle.UnpicklingError, EOFError, AttributeError) as e:
+            print(f"  [snapshot] Could not read {path}: {e}")
+
+    snapshot = build_snapshot(reference)
+    save_snapshot(snapshot, path)
+    print(f"  [snapshot] Saved {path}")
+    return snapshot, path
+
+
+def compare_to_snapshot(
+    snapshot: ReferenceSnapshot,
+    path_b: str,
+    fuzzy: bool = True,
+    all_types: bool = False,
+    diff_log: str | None = None,
+    top_k: int | None = None,
+) -> CompareResult:
+    """compare_idfs(reference, path_b) using the snapshot instead of re-parsing the reference.
+
+    Args:
+        snapshot: Snapshot of the reference (file A).
+        path_b: IDF file being questioned.
+        fuzzy, all_types, diff_log, top_k: As for compare_idfs().
+
+    Returns:
+        The same CompareResult compare_idfs() would return.
+    """
+    if not os.path.exists(path_b):
+        raise FileNotFoundError(f"Comparison IDF not found: {path_b}")
+    idf_b = {k.upper(): v for k, v in parse_idf(path_b).items()}
+    return compare_parsed_idfs(
+        snapshot.path, path_b, snapshot.objects, idf_b,
+        fuzzy=fuzzy, all_types=all_types, diff_log=diff_log, top_k=top_k,
+        index_a=snapshot.index,
+    )
+
+
+def _init_worker(snapshot_path: str) -> None:
+    """Loads the snapshot once per worker process."""
+    global _worker_snapshot
+    _worker_snapshot = load_snapshot(snapshot_path)
+
+
+def _compare_in_worker(args: tuple[str, bool, bool, str | None, int | None]) -> CompareResult:
+    path_b, fuzzy, all_types, diff_log, top_k = args
+    return compare_to_snapshot(_worker_snapshot, path_b, fuzzy, all_types, diff_log, top_k)
+
+
+def compare_many(
+    snapshot_path: str,
+    candidates: list[str],
+    workers: int | None = None,
+    fuzzy: bool = True,
+    all_types: bool = False,
+    diff_logs: list[str | None] | None = None,
+    top_k: int | None = None,
+) -> list[CompareResult]:
+    """Compares many candidates against one snapshot, in parallel.
+
+    Each worker process loads the snapshot once and then only parses its
+    candidates.
+
+    Args:
+        snapshot_path: Snapshot file (see load_or_build_snapshot()).
+        candidates: IDF files to compare against the reference.
+        workers: Worker processes (default: one per candidate, capped at the
+            CPU count). 1 compares serially in this process.
+        fuzzy, all_types, top_k: As for compare_idfs().
+        diff_logs: Optional JSON-lines diff log per candidate.
+
+    Returns:
+        One CompareResult per candidate, in input order.
+    """
+    diff_logs = diff_logs or [None] * len(candidates)
+    tasks = [(c, fuzzy, all_types, log, top_k) for c, log in zip(candidates, diff_logs)]
+    workers = workers or min(len(candidates), os.cpu_count() or 1)
+    if workers <= 1 or len(candidates) <= 1:
+        _init_worker(snapshot_path)
+        return [_compare_in_worker(t) for t in tasks]
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(snapshot_path,)
+    ) as executor:
+        return list(executor.map(_compare_in_worker, tasks))
+
+
+def print_batch_summary(results: list[CompareResult]) -> None:
+    """Prints one line per candidate compared against the same reference."""
+    if not results:
+        return
+    print(f"\n{'='*60}")
+    print(f"  Reference : {os.path.basename(results[0].file_a)}")
+    print(f"{'='*60}")
+    print(f"  {'Types':>6} {'Objects':>8} {'Diffs':>6} {'Renamed':>8}  Candidate")
+    for r in results:
+        print(
+            f"  {len(r.missing_types):>6} {r.total_missing_objects:>8} {r.total_value_diffs:>6} "
+            f"{r.total_renamed_objects:>8}  {os.path.basename(r.file_b)}"
+        )
+    print(f"{'='*60}\n")
+
+
+def _cli() -> None:
+    """Command-line interface entry point."""
+    parser = argparse.ArgumentParser(description="Compare many IDFs against one reference snapshot.")
+    parser.add_argument("reference", help=f"Reference IDF or snapshot file ({SNAPSHOT_SUFFIX}).")
+    parser.add_argument("candidates", nargs="*", help="Candidate IDF files or glob patterns.")
+    parser.add_argument("--cache-dir", default=os.path.join(os.getcwd(), "outputs", "output_comparator", "snapshots"))
+    parser.add_argument("--workers", type=int, help="Parallel workers (default: one per candidate, up to CPU count).")
+    parser.add_argument("--no-fuzzy-match", action="store_true")
+    parser.add_argument("--all-types", action="store_true")
+    args = parser.parse_args()
+
+    try:
+        _, snapshot_path = load_or_build_snapshot(os.path.abspath(args.reference), args.cache_dir)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    candidates = [os.path.abspath(p) for pattern in args.candidates for p in sorted(glob.glob(pattern))]
+    if candidates:
+        results = compare_many(
+            snapshot_path, candidates, args.workers,
+            fuzzy=not args.no_fuzzy_match, all_types=args.all_types,
+        )
+        print_batch_summary(results)
+
+
+if __name__ == "__main__":
+    _cli()
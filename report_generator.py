@@ -7,7 +7,14 @@ This module provides functions to format the extracted zone metadata into
 a polished HTML report, including summary tables and building models.
 """
 
+import base64
 import datetime
+import hashlib
+import io
+import os
+import urllib.parse
+from collections import defaultdict
+from typing import TextIO
 
 
 def _format_val(val: any, precision: int = 4) -> str:
@@ -179,155 +186,44 @@ def _build_construction_html(construction_data: list[dict]) -> str:
     """
 
 
-def _build_schedule_html(schedule_data: list[dict]) -> str:
-    """Creates the 'Zone Schedule Assignments' table."""
-    if not schedule_data:
-        return ""
+# Supported storage modes for the 3D visualization image
+IMAGE_MODES = ("inline", "sibling", "assets")
 
-    rows_html = ""
-    for item in schedule_data:
-        # Group zones by base name for compact display
-        from collections import defaultdict
-        groups = defaultdict(int)
-        for z in item["zones"]:
-            base = _get_base_name(z)
-            groups[base] += 1
-        
-        # Format: BaseName1, BaseName2 (xCount)
-        zone_list = []
-        total_count = 0
-        for base, count in sorted(groups.items()):
-            zone_list.append(base)
-            total_count += count
-        
-        zone_str = f"{', '.join(zone_list)} (×{total_count})"
-        
-        rows_html += f"""
-        <tr>
-            <td style="font-weight:600; color:var(--accent);">{item['load_type']}</td>
-            <td class="wrap-txt">{item['schedule_name']}</td>
-            <td class="wrap-txt">{zone_str}</td>
-        </tr>
-        """
 
-    return f"""
-    <div class="card">
-        <div class="card-header">Zone Schedule Assignments</div>
-        <div class="table-container">
-            <table>
-                <thead>
-                    <tr>
-                        <th style="width:120px;">Load Type</th>
-                        <th style="min-width:1200px; width:1200px;">Schedule Name</th>
-                        <th>Zones (Count)</th>
-                    </tr>
-                </thead>
-                <tbody>
-                    {rows_html}
-                </tbody>
-            </table>
-        </div>
-    </div>
-    """
-
-
-def _build_process_loads_html(process_data: list[dict]) -> str:
-    """Creates the 'Building Process Loads' table."""
-    if not process_data:
-        return ""
-
-    rows_html = ""
-    for item in process_data:
-        zone = item.get("zone") or "-"
-        power = _format_val(item.get("power_w", 0))
-        rows_html += f"""
-        <tr>
-            <td>{item.get('category')}</td>
-            <td class="wrap-txt">{item.get('name')}</td>
-            <td>{power}</td>
-            <td>{zone}</td>
-            <td>{item.get('subcategory')}</td>
-            <td>{item.get('details')}</td>
-        </tr>
-        """
+def _write_viz_asset(
+    viz_b64: str, output_base_path: str, image_mode: str, asset_dir: str | None = None
+) -> str:
+    """Writes the visualization PNG to disk and returns its path.
 
-    return f"""
-    <div class="card">
-        <div class="card-header">Building Process Loads</div>
-        <div class="table-container">
-            <table>
-                <thead>
-                    <tr>
-                        <th>Category</th>
-                        <th>Name</th>
-                        <th>Power [W]</th>
-                        <th>Zone Location</th>
-                        <th>Subcategory</th>
-                        <th>Details</th>
-                    </tr>
-                </thead>
-                <tbody>
-                    {rows_html}
-                </tbody>
-            </table>
-        </div>
-    </div>
+    In "assets" mode the file name is the SHA-256 digest of the image bytes, so
+    identical renders from different reports resolve to one existing file and
+    are not written again.
     """
+    png_bytes = base64.b64decode(viz_b64)
 
+    if image_mode == "sibling":
+        image_path = f"{output_base_path}.png"
+    else:
+        if asset_dir is None:
+            asset_dir = os.path.join(os.path.dirname(output_base_path), "assets")
+        os.makedirs(asset_dir, exist_ok=True)
+        digest = hashlib.sha256(png_bytes).hexdigest()
+        image_path = os.path.join(asset_dir, f"{digest}.png")
+        if os.path.exists(image_path):
+            return image_path
 
-def _build_natural_ventilation_html(natural_vent_data: dict[str, list[dict]]) -> str:
-    """Creates the 'Natural Ventilation Parameters' table."""
-    if not natural_vent_data:
-        return ""
-
-    rows_html = ""
-    # Only show zones that actually have natural ventilation
-    for zone_name in sorted(natural_vent_data.keys()):
-        objs = natural_vent_data[zone_name]
-        if not objs:
-            continue
-            
-        for obj in objs:
-            rows_html += f"""
-            <tr>
-                <td class="wrap-txt">{zone_name}</td>
-                <td class="wrap-txt">{obj['name']}</td>
-                <td>{_format_val(obj['opening_area'])}</td>
-                <td class="wrap-txt">{obj['schedule']}</td>
-                <td>{_format_val(obj['min_in_temp'])}</td>
-                <td>{_format_val(obj['max_in_temp'])}</td>
-                <td>{_format_val(obj['min_out_temp'])}</td>
-                <td>{_format_val(obj['max_out_temp'])}</td>
-            </tr>
-            """
+    # Write to a temp name first so a concurrent reader never sees a partial PNG
+    tmp_path = f"{image_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(png_bytes)
+    os.replace(tmp_path, image_path)
+    return image_path
 
-    if not rows_html:
-        return ""
 
-    return f"""
-    <div class="card">
-        <div class="card-header">Natural Ventilation Parameters</div>
-        <div class="table-container">
-            <table>
-                <thead>
-                    <tr>
-                        <th>Zone</th>
-                        <th>Object Name</th>
-                        <th>Opening Area [m2]</th>
-                        <th>Schedule</th>
-                        <th>Min Indoor Temp [C]</th>
-                        <th>Max Indoor Temp [C]</th>
-                        <th>Min Outdoor Temp [C]</th>
-                        <th>Max Outdoor Temp [C]</th>
-                    </tr>
-                </thead>
-                <tbody>
-                    {rows_html}
-                </tbody>
-            </table>
-        </div>
-    </div>
-    """
+def _relative_url(target_path: str, start_dir: str) -> str:
+    """Returns a URL-quoted, forward-slash relative path from start_dir to target_path."""
+    rel = os.path.relpath(target_path, start_dir or os.curdir)
+    return urllib.parse.quote(rel.replace(os.sep, "/"))
 
 
 def generate_reports(
@@ -339,7 +235,9 @@ def generate_reports(
     process_data: list[dict] | None = None,
     schedule_data: list[dict] | None = None,
     natural_vent_data: dict[str, list[dict]] | None = None,
-):
+    image_mode: str = "inline",
+    asset_dir: str | None = None,
+) -> list[str]:
 
     """Generates CSV, Markdown, and HTML reports with zone deduplication.
 
@@ -351,10 +249,24 @@ def generate_reports(
         construction_data: Optional list of construction details for the baseline.
         process_data: Optional list of building-level process loads.
         schedule_data: Optional list of zone schedule assignments.
+        natural_vent_data: Optional natural ventilation objects per zone.
+        image_mode: How the 3D visualization is stored. One of IMAGE_MODES:
+            "inline" embeds it as base64, "sibling" writes ``<report>.png`` next
+            to the HTML, and "assets" writes it to a content-addressed
+            ``assets/`` directory so identical images are stored once.
+        asset_dir: Directory used by the "assets" mode. Defaults to an
+            ``assets`` folder next to the report.
+
+    Returns:
+        Paths of the files written (the HTML report and, in external image
+        modes, the PNG). Empty when there is no zone data.
     """
+    if image_mode not in IMAGE_MODES:
+        raise ValueError(f"Unknown image_mode {image_mode!r}; expected one of {IMAGE_MODES}")
+
     if not zone_data:
         print("No zone data to report.")
-        return
+        return []
 
     # 1. Define internal key map and display headers
     key_map = {
@@ -406,8 +318,14 @@ def generate_reports(
     headers = ["Zone", "Count"] + data_headers
     html_path = f"{output_base_path}.html"
 
+    viz_src = None
+    image_path = None
+    if viz_b64 and image_mode != "inline":
+        image_path = _write_viz_asset(viz_b64, output_base_path, image_mode, asset_dir)
+        viz_src = _relative_url(image_path, os.path.dirname(html_path))
+
     # 5. Generate HTML
-    with open(html_path, "w", encoding="utf-8") as f:
+    with open(html_path, "w", encoding="utf-8", buffering=_WRITE_BUFFER_SIZE) as f:
         # Re-build key_map for HTML (adding Count)
         html_key_map = {"Zone": "name", "Count": "Count"}
         for h in data_headers:
@@ -415,13 +333,18 @@ def generate_reports(
             
         area_summary_html = _build_area_summary_html(zone_data, hvac_data)
         
-        f.write(generate_html_content(
-            final_rows, headers, html_key_map, viz_b64, 
+        # Sections are streamed straight to the file handle
+        write_html_content(
+            f, final_rows, headers, html_key_map, viz_b64,
             final_hvac_rows, construction_data, process_data, schedule_data,
-            natural_vent_data, area_summary_html=area_summary_html
-        ))
+            natural_vent_data, area_summary_html=area_summary_html, viz_src=viz_src
+        )
 
     print(f"Report generated:\n  - {html_path}")
+    if image_path:
+        print(f"  - {image_path}")
+        return [html_path, image_path]
+    return [html_path]
 
 
 def _build_area_summary_html(zone_data: list[dict], hvac_data: dict[str, dict[str, str]] | None) -> str:
@@ -475,83 +398,18 @@ def _build_area_summary_html(zone_data: list[dict], hvac_data: dict[str, dict[st
     """
 
 
-def generate_html_content(
-    zone_data: list[dict],
-    headers: list[str],
-    key_map: dict,
-    viz_b64: str | None = None,
-    hvac_data: list[dict] | None = None,
-    construction_data: list[dict] | None = None,
-    process_data: list[dict] | None = None,
-    schedule_data: list[dict] | None = None,
-    natural_vent_data: dict[str, list[dict]] | None = None,
-    area_summary_html: str = "",
-) -> str:
-    """Creates a premium HTML document with a styled table."""
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-    # Visualization Section
-    viz_html = ""
-    if viz_b64:
-        viz_html = f"""
-        <div class="card viz-container">
-            <div class="card-header">3D Building Geometry</div>
-            <img src="data:image/png;base64,{viz_b64}" alt="3D Building Model">
-        </div>
-        """
-    else:
-        viz_html = """
-        <div class="card viz-placeholder">
-            <span class="warning-icon">⚠</span>
-            3D visualization unavailable (eppy not installed or IDD_FILE environment variable not set).
-        </div>
-        """
-
-    rows_html = ""
-    for zone in zone_data:
-        cells_html = ""
-        for h in headers:
-            val = zone.get(key_map[h], 0)
-            # Use 5 decimals for Infiltration and Ventilation, otherwise 4
-            precision = 5 if ("Infiltration" in h or "Ventilation" in h) else 4
-            formatted_val = _format_val(val, precision)
-            
-            if h == "Floor Area [m2]":
-                story_count = zone.get("story_count", 1)
-                if story_count > 1 and val > 0:
-                    footprint = val / story_count
-                    formatted_val = f"{_format_val(footprint, precision)} (Footprint)"
-
-            cls = ' class="wrap-txt"' if h in ["Zone", "Thermal Zone"] else ""
-            cells_html += f"<td{cls}>{formatted_val}</td>"
-        rows_html += f"<tr>{cells_html}</tr>"
 
-    headers_html = "".join([f"<th>{h}</th>" for h in headers])
+# ---------------------------------------------------------------------------
+# Precompiled HTML templates
+# ---------------------------------------------------------------------------
+# Static markup is held in module-level templates so that each report only
+# renders the per-row fragments and streams them straight to the file handle
+# instead of concatenating the whole document in memory first.
 
-    hvac_html = ""
-    if hvac_data:
-        hvac_headers = ["Thermal Zone", "Count", "Honeybee HVAC Template", "DCV Status", "Economizer Configuration"]
-        hvac_rows = ""
-        for row in hvac_data:
-            hvac_rows += f"<tr><td class=\"wrap-txt\">{row['name']}</td><td>{row['Count']}</td><td>{row.get('template', 'Unknown')}</td><td>{row.get('dcv', 'Unknown')}</td><td>{row.get('economizer', 'Unknown')}</td></tr>"
-        
-        hvac_html = f"""
-        <div class="card">
-            <div class="card-header">HVAC System Metadata</div>
-            <div class="table-container">
-                <table>
-                    <thead>
-                        <tr>{"".join([f"<th>{h}</th>" for h in hvac_headers])}</tr>
-                    </thead>
-                    <tbody>
-                        {hvac_rows}
-                    </tbody>
-                </table>
-            </div>
-        </div>
-        """
+_B64_CHUNK_SIZE = 64 * 1024
+_WRITE_BUFFER_SIZE = 256 * 1024
 
-    return f"""<!DOCTYPE html>
+_DOCUMENT_HEAD = """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -690,9 +548,25 @@ def generate_html_content(
         <h1>Zone Metadata Summary</h1>
         <div class="metadata">Generated on: {timestamp}</div>
         
-        {viz_html}
+        """
+
+_VIZ_OPEN = """
+        <div class="card viz-container">
+            <div class="card-header">3D Building Geometry</div>
+            <img src=\""""
+
+_VIZ_CLOSE = """" alt="3D Building Model">
+        </div>
+        """
+
+_VIZ_PLACEHOLDER = """
+        <div class="card viz-placeholder">
+            <span class="warning-icon">⚠</span>
+            3D visualization unavailable (eppy not installed or IDD_FILE environment variable not set).
+        </div>
+        """
 
-        {area_summary_html}
+_ZONE_TABLE_OPEN = """
 
         <div class="card">
             <div class="card-header">Zone Metadata Detail</div>
@@ -702,21 +576,330 @@ def generate_html_content(
                         <tr>{headers_html}</tr>
                     </thead>
                     <tbody>
-                        {rows_html}
+                        """
+
+_ZONE_TABLE_CLOSE = """
                     </tbody>
                 </table>
             </div>
         </div>
 
-        {hvac_html}
+        """
 
-        {_build_schedule_html(schedule_data) if schedule_data else ""}
+_HVAC_HEADERS = ["Thermal Zone", "Count", "Honeybee HVAC Template", "DCV Status", "Economizer Configuration"]
 
-        {_build_process_loads_html(process_data) if process_data else ""}
-        
-        {_build_natural_ventilation_html(natural_vent_data) if natural_vent_data else ""}
+_HVAC_TABLE_OPEN = """
+        <div class="card">
+            <div class="card-header">HVAC System Metadata</div>
+            <div class="table-container">
+                <table>
+                    <thead>
+                        <tr>{headers_html}</tr>
+                    </thead>
+                    <tbody>
+                        """
+
+_HVAC_ROW = (
+    '<tr><td class="wrap-txt">{name}</td><td>{count}</td><td>{template}</td>'
+    "<td>{dcv}</td><td>{economizer}</td></tr>"
+)
+
+_HVAC_TABLE_CLOSE = """
+                    </tbody>
+                </table>
+            </div>
+        </div>
+        """
+
+_SCHEDULE_TABLE_OPEN = """
+    <div class="card">
+        <div class="card-header">Zone Schedule Assignments</div>
+        <div class="table-container">
+            <table>
+                <thead>
+                    <tr>
+                        <th style="width:120px;">Load Type</th>
+                        <th style="min-width:1200px; width:1200px;">Schedule Name</th>
+                        <th>Zones (Count)</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    """
+
+_SCHEDULE_ROW = """
+        <tr>
+            <td style="font-weight:600; color:var(--accent);">{load_type}</td>
+            <td class="wrap-txt">{schedule_name}</td>
+            <td class="wrap-txt">{zones}</td>
+        </tr>
+        """
+
+_PROCESS_TABLE_OPEN = """
+    <div class="card">
+        <div class="card-header">Building Process Loads</div>
+        <div class="table-container">
+            <table>
+                <thead>
+                    <tr>
+                        <th>Category</th>
+                        <th>Name</th>
+                        <th>Power [W]</th>
+                        <th>Zone Location</th>
+                        <th>Subcategory</th>
+                        <th>Details</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    """
 
-        {_build_construction_html(construction_data) if construction_data else ""}
+_PROCESS_ROW = """
+        <tr>
+            <td>{category}</td>
+            <td class="wrap-txt">{name}</td>
+            <td>{power}</td>
+            <td>{zone}</td>
+            <td>{subcategory}</td>
+            <td>{details}</td>
+        </tr>
+        """
+
+_NATURAL_VENT_TABLE_OPEN = """
+    <div class="card">
+        <div class="card-header">Natural Ventilation Parameters</div>
+        <div class="table-container">
+            <table>
+                <thead>
+                    <tr>
+                        <th>Zone</th>
+                        <th>Object Name</th>
+                        <th>Opening Area [m2]</th>
+                        <th>Schedule</th>
+                        <th>Min Indoor Temp [C]</th>
+                        <th>Max Indoor Temp [C]</th>
+                        <th>Min Outdoor Temp [C]</th>
+                        <th>Max Outdoor Temp [C]</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    """
+
+_NATURAL_VENT_ROW = """
+            <tr>
+                <td class="wrap-txt">{zone}</td>
+                <td class="wrap-txt">{name}</td>
+                <td>{opening_area}</td>
+                <td class="wrap-txt">{schedule}</td>
+                <td>{min_in_temp}</td>
+                <td>{max_in_temp}</td>
+                <td>{min_out_temp}</td>
+                <td>{max_out_temp}</td>
+            </tr>
+            """
+
+# Shared closing markup for the card-level tables (schedule, process, natural vent)
+_CARD_TABLE_CLOSE = """
+                </tbody>
+            </table>
+        </div>
+    </div>
+    """
+
+_DOCUMENT_TAIL = """
     </div>
 </body>
 </html>"""
+
+
+def _write_chunked(f: TextIO, text: str, chunk_size: int = _B64_CHUNK_SIZE) -> None:
+    """Writes a large string to the file handle in fixed-size slices."""
+    for start in range(0, len(text), chunk_size):
+        f.write(text[start:start + chunk_size])
+
+
+def _write_schedule_html(f: TextIO, schedule_data: list[dict]) -> None:
+    """Streams the 'Zone Schedule Assignments' table."""
+    if not schedule_data:
+        return
+
+    f.write(_SCHEDULE_TABLE_OPEN)
+    for item in schedule_data:
+        # Group zones by base name for compact display
+        groups: dict[str, int] = defaultdict(int)
+        for z in item["zones"]:
+            groups[_get_base_name(z)] += 1
+
+        # Format: BaseName1, BaseName2 (xCount)
+        zone_str = f"{', '.join(sorted(groups))} (×{sum(groups.values())})"
+
+        f.write(_SCHEDULE_ROW.format(
+            load_type=item["load_type"],
+            schedule_name=item["schedule_name"],
+            zones=zone_str,
+        ))
+    f.write(_CARD_TABLE_CLOSE)
+
+
+def _write_process_loads_html(f: TextIO, process_data: list[dict]) -> None:
+    """Streams the 'Building Process Loads' table."""
+    if not process_data:
+        return
+
+    f.write(_PROCESS_TABLE_OPEN)
+    for item in process_data:
+        f.write(_PROCESS_ROW.format(
+            category=item.get("category"),
+            name=item.get("name"),
+            power=_format_val(item.get("power_w", 0)),
+            zone=item.get("zone") or "-",
+            subcategory=item.get("subcategory"),
+            details=item.get("details"),
+        ))
+    f.write(_CARD_TABLE_CLOSE)
+
+
+def _write_natural_ventilation_html(f: TextIO, natural_vent_data: dict[str, list[dict]]) -> None:
+    """Streams the 'Natural Ventilation Parameters' table."""
+    # Only show zones that actually have natural ventilation
+    if not natural_vent_data or not any(natural_vent_data.values()):
+        return
+
+    f.write(_NATURAL_VENT_TABLE_OPEN)
+    for zone_name in sorted(natural_vent_data.keys()):
+        for obj in natural_vent_data[zone_name]:
+            f.write(_NATURAL_VENT_ROW.format(
+                zone=zone_name,
+                name=obj["name"],
+                opening_area=_format_val(obj["opening_area"]),
+                schedule=obj["schedule"],
+                min_in_temp=_format_val(obj["min_in_temp"]),
+                max_in_temp=_format_val(obj["max_in_temp"]),
+                min_out_temp=_format_val(obj["min_out_temp"]),
+                max_out_temp=_format_val(obj["max_out_temp"]),
+            ))
+    f.write(_CARD_TABLE_CLOSE)
+
+
+def _write_zone_rows(f: TextIO, zone_data: list[dict], headers: list[str], key_map: dict) -> None:
+    """Streams one <tr> per (collapsed) zone row."""
+    # Per-column settings are resolved once instead of for every cell
+    columns = []
+    for h in headers:
+        # Use 5 decimals for Infiltration and Ventilation, otherwise 4
+        precision = 5 if ("Infiltration" in h or "Ventilation" in h) else 4
+        open_tag = '<td class="wrap-txt">' if h in ["Zone", "Thermal Zone"] else "<td>"
+        columns.append((key_map[h], precision, open_tag, h == "Floor Area [m2]"))
+
+    for zone in zone_data:
+        cells = []
+        for key, precision, open_tag, is_floor_area in columns:
+            val = zone.get(key, 0)
+            formatted_val = _format_val(val, precision)
+
+            if is_floor_area:
+                story_count = zone.get("story_count", 1)
+                if story_count > 1 and val > 0:
+                    footprint = val / story_count
+                    formatted_val = f"{_format_val(footprint, precision)} (Footprint)"
+
+            cells.append(f"{open_tag}{formatted_val}</td>")
+        f.write(f"<tr>{''.join(cells)}</tr>")
+
+
+def _write_hvac_html(f: TextIO, hvac_data: list[dict]) -> None:
+    """Streams the 'HVAC System Metadata' table."""
+    if not hvac_data:
+        return
+
+    f.write(_HVAC_TABLE_OPEN.format(headers_html="".join(f"<th>{h}</th>" for h in _HVAC_HEADERS)))
+    for row in hvac_data:
+        f.write(_HVAC_ROW.format(
+            name=row["name"],
+            count=row["Count"],
+            template=row.get("template", "Unknown"),
+            dcv=row.get("dcv", "Unknown"),
+            economizer=row.get("economizer", "Unknown"),
+        ))
+    f.write(_HVAC_TABLE_CLOSE)
+
+
+def write_html_content(
+    f: TextIO,
+    zone_data: list[dict],
+    headers: list[str],
+    key_map: dict,
+    viz_b64: str | None = None,
+    hvac_data: list[dict] | None = None,
+    construction_data: list[dict] | None = None,
+    process_data: list[dict] | None = None,
+    schedule_data: list[dict] | None = None,
+    natural_vent_data: dict[str, list[dict]] | None = None,
+    area_summary_html: str = "",
+    viz_src: str | None = None,
+) -> None:
+    """Streams the premium HTML document section by section to an open text handle.
+
+    Static markup comes from the precompiled module templates; only table rows
+    are rendered per report, and the base64 image is written in chunks so the
+    full document is never held in memory. When viz_src is given, the image is
+    referenced by that (relative) URL instead of being inlined.
+    """
+    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    f.write(_DOCUMENT_HEAD.format(timestamp=timestamp))
+
+    # Visualization Section
+    if viz_src:
+        f.write(_VIZ_OPEN)
+        f.write(viz_src)
+        f.write(_VIZ_CLOSE)
+    elif viz_b64:
+        f.write(_VIZ_OPEN)
+        f.write("data:image/png;base64,")
+        _write_chunked(f, viz_b64)
+        f.write(_VIZ_CLOSE)
+    else:
+        f.write(_VIZ_PLACEHOLDER)
+
+    f.write("\n\n        ")
+    f.write(area_summary_html)
+
+    f.write(_ZONE_TABLE_OPEN.format(headers_html="".join(f"<th>{h}</th>" for h in headers)))
+    _write_zone_rows(f, zone_data, headers, key_map)
+    f.write(_ZONE_TABLE_CLOSE)
+
+    _write_hvac_html(f, hvac_data)
+    f.write("\n\n        ")
+    _write_schedule_html(f, schedule_data)
+    f.write("\n\n        ")
+    _write_process_loads_html(f, process_data)
+    f.write("\n        \n        ")
+    _write_natural_ventilation_html(f, natural_vent_data)
+    f.write("\n\n        ")
+    f.write(_build_construction_html(construction_data) if construction_data else "")
+    f.write(_DOCUMENT_TAIL)
+
+
+def generate_html_content(
+    zone_data: list[dict],
+    headers: list[str],
+    key_map: dict,
+    viz_b64: str | None = None,
+    hvac_data: list[dict] | None = None,
+    construction_data: list[dict] | None = None,
+    process_data: list[dict] | None = None,
+    schedule_data: list[dict] | None = None,
+    natural_vent_data: dict[str, list[dict]] | None = None,
+    area_summary_html: str = "",
+    viz_src: str | None = None,
+) -> str:
+    """Creates a premium HTML document with a styled table.
+
+    In-memory wrapper around write_html_content(); report files should be
+    streamed with write_html_content() directly.
+    """
+    buf = io.StringIO()
+    write_html_content(
+        buf, zone_data, headers, key_map, viz_b64, hvac_data, construction_data,
+        process_data, schedule_data, natural_vent_data, area_summary_html, viz_src,
+    )
+    return buf.getvalue()
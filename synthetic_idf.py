@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+"""
+Synthetic IDF Generator.
+
+Builds large neighbourhood-style IDF files for load and scaling tests by
+cloning a prototype building N times. Each copy:
+
+- gets a building prefix ``<block>_<n>_`` on every identifier it defines
+  (zones, surfaces, schedules, loads, HVAC objects) and on every reference
+  to them, so ``NUs_parser._extract_prefix`` resolves it to ``<block>_<n>``;
+- is translated on a square grid so buildings do not overlap.
+
+Site-wide objects (Version, Building, run periods, materials, constructions,
+curves, outputs, ...) are written once. Output is deterministic: the same
+prototype and size always produce byte-identical files.
+
+The result is meant for parser and extractor benchmarks; it is not
+guaranteed to simulate in EnergyPlus (e.g. EMS variable names are cloned
+verbatim).
+
+Usage:
+    python synthetic_idf.py --objects 100000 --output outputs_benchmark/synthetic_100k.idf
+    python synthetic_idf.py --copies 24 --prototype Content/ASHRAE901_STD2022/ASHRAE901_Hospital_STD2022_Denver.idf
+"""
+
+import argparse
+import math
+import os
+from dataclasses import dataclass, field
+from typing import TextIO
+
+from idf_parser import parse_idf
+from visualizer_adapter import _bsd_offsets
+
+
+_PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_PROTOTYPE = os.path.join(
+    _PROJECT_DIR, "Content", "ASHRAE901_STD2022", "ASHRAE901_OfficeSmall_STD2022_Denver.idf"
+)
+
+# Object types written once for the whole site: exact uppercase names ...
+_SITE_WIDE_TYPES = {
+    "VERSION", "SIMULATIONCONTROL", "BUILDING", "SHADOWCALCULATION",
+    "HEATBALANCEALGORITHM", "TIMESTEP", "CONVERGENCELIMITS", "RUNPERIOD",
+    "GLOBALGEOMETRYRULES", "SCHEDULETYPELIMITS", "SIZING:PARAMETERS",
+    "ZONEAIRHEATBALANCEALGORITHM", "CURRENCYTYPE", "ENVIRONMENTALIMPACTFACTORS",
+    "FUELFACTORS",
+}
+# ... and type-name prefixes
+_SITE_WIDE_PREFIXES = (
+    "SURFACECONVECTIONALGORITHM:", "SITE:", "SIZINGPERIOD:", "RUNPERIODCONTROL:",
+    "MATERIAL", "WINDOWMATERIAL:", "CONSTRUCTION", "CURVE:", "TABLE:", "OUTPUT",
+    "LIFECYCLECOST:", "UTILITYCOST:",
+)
+
+# Field index of the first vertex X coordinate for fixed-layout shading types
+_SHADING_VERTEX_START = {
+    "SHADING:SITE:DETAILED": 3,
+    "SHADING:BUILDING:DETAILED": 3,
+    "SHADING:ZONE:DETAILED": 4,
+}
+
+# Gap between neighbouring buildings on the grid (metres)
+_GRID_GAP_M = 10.0
+
+# Copies per numeric block, i.e. prefixes run 1_1 … 1_100, 2_1 … 2_100, ...
+_COPIES_PER_BLOCK = 100
+
+
+@dataclass
+class _Template:
+    """One prototype object prepared for fast cloning."""
+    obj_type: str
+    fields: list[str]
+    rename_idx: list[int] = field(default_factory=list)
+    x_idx: list[int] = field(default_factory=list)
+    y_idx: list[int] = field(default_factory=list)
+
+
+@dataclass
+class Prototype:
+    """A prototype IDF split into site-wide objects and per-building templates."""
+    path: str
+    site_objects: list[tuple[str, list[str]]]
+    templates: list[_Template]
+    footprint_m: float
+
+    @property
+    def objects_per_copy(self) -> int:
+        return len(self.templates)
+
+
+def building_prefix(index: int) -> str:
+    """Returns the identifier prefix of the index-th (0-based) building copy."""
+    block, n = divmod(index, _COPIES_PER_BLOCK)
+    return f"{block + 1}_{n + 1}_"
+
+
+def _is_site_wide(obj_type: str) -> bool:
+    return obj_type in _SITE_WIDE_TYPES or obj_type.startswith(_SITE_WIDE_PREFIXES)
+
+
+def _is_number(value: str) -> bool:
+    try:
+        float(value)
+        return True
+    except ValueError:
+        return False
+
+
+def _vertex_start(obj_type: str, fields: list[str]) -> int | None:
+    """Returns the field index of the first vertex coordinate, if any."""
+    if obj_type == "BUILDINGSURFACE:DETAILED":
+        return _bsd_offsets(fields)[3]
+    if obj_type == "FENESTRATIONSURFACE:DETAILED":
+        # Number of Vertices is the first integer-like field after View Factor
+        for k in range(5, min(12, len(fields))):
+            val = fields[k].strip().lower()
+            if val == "autocalculate" or (val.isdigit() and int(val) >= 3):
+                return k + 1
+        return None
+    return _SHADING_VERTEX_START.get(obj_type)
+
+
+def _references(value: str, names: set[str]) -> bool:
+    """True when value is a cloned identifier or starts with one followed by
+    a separator (e.g. the node name "Core_ZN Air Node" for zone "Core_ZN")."""
+    key = value.upper()
+    if key in names:
+        return True
+    for i, ch in enumerate(key):
+        if ch in " _" and key[:i] in names:
+            return True
+    return False
+
+
+def load_prototype(path: str = DEFAULT_PROTOTYPE) -> Prototype:
+    """Parses a prototype IDF and precomputes which fields each copy rewrites.
+
+    Args:
+        path: Path to the prototype .idf file.
+
+    Returns:
+        The prepared Prototype.
+    """
+    idf_data = parse_idf(path)
+
+    site_objects: list[tuple[str, list[str]]] = []
+    cloned: list[tuple[str, list[str]]] = []
+    for obj_type, objects in idf_data.items():
+        target = site_objects if _is_site_wide(obj_type) else cloned
+        target.extend((obj_type, obj) for obj in objects)
+
+    site_names = {obj[0].upper() for _, obj in site_objects if obj and obj[0]}
+    names = {
+        obj[0].upper()
+        for _, obj in cloned
+        if obj and obj[0] and not _is_number(obj[0])
+    } - site_names
+
+    templates: list[_Template] = []
+    min_x = min_y = math.inf
+    max_x = max_y = -math.inf
+    for obj_type, obj in cloned:
+        tpl = _Template(obj_type, obj)
+        vs = _vertex_start(obj_type, obj)
+        vertex_fields = set()
+        if vs is not None:
+            for k in range(vs, len(obj) - 2, 3):
+                if not (_is_number(obj[k]) and _is_number(obj[k + 1])):
+                    break
+                tpl.x_idx.append(k)
+                tpl.y_idx.append(k + 1)
+                vertex_fields.update((k, k + 1, k + 2))
+                if obj_type == "BUILDINGSURFACE:DETAILED":
+                    min_x, max_x = min(min_x, float(obj[k])), max(max_x, float(obj[k]))
+                    min_y, max_y = min(min_y, float(obj[k + 1])), max(max_y, float(obj[k + 1]))
+        for i, value in enumerate(obj):
+            if i not in vertex_fields and value and value.upper() not in site_names and _references(value, names):
+                tpl.rename_idx.append(i)
+        templates.append(tpl)
+
+    footprint = max(max_x - min_x, max_y - min_y) if templates and min_x != math.inf else 0.0
+    return Prototype(path, site_objects, templates, footprint + _GRID_GAP_M)
+
+
+def _write_object(f: TextIO, obj_type: str, fields: list[str]) -> None:
+    """Writes one object in the conventional one-field-per-line IDF layout."""
+    if not fields:
+        f.write(f"  {obj_type};\n\n")
+        return
+    f.write(f"  {obj_type},\n")
+    for value in fields[:-1]:
+        f.write(f"    {value},\n")
+    f.write(f"    {fields[-1]};\n\n")
+
+
+def _format_coord(value: float) -> str:
+    return f"{value:.4f}".rstrip("0").rstrip(".")
+
+
+def copies_for_objects(prototype: Prototype, target_objects: int) -> int:
+    """Returns how many copies are needed to reach at least target_objects."""
+    per_copy = max(1, prototype.objects_per_copy)
+    return max(1, math.ceil((target_objects - len(prototype.site_objects)) / per_copy))
+
+
+def write_synthetic_idf(prototype: Prototype, copies: int, output_path: str) -> int:
+    """Writes a neighbourhood IDF made of copies of the prototype.
+
+    Args:
+        prototype: Prototype returned by load_prototype().
+        copies: Number of building copies.
+        output_path: Destination .idf path.
+
+    Returns:
+        The number of objects written.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    grid = math.ceil(math.sqrt(copies))
+    spacing = prototype.footprint_m
+
+    with open(output_path, "w", encoding="utf-8", buffering=1 << 18) as f:
+        f.write(
+            f"! Synthetic neighbourhood: {copies} copies of {os.path.basename(prototype.path)}\n"
+            f"! Generated by synthetic_idf.py\n\n"
+        )
+        for obj_type, fields in prototype.site_objects:
+            _write_object(f, obj_type, fields)
+
+        for index in range(copies):
+            prefix = building_prefix(index)
+            row, col = divmod(index, grid)
+            dx, dy = col * spacing, row * spacing
+            for tpl in prototype.templates:
+                fields = list(tpl.fields)
+                for i in tpl.rename_idx:
+                    fields[i] = prefix + fields[i]
+                if dx:
+                    for i in tpl.x_idx:
+                        fields[i] = _format_coord(float(fields[i]) + dx)
+                if dy:
+                    for i in tpl.y_idx:
+                        fields[i] = _format_coord(float(fields[i]) + dy)
+                _write_object(f, tpl.obj_type, fields)
+
+    return len(prototype.site_objects) + copies * prototype.objects_per_copy
+
+
+def generate(
+    output_path: str,
+    objects: int | None = None,
+    copies: int | None = None,
+    prototype_path: str = DEFAULT_PROTOTYPE,
+) -> int:
+    """Convenience wrapper: loads the prototype and writes the synthetic file.
+
+    Exactly one of objects / copies should be given; objects is rounded up
+    to a whole number of copies.
+
+    Returns:
+        The number of objects written.
+    """
+    prototype = load_prototype(prototype_path)
+    if copies is None:
+        copies = copies_for_objects(prototype, objects or prototype.objects_per_copy)
+    return write_synthetic_idf(prototype, copies, output_path)
+
+
+def _cli() -> None:
+    """Command-line interface entry point."""
+    parser = argparse.ArgumentParser(description="Generate a synthetic neighbourhood IDF from a prototype.")
+    parser.add_argument("--prototype", default=DEFAULT_PROTOTYPE, help="Prototype IDF to clone.")
+    size = parser.add_mutually_exclusive_group(required=True)
+    size.add_argument("--objects", type=int, help="Target object count (e.g. 10000, 100000, 1000000).")
+    size.add_argument("--copies", type=int, help="Number of building copies.")
+    parser.add_argument("--output", required=True, help="Output .idf path.")
+    args = parser.parse_args()
+
+    count = generate(args.output, args.objects, args.copies, args.prototype)
+    print(f"  [synthetic] Wrote {count:,} objects to {args.output}")
+
+
+if __name__ == "__main__":
+    _cli()
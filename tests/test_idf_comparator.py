@@ -0,0 +1,197 @@
+"""Tests for idf_comparator (matching, top-K results, diff logs) and object_matcher."""
+
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+import os
+import re
+
+import pytest
+
+from idf_comparator import OBJECT_IMPACT, MissingObject, _DiffCollector, compare_idfs
+from idf_parser import parse_idf
+from object_matcher import match_leftovers
+
+CONTENT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Content")
+ASHRAE_DIR = os.path.join(CONTENT_DIR, "ASHRAE901_STD2022")
+PROTOTYPE = os.path.join(ASHRAE_DIR, "ASHRAE901_OfficeSmall_STD2022_Denver.idf")
+
+
+def _rename_everywhere(text: str, old: str, new: str) -> str:
+    """Renames an object and every field referencing it (whole field values)."""
+    pattern = re.compile(r"(^|,)([ \t]*)" + re.escape(old) + r"([ \t]*[,;])", re.IGNORECASE | re.MULTILINE)
+    return pattern.sub(lambda m: f"{m.group(1)}{m.group(2)}{new}{m.group(3)}", text)
+
+
+def _distinct_objects(objects: list[list[str]], count: int) -> list[list[str]]:
+    """First `count` objects whose fields after the name are all different."""
+    picked, seen = [], set()
+    for obj in objects:
+        key = tuple(f.strip().lower() for f in obj[1:])
+        if key not in seen:
+            seen.add(key)
+            picked.append(obj)
+        if len(picked) == count:
+            break
+    return picked
+
+
+@pytest.fixture(scope="module")
+def renamed_copy(tmp_path_factory):
+    """A copy of the prototype with 4 surfaces and 3 schedules renamed."""
+    data = parse_idf(PROTOTYPE)
+    renames = {}
+    for obj_type, prefix, count in (("BUILDINGSURFACE:DETAILED", "Face", 4),
+                                    ("SCHEDULE:COMPACT", "Sched", 3)):
+        for k, obj in enumerate(_distinct_objects(data[obj_type], count), 1):
+            renames[(obj_type, obj[0].strip())] = f"Renamed {prefix} {k}"
+
+    with open(PROTOTYPE, "r", encoding="utf-8", errors="replace") as f:
+        text = f.read()
+    for (_, old), new in renames.items():
+        text = _rename_everywhere(text, old, new)
+    path = tmp_path_factory.mktemp("renamed") / "OfficeSmall_renamed.idf"
+    path.write_text(text, encoding="utf-8")
+    return str(path), renames
+
+
+def test_fuzzy_pairs_renamed_objects(renamed_copy):
+    path_b, renames = renamed_copy
+    result = compare_idfs(PROTOTYPE, path_b)
+
+    pairs = {(r.obj_type, r.name_a, r.name_b) for r in result.renamed_objects}
+    assert pairs == {(t, old, new) for (t, old), new in renames.items()}
+    assert all(r.similarity > 0.9 for r in result.renamed_objects)
+    assert result.missing_types == []
+    assert result.missing_objects == []
+
+    # The only value differences are the fields that reference a renamed object
+    new_names = {new.lower() for new in renames.values()}
+    expected_fields = sum(
+        1
+        for obj_type, objects in parse_idf(path_b).items()
+        if obj_type.upper() in OBJECT_IMPACT
+        for obj in objects
+        for value in obj[1:]
+        if value.strip().lower() in new_names
+    )
+    field_diffs = [fd for d in result.value_diffs for fd in d.field_diffs]
+    assert expected_fields > 0
+    assert len(field_diffs) == expected_fields
+    assert {fd.value_b.strip() for fd in field_diffs} <= set(renames.values())
+    assert result.total_value_diffs == len(result.value_diffs)
+
+
+def test_without_fuzzy_renamed_objects_are_missing(renamed_copy):
+    path_b, renames = renamed_copy
+    result = compare_idfs(PROTOTYPE, path_b, fuzzy=False)
+
+    assert result.renamed_objects == []
+    missing = {(m.obj_type, m.obj_name, m.side) for m in result.missing_objects}
+    assert missing == (
+        {(t, old, "A") for (t, old) in renames}
+        | {(t, new, "B") for (t, _), new in renames.items()}
+    )
+
+
+# Digests of the result of compare_idfs() before fuzzy matching, all-type
+# comparison and top-K truncation were added: fuzzy=False must reproduce it
+# exactly (entries, field values and order).
+PRE_FUZZY_RESULTS = [
+    ("ASHRAE901_OfficeMedium_STD2019_Denver", "ASHRAE901_OfficeMedium_STD2022_Denver",
+     (0, 1, 39, 98, 487), "acde81c208a1b2cc"),
+    ("ASHRAE901_OfficeSmall_STD2022_Denver", "ASHRAE901_OfficeMedium_STD2022_Denver",
+     (13, 634, 24, 715, 29), "49261346dab5aecd"),
+    ("ASHRAE901_RestaurantFastFood_STD2022_Denver", "ASHRAE901_RestaurantSitDown_STD2022_Denver",
+     (0, 25, 62, 889, 86), "0ac44924499e5d6b"),
+]
+
+
+@pytest.mark.parametrize("name_a, name_b, counts, digest", PRE_FUZZY_RESULTS)
+def test_exact_matching_reproduces_pre_fuzzy_output(name_a, name_b, counts, digest):
+    result = compare_idfs(os.path.join(ASHRAE_DIR, f"{name_a}.idf"),
+                          os.path.join(ASHRAE_DIR, f"{name_b}.idf"), fuzzy=False)
+
+    assert (
+        len(result.missing_types),
+        len(result.missing_objects),
+        len(result.value_diffs),
+        sum(len(d.field_diffs) for d in result.value_diffs),
+        result.perfect_matches,
+    ) == counts
+    assert result.renamed_objects == []
+    canonical = json.dumps({
+        "missing_types": [dataclasses.asdict(x) for x in result.missing_types],
+        "missing_objects": [dataclasses.asdict(x) for x in result.missing_objects],
+        "value_diffs": [dataclasses.asdict(x) for x in result.value_diffs],
+        "perfect_matches": result.perfect_matches,
+    }, sort_keys=True)
+    assert hashlib.sha256(canonical.encode()).hexdigest()[:16] == digest
+
+
+def test_identical_unnamed_objects_pair_in_file_order():
+    objs = [["", "Outdoors", str(k % 3)] for k in range(9)]
+    pairs, unmatched_a, unmatched_b = match_leftovers(objs, list(reversed(objs)))
+
+    assert unmatched_a == [] and unmatched_b == []
+    assert all(sim == 1.0 for _, _, sim in pairs)
+    assert all(objs[i] == objs[8 - j] for i, j, _ in pairs)
+    # Equal objects are paired in order: the first A copy takes the first B copy
+    assert [j for _, j, _ in pairs] == [2, 1, 0, 5, 4, 3, 8, 7, 6]
+
+
+def test_diff_log_streams_every_entry_and_result_keeps_top_k(tmp_path):
+    path_a = os.path.join(ASHRAE_DIR, "ASHRAE901_OfficeSmall_STD2022_Denver.idf")
+    path_b = os.path.join(ASHRAE_DIR, "ASHRAE901_OfficeMedium_STD2022_Denver.idf")
+    top_k = 5
+    full = compare_idfs(path_a, path_b, all_types=True)
+    log = tmp_path / "diffs.jsonl"
+    result = compare_idfs(path_a, path_b, all_types=True, diff_log=str(log), top_k=top_k)
+
+    lines = [json.loads(line) for line in log.read_text(encoding="utf-8").splitlines()]
+    assert lines[0]["kind"] == "header" and lines[-1]["kind"] == "summary"
+    by_kind: dict[str, list[dict]] = {}
+    for entry in lines[1:-1]:
+        by_kind.setdefault(entry.pop("kind"), []).append(entry)
+
+    for kind, attr in (("missing_object", "missing_objects"), ("value_diff", "value_diffs"),
+                       ("renamed_object", "renamed_objects"), ("missing_type", "missing_types")):
+        complete = getattr(full, attr)
+        kept = getattr(result, attr)
+        # The log holds every entry, in discovery order
+        logged = by_kind.get(kind, [])
+        assert len(logged) == len(complete) == lines[-1][attr]
+        assert sorted(map(json.dumps, logged)) == sorted(json.dumps(dataclasses.asdict(x)) for x in complete)
+        if kind == "missing_type":
+            assert kept == complete  # never truncated
+            continue
+        # The result keeps the top_k highest-impact entries, highest first
+        assert len(kept) == min(top_k, len(complete))
+        assert [x.impact for x in kept] == sorted((x.impact for x in kept), reverse=True)
+        assert kept == complete[:top_k]
+
+    assert len(full.missing_objects) > top_k and len(full.value_diffs) > top_k
+    assert result.total_missing_objects == len(full.missing_objects)
+    assert result.total_value_diffs == len(full.value_diffs)
+    assert result.diff_log == str(log)
+
+
+def test_diff_collector_ties_keep_discovery_order():
+    collector = _DiffCollector("missing_object", 3, None)
+    for name, impact in (("a", 1), ("b", 5), ("c", 5), ("d", 2), ("e", 5), ("f", 9)):
+        collector.add(MissingObject(obj_type="T", obj_name=name, impact=impact, side="A"))
+
+    assert collector.count == 6
+    assert [m.obj_name for m in collector.results()] == ["f", "b", "c"]
+
+
+@pytest.mark.parametrize("top_k", [0, -3])
+def test_diff_collector_non_positive_top_k_keeps_nothing(top_k):
+    collector = _DiffCollector("missing_object", top_k, None)
+    for name, impact in (("a", 1), ("b", 5)):
+        collector.add(MissingObject(obj_type="T", obj_name=name, impact=impact, side="A"))
+
+    assert collector.count == 2
+    assert collector.results() == []
@@ -0,0 +1,63 @@
+"""Tests for idf_parser (scan_idf_objects() against parse_idf(), spliced edits)."""
+
+from __future__ import annotations
+
+import glob
+import os
+
+import pytest
+
+from BEM_utils.idf_optimizer import IDFSplicer
+from idf_parser import parse_idf, scan_idf_objects
+
+CONTENT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Content")
+CONTENT_IDFS = sorted(glob.glob(os.path.join(CONTENT_DIR, "**", "*.idf"), recursive=True))
+
+# The second field's value is interrupted by a comment (a missing comma)
+SPLIT_VALUE_IDF = (
+    "Zone,\n"
+    "  Core_ZN,                 !- Name\n"
+    "  0 ! north axis, degrees\n"
+    "  1,                       !- X Origin {m}\n"
+    "  2;                       !- Y Origin {m}\n"
+)
+
+
+def _scanned_as_parsed(content: str) -> dict[str, list[list[str]]]:
+    scanned: dict[str, list[list[str]]] = {}
+    for obj in scan_idf_objects(content):
+        scanned.setdefault(obj.obj_type, []).append(obj.fields)
+    return scanned
+
+
+@pytest.mark.parametrize("path", CONTENT_IDFS, ids=os.path.basename)
+def test_scan_fields_equal_parse_idf(path):
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        content = f.read()
+    assert _scanned_as_parsed(content) == parse_idf(path)
+
+
+def test_comment_split_value_matches_parse_idf(tmp_path):
+    path = tmp_path / "split.idf"
+    path.write_text(SPLIT_VALUE_IDF, encoding="latin-1")
+    assert _scanned_as_parsed(SPLIT_VALUE_IDF) == parse_idf(str(path))
+
+    (zone,) = scan_idf_objects(SPLIT_VALUE_IDF)
+    start, end = zone.field_spans[1]
+    assert SPLIT_VALUE_IDF[start:end] == "0"
+
+
+def test_splice_keeps_comment_inside_split_value(tmp_path):
+    path = tmp_path / "split.idf"
+    path.write_text(SPLIT_VALUE_IDF, encoding="latin-1")
+
+    idf = IDFSplicer(str(path))
+    (zone,) = idf.get("ZONE")
+    idf.set_field(zone, 1, "90")
+    idf.set_field(zone, 2, "5")
+    edited = idf.render()
+
+    # Only the value text is replaced: the comment and the value's second part stay
+    assert edited == SPLIT_VALUE_IDF.replace("  0 !", "  90 !").replace("  2;", "  5;")
+    (spliced,) = scan_idf_objects(edited)
+    assert spliced.fields == ["Core_ZN", "90 \n  1", "5"]
@@ -0,0 +1,53 @@
+"""Tests for metadata_store (replacing a file's rows on re-processing)."""
+
+from __future__ import annotations
+
+import os
+import shutil
+
+import pytest
+
+from metadata_store import _FILE_TABLES, open_store, query_metric_summary, store_file_metadata
+
+PROTOTYPE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "Content", "ASHRAE901_STD2022", "ASHRAE901_OfficeSmall_STD2022_Denver.idf",
+)
+
+ZONES = [
+    {"name": "Core_ZN", "floor_area": 150.0, "multiplier": 1, "lights": 6.9},
+    {"name": "Perimeter_ZN_1", "floor_area": 110.0, "multiplier": 1, "lights": 6.9},
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    conn = open_store(str(tmp_path / "metadata.sqlite"))
+    yield conn
+    conn.close()
+
+
+def test_edited_file_replaces_rows_of_its_previous_contents(store, tmp_path):
+    idf_path = tmp_path / "OfficeSmall.idf"
+    shutil.copy(PROTOTYPE, idf_path)
+    first = store_file_metadata(store, str(idf_path), ZONES, hvac_data={"Core_ZN": {"template": "PSZ"}})
+
+    with open(idf_path, "a", encoding="utf-8") as f:
+        f.write("! edited\n")
+    second = store_file_metadata(store, str(idf_path), ZONES, hvac_data={"Core_ZN": {"template": "PSZ"}})
+
+    assert first != second
+    assert [row[0] for row in query_metric_summary(store, "lights")] == ["OfficeSmall"]
+    for table in _FILE_TABLES + ["files"]:
+        digests = {row[0] for row in store.execute(f"SELECT DISTINCT digest FROM {table}")}
+        assert digests <= {second}, table
+
+
+def test_same_contents_at_other_paths_are_kept(store, tmp_path):
+    for name in ("a", "b"):
+        (tmp_path / name).mkdir()
+        shutil.copy(PROTOTYPE, tmp_path / name / "OfficeSmall.idf")
+        store_file_metadata(store, str(tmp_path / name / "OfficeSmall.idf"), ZONES)
+
+    (count,) = store.execute("SELECT COUNT(*) FROM zones").fetchone()
+    assert count == len(ZONES)
@@ -0,0 +1,56 @@
+"""Tests for reference_snapshot (cached reference index, code-version checks)."""
+
+from __future__ import annotations
+
+import dataclasses
+import os
+
+import pytest
+
+import reference_snapshot
+from idf_comparator import compare_idfs
+from reference_snapshot import compare_to_snapshot, load_or_build_snapshot, save_snapshot
+
+CONTENT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Content")
+ASHRAE_DIR = os.path.join(CONTENT_DIR, "ASHRAE901_STD2022")
+REFERENCE = os.path.join(ASHRAE_DIR, "ASHRAE901_OfficeSmall_STD2022_Denver.idf")
+CANDIDATES = [
+    os.path.join(ASHRAE_DIR, "ASHRAE901_OfficeMedium_STD2022_Denver.idf"),
+    os.path.join(ASHRAE_DIR, "ASHRAE901_RetailStripmall_STD2022_Denver.idf"),
+    REFERENCE,
+]
+
+
+@pytest.fixture(scope="module")
+def snapshot_file(tmp_path_factory):
+    _, path = load_or_build_snapshot(REFERENCE, str(tmp_path_factory.mktemp("snapshots")))
+    return path
+
+
+@pytest.mark.parametrize("fuzzy", [True, False])
+@pytest.mark.parametrize("all_types", [False, True])
+def test_snapshot_comparison_matches_compare_idfs(snapshot_file, fuzzy, all_types):
+    # One loaded snapshot serves every candidate in turn, as in a worker
+    snapshot, _ = load_or_build_snapshot(snapshot_file, os.path.dirname(snapshot_file))
+    for candidate in CANDIDATES:
+        expected = compare_idfs(REFERENCE, candidate, fuzzy=fuzzy, all_types=all_types)
+        actual = compare_to_snapshot(snapshot, candidate, fuzzy=fuzzy, all_types=all_types)
+        assert dataclasses.asdict(actual) == dataclasses.asdict(expected)
+
+
+def test_snapshot_file_from_other_code_version_is_rejected(snapshot_file, tmp_path):
+    snapshot, _ = load_or_build_snapshot(snapshot_file, str(tmp_path))
+    stale_path = str(tmp_path / "stale.refsnap")
+    save_snapshot(dataclasses.replace(snapshot, code_version="0" * 16), stale_path)
+
+    with pytest.raises(ValueError, match="different version"):
+        load_or_build_snapshot(stale_path, str(tmp_path))
+
+
+def test_stale_cached_snapshot_is_rebuilt(tmp_path, monkeypatch):
+    _, cached = load_or_build_snapshot(REFERENCE, str(tmp_path))
+    monkeypatch.setattr(reference_snapshot, "_code_version_cache", "f" * 16)
+
+    snapshot, path = load_or_build_snapshot(REFERENCE, str(tmp_path))
+    assert path == cached
+    assert snapshot.code_version == "f" * 16
@@ -0,0 +1,52 @@
+"""Tests for BEM_utils.simulation (scratch run directories), using the fake EnergyPlus."""
+
+from __future__ import annotations
+
+import errno
+import os
+import shutil
+
+from BEM_utils import config, simulation
+
+CONTENT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Content")
+IDF = os.path.join(CONTENT_DIR, "ASHRAE901_STD2022", "ASHRAE901_OfficeSmall_STD2022_Denver.idf")
+EPW = os.path.join(CONTENT_DIR, "WeatherFiles", "CAN_QC_Montreal-Trudeau.Intl.AP.716270_CWEC2020v2.epw")
+
+
+def _run(tmp_path, scratch):
+    return simulation.run_simulation(
+        IDF, EPW, str(tmp_path / "out"), config.FAKE_ENERGYPLUS,
+        quiet=True, use_cache=False, scratch_dir=str(scratch), stall_timeout=0,
+    )
+
+
+def test_failed_collect_is_a_failed_result_and_frees_scratch(tmp_path, monkeypatch):
+    monkeypatch.setenv("BEM_FAKE_SECONDS_PER_MB", "0")
+    scratch = tmp_path / "scratch"
+    scratch.mkdir()
+
+    def no_space(src, dst, *args, **kwargs):
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+    # Force the cross-filesystem path, then fail its copy
+    monkeypatch.setattr(simulation.os, "replace", no_space)
+    monkeypatch.setattr(simulation.shutil, "copy2", no_space)
+
+    result = _run(tmp_path, scratch)
+
+    assert not result["success"] and not result["aborted"]
+    assert result["message"].startswith("Simulation outputs could not be collected")
+    assert os.listdir(scratch) == []
+    assert not [n for n in os.listdir(tmp_path / "out") if n.endswith(".part")]
+
+
+def test_collected_run_frees_scratch(tmp_path, monkeypatch):
+    monkeypatch.setenv("BEM_FAKE_SECONDS_PER_MB", "0")
+    scratch = tmp_path / "scratch"
+    scratch.mkdir()
+
+    result = _run(tmp_path, scratch)
+
+    assert result["success"], result["message"]
+    assert os.listdir(scratch) == []
+    assert os.path.isfile(tmp_path / "out" / "eplusout.sql")